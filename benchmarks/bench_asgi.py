@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.bench_service import (SERVERS, build_corpus,
+                                      generate_documents, http_poster,
+                                      local_server, peak_rss_mb, run_benchmark,
+                                      slow_clients)
+
+
+def compare_servers(servers, corpus, concurrency, repeat, slow_client_count, env):
+    """
+    Runs the same load against each server in turn, with ``slow_client_count``
+    slow uploads held open throughout.
+
+    Returns:
+        dict: One bench_service report per server.
+    """
+    reports = {}
+    for server in servers:
+        with local_server(env, server) as (url, pid):
+            with slow_clients(url, slow_client_count):
+                reports[server] = run_benchmark(
+                    http_poster(url),
+                    corpus,
+                    concurrency,
+                    repeat,
+                    rss=lambda: peak_rss_mb(pid),
+                )
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the Flask and ASGI servers under the same load."
+    )
+    parser.add_argument(
+        "--servers",
+        default="gunicorn,asgi",
+        help=f"Comma-separated servers to compare, from: {', '.join(sorted(SERVERS))}.",
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--slow-clients",
+        type=int,
+        default=1000,
+        help="Uploads held open and trickled in while the load runs.",
+    )
+    parser.add_argument("--test-dir", default="./test_data")
+    parser.add_argument("--generate", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Every upload is extracted, on every server.
+    env = {**os.environ, "CACHE_ENABLED": "false"}
+    with tempfile.TemporaryDirectory() as generated_dir:
+        if args.generate:
+            generate_documents(generated_dir, args.generate, args.seed)
+        corpus = build_corpus(args.test_dir, generated_dir if args.generate else None)
+
+    reports = compare_servers(
+        args.servers.split(","),
+        corpus,
+        args.concurrency,
+        args.repeat,
+        args.slow_clients,
+        env,
+    )
+    summary = {
+        server: {
+            metric: report["overall"][metric]
+            for metric in ("errors", "p50_ms", "p99_ms", "docs_per_second")
+        }
+        for server, report in reports.items()
+    }
+    print(
+        json.dumps(
+            {
+                "concurrency": args.concurrency,
+                "slow_clients": args.slow_clients,
+                "summary": summary,
+                "servers": reports,
+            },
+            indent=4,
+        )
+    )
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import statistics
+import time
+
+import joblib
+import numpy as np
+
+from src import config
+from src.file_io import extract_text_with_fallback, preprocess_text
+from src.inference import InferenceBundle
+
+
+def load_corpus(test_dir):
+    """
+    Extracts and preprocesses the text of every non-empty document in test_dir.
+    """
+    texts = {}
+    for file_name in sorted(os.listdir(test_dir)):
+        text = preprocess_text(
+            extract_text_with_fallback(os.path.join(test_dir, file_name))
+        )
+        if text:
+            texts[file_name] = text
+    return texts
+
+
+def time_per_document(score, texts, repeat):
+    """
+    Returns per-document latencies in milliseconds for a single-row scorer.
+    """
+    latencies = []
+    for _ in range(repeat):
+        for text in texts:
+            start = time.perf_counter()
+            score(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(latencies):
+    return {
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare per-document latency of sklearn and the NumPy inference bundle."
+    )
+    parser.add_argument("--test-dir", default="./test_data")
+    parser.add_argument("--bundle", default=config.INFERENCE_BUNDLE_DIR)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    model = joblib.load(config.MODEL_PATH)
+    vectorizer = joblib.load(config.VECTORIZER_PATH)
+    bundle = InferenceBundle.load(args.bundle)
+    corpus = load_corpus(args.test_dir)
+    texts = list(corpus.values())
+
+    sklearn_latencies = time_per_document(
+        lambda text: model.predict_proba(vectorizer.transform([text])),
+        texts,
+        args.repeat,
+    )
+    bundle_latencies = time_per_document(
+        lambda text: bundle.predict_proba(bundle.transform([text])), texts, args.repeat
+    )
+    max_difference = float(
+        np.abs(
+            model.predict_proba(vectorizer.transform(texts))
+            - bundle.predict_proba(bundle.transform(texts))
+        ).max()
+    )
+
+    sklearn_summary = summarize(sklearn_latencies)
+    bundle_summary = summarize(bundle_latencies)
+    report = {
+        "documents": sorted(corpus),
+        "sklearn": sklearn_summary,
+        "bundle": bundle_summary,
+        "speedup": sklearn_summary["mean_ms"] / bundle_summary["mean_ms"],
+        "max_probability_difference": max_difference,
+    }
+    print(json.dumps(report, indent=4))
@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+import statistics
+import time
+
+import fitz
+import joblib
+import pytesseract
+
+from src import config
+from src.file_io import (extract_text_with_fallback, get_extension,
+                         preprocess_text)
+
+VARIANTS = {
+    "baseline": {"OCR_PREPROCESS": False},
+    "preprocess": {"OCR_PREPROCESS": True},
+    "preprocess_deskew_binarize": {
+        "OCR_PREPROCESS": True,
+        "OCR_DESKEW": True,
+        "OCR_BINARIZE": True,
+    },
+}
+EXPECTED_PREFIXES = {
+    "invoice": "invoices",
+    "bank_statement": "bank_statements",
+    "drivers_lic": "drivers_licenses",
+    "sample_dl": "drivers_licenses",
+}
+
+
+def expected_label(file_name):
+    for prefix, label in EXPECTED_PREFIXES.items():
+        if file_name.startswith(prefix):
+            return label
+    return None
+
+
+def is_ocr_bound(path):
+    """
+    Returns True for images and for PDFs with at least one page lacking a text layer.
+    """
+    extension = get_extension(path)
+    if extension in {"png", "jpg"}:
+        return True
+    if extension == "pdf":
+        with fitz.open(path) as pdf:
+            return any(not page.get_text().strip() for page in pdf)
+    return False
+
+
+def run_variant(paths, overrides, model, vectorizer, repeat):
+    """
+    OCRs every file under one set of config overrides and classifies the text.
+    """
+    saved = {name: getattr(config, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    try:
+        results = {}
+        for path in paths:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                text = extract_text_with_fallback(path)
+                timings.append(time.perf_counter() - start)
+            text = preprocess_text(text)
+            label = (
+                str(model.predict(vectorizer.transform([text]))[0]) if text else None
+            )
+            results[os.path.basename(path)] = {
+                "seconds": statistics.median(timings),
+                "characters": len(text),
+                "label": label,
+            }
+        return results
+    finally:
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare OCR time and classification with and without image preprocessing."
+    )
+    parser.add_argument("--test-dir", default="./test_data")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        pytesseract.get_tesseract_version()
+    except pytesseract.TesseractNotFoundError:
+        parser.exit(1, "Tesseract is not installed; the OCR benchmark needs it.\n")
+
+    # Serial OCR, so per-file times are not skewed by the shared pool.
+    config.OCR_MAX_WORKERS = 1
+    model = joblib.load(config.MODEL_PATH)
+    vectorizer = joblib.load(config.VECTORIZER_PATH)
+    paths = [
+        os.path.join(args.test_dir, name)
+        for name in sorted(os.listdir(args.test_dir))
+        if is_ocr_bound(os.path.join(args.test_dir, name))
+    ]
+
+    runs = {
+        name: run_variant(paths, overrides, model, vectorizer, args.repeat)
+        for name, overrides in VARIANTS.items()
+    }
+    baseline = runs["baseline"]
+    report = {"files": [os.path.basename(path) for path in paths]}
+    for name, results in runs.items():
+        labelled = [
+            file_name for file_name in results if expected_label(file_name) is not None
+        ]
+        report[name] = {
+            "total_ocr_seconds": sum(r["seconds"] for r in results.values()),
+            "agreement_with_baseline": statistics.fmean(
+                results[file_name]["label"] == baseline[file_name]["label"]
+                for file_name in results
+            ),
+            "accuracy": statistics.fmean(
+                results[file_name]["label"] == expected_label(file_name)
+                for file_name in labelled
+            ),
+            "per_file": results,
+        }
+    print(json.dumps(report, indent=4))
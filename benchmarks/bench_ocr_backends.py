@@ -0,0 +1,144 @@
+import argparse
+import difflib
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+
+from benchmarks.bench_ocr import expected_label, is_ocr_bound
+from src import config, ocr_backends
+from src.file_io import extract_text_with_fallback, preprocess_text
+
+
+def backend_available(name):
+    """
+    Returns None if the backend can OCR here, otherwise the reason it cannot.
+    """
+    try:
+        ocr_backends.create_backend(name).warm_up()
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    if name == "pytesseract":
+        import pytesseract
+
+        try:
+            pytesseract.get_tesseract_version()
+        except pytesseract.TesseractNotFoundError as e:
+            return str(e)
+    return None
+
+
+def run_backend(name, paths, model, vectorizer, repeat, workers):
+    """
+    OCRs every file with one backend: first call (engine start included),
+    median of ``repeat`` serial calls, then all files at once on ``workers`` threads.
+    """
+    config.OCR_BACKEND = name
+    # A fresh backend, so the first call pays any engine start-up.
+    ocr_backends._backend = None
+
+    start = time.perf_counter()
+    extract_text_with_fallback(paths[0])
+    first_call_seconds = time.perf_counter() - start
+
+    results = {}
+    for path in paths:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            text = extract_text_with_fallback(path)
+            timings.append(time.perf_counter() - start)
+        clean = preprocess_text(text)
+        results[os.path.basename(path)] = {
+            "seconds": statistics.median(timings),
+            "characters": len(text),
+            "text": text,
+            "label": (
+                str(model.predict(vectorizer.transform([clean]))[0]) if clean else None
+            ),
+        }
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        start = time.perf_counter()
+        list(executor.map(extract_text_with_fallback, paths * repeat))
+        concurrent_seconds = time.perf_counter() - start
+
+    return {
+        "first_call_seconds": first_call_seconds,
+        "total_ocr_seconds": sum(r["seconds"] for r in results.values()),
+        "concurrent_files_per_second": len(paths) * repeat / concurrent_seconds,
+        "per_file": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the pytesseract and tesserocr OCR backends on the test files."
+    )
+    parser.add_argument("--test-dir", default="./test_data")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=config.OCR_MAX_WORKERS,
+        help="Concurrent OCR threads for the throughput pass.",
+    )
+    args = parser.parse_args()
+
+    # Page OCR runs inline, so per-file times are not skewed by the shared pool;
+    # the throughput pass brings its own threads and a matching engine pool.
+    config.OCR_MAX_WORKERS = 1
+    config.OCR_ENGINE_POOL_SIZE = args.workers
+    model = joblib.load(config.MODEL_PATH)
+    vectorizer = joblib.load(config.VECTORIZER_PATH)
+    paths = [
+        os.path.join(args.test_dir, name)
+        for name in sorted(os.listdir(args.test_dir))
+        if is_ocr_bound(os.path.join(args.test_dir, name))
+    ]
+
+    report = {"files": [os.path.basename(path) for path in paths], "skipped": {}}
+    runs = {}
+    for name in ("pytesseract", "tesserocr"):
+        reason = backend_available(name)
+        if reason:
+            report["skipped"][name] = reason
+            continue
+        runs[name] = run_backend(
+            name, paths, model, vectorizer, args.repeat, args.workers
+        )
+    if not runs:
+        parser.exit(1, f"No OCR backend is usable: {report['skipped']}\n")
+
+    for name, run in runs.items():
+        labelled = [f for f in run["per_file"] if expected_label(f) is not None]
+        run["accuracy"] = statistics.fmean(
+            run["per_file"][f]["label"] == expected_label(f) for f in labelled
+        )
+    if len(runs) == 2:
+        subprocess_run, engine_run = runs["pytesseract"], runs["tesserocr"]
+        report["tesserocr_vs_pytesseract"] = {
+            "speedup": subprocess_run["total_ocr_seconds"]
+            / engine_run["total_ocr_seconds"],
+            "label_agreement": statistics.fmean(
+                engine_run["per_file"][f]["label"]
+                == subprocess_run["per_file"][f]["label"]
+                for f in engine_run["per_file"]
+            ),
+            "mean_text_similarity": statistics.fmean(
+                difflib.SequenceMatcher(
+                    None,
+                    engine_run["per_file"][f]["text"],
+                    subprocess_run["per_file"][f]["text"],
+                ).ratio()
+                for f in engine_run["per_file"]
+            ),
+        }
+    for run in runs.values():
+        for result in run["per_file"].values():
+            del result["text"]
+    report.update(runs)
+    print(json.dumps(report, indent=4))
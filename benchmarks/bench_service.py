@@ -0,0 +1,495 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.file_io import get_extension
+
+WERKZEUG_SCRIPT = """
+from werkzeug.serving import run_simple
+from src import config
+from src.app import app
+host, _, port = config.SERVER_BIND.rpartition(":")
+run_simple(host, int(port), app, threaded=True)
+"""
+# Commands starting each server; every one listens on SERVER_BIND.
+SERVERS = {
+    "werkzeug": [sys.executable, "-c", WERKZEUG_SCRIPT],
+    "gunicorn": [sys.executable, "-m", "src.serve"],
+    "asgi": [sys.executable, "-m", "src.asgi"],
+}
+# Throughput and latency may move this much against the baseline before it counts
+# as a regression.
+DEFAULT_TOLERANCE = 0.2
+
+
+def generate_documents(output_dir, count, seed):
+    """
+    Writes ``count`` synthetic documents of every generated format to output_dir,
+    reproducibly for a given seed.
+    """
+    # The generators print on import and for every saved file; keep stdout for
+    # the JSON report.
+    with contextlib.redirect_stdout(io.StringIO()):
+        from src.data_gen import (synthetic_bank_statements,
+                                  synthetic_drivers_licenses,
+                                  synthetic_invoices)
+
+        random.seed(seed)
+        for module in (
+            synthetic_invoices,
+            synthetic_bank_statements,
+            synthetic_drivers_licenses,
+        ):
+            module.faker.seed_instance(seed)
+        for format_type in ("pdf", "docx", "xlsx"):
+            synthetic_invoices.generate_synthetic_invoices(
+                os.path.join(output_dir, "invoices"), format_type, count=count
+            )
+            synthetic_bank_statements.generate_synthetic_bank_statements(
+                os.path.join(output_dir, "bank_statements"), format_type, count=count
+            )
+        synthetic_drivers_licenses.generate_synthetic_driver_licenses(
+            os.path.join(output_dir, "drivers_licenses"), count=count
+        )
+
+
+def build_corpus(test_dir, generated_dir=None):
+    """
+    Returns (filename, bytes) pairs for every file in test_dir and, recursively,
+    generated_dir.
+    """
+    paths = [os.path.join(test_dir, name) for name in sorted(os.listdir(test_dir))]
+    if generated_dir:
+        for root, _, names in sorted(os.walk(generated_dir)):
+            paths.extend(os.path.join(root, name) for name in sorted(names))
+    corpus = []
+    for path in paths:
+        with open(path, "rb") as file:
+            corpus.append((os.path.basename(path), file.read()))
+    return corpus
+
+
+def response_outcome(status_code, body):
+    """
+    Classifies a /classify_file response as "ok", "unknown" (no text to
+    classify) or "error". The app answers a failed extraction or prediction with
+    200 and file_class "Error", so the status code alone is not enough.
+    """
+    if status_code != 200 or not isinstance(body, dict):
+        return "error"
+    file_class = body.get("file_class")
+    if file_class == "Error":
+        return "error"
+    return "unknown" if file_class == "Unknown" else "ok"
+
+
+def flask_client_poster():
+    """
+    Returns a post(filename, data) callable driving the app in-process through
+    the Flask test client, one client per thread; it returns the response_outcome.
+    """
+    from src.app import app
+
+    local = threading.local()
+
+    def post(filename, data):
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        response = local.client.post(
+            "/classify_file",
+            data={"file": (io.BytesIO(data), filename)},
+            content_type="multipart/form-data",
+        )
+        return response_outcome(response.status_code, response.get_json(silent=True))
+
+    return post
+
+
+def http_poster(url, timeout=60):
+    """
+    Returns a post(filename, data) callable uploading to a running server, with
+    one keep-alive session per thread; it returns the response_outcome. Uploads
+    failing or taking longer than ``timeout`` seconds are errors.
+    """
+    import requests
+
+    local = threading.local()
+
+    def post(filename, data):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        try:
+            response = local.session.post(
+                f"{url}/classify_file",
+                files={"file": (filename, data)},
+                timeout=timeout,
+            )
+        except requests.RequestException:
+            return "error"
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response_outcome(response.status_code, body)
+
+    return post
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def local_server(env, server="werkzeug"):
+    """
+    Runs the app in a child process under one of SERVERS: the threaded Werkzeug
+    server, gunicorn (src.serve) or the ASGI app (src.asgi).
+
+    Yields:
+        tuple[str, int]: The base URL and the server's pid.
+    """
+    import requests
+
+    port = _free_port()
+    process = subprocess.Popen(
+        SERVERS[server],
+        env={**env, "SERVER_BIND": f"127.0.0.1:{port}"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            try:
+                requests.get(f"{url}/health", timeout=1)
+                break
+            except requests.ConnectionError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"The benchmark {server} server did not start")
+                time.sleep(0.2)
+        yield url, process.pid
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@contextlib.contextmanager
+def slow_clients(url, count, interval=1.0):
+    """
+    Holds ``count`` uploads open against a server, each sending one more byte
+    of its file every ``interval`` seconds, like clients on a poor network.
+    """
+    parts = urllib.parse.urlsplit(url)
+    head = (
+        "POST /classify_file HTTP/1.1\r\n"
+        f"Host: {parts.netloc}\r\n"
+        "Content-Type: multipart/form-data; boundary=slow\r\n"
+        f"Content-Length: {1024 * 1024}\r\n\r\n"
+        "--slow\r\n"
+        'Content-Disposition: form-data; name="file"; filename="slow.txt"\r\n\r\n'
+    ).encode()
+    if count:
+        # One descriptor per connection, on top of the benchmark's own.
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = soft + count
+        if hard != resource.RLIM_INFINITY:
+            wanted = min(wanted, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+    connections = []
+    stop = threading.Event()
+
+    def trickle():
+        while not stop.wait(interval):
+            for connection in connections:
+                try:
+                    connection.send(b"x")
+                except OSError:
+                    pass
+
+    sender = threading.Thread(target=trickle, daemon=True)
+    try:
+        for _ in range(count):
+            connection = socket.create_connection((parts.hostname, parts.port))
+            connection.sendall(head)
+            connections.append(connection)
+        sender.start()
+        yield
+    finally:
+        stop.set()
+        if sender.is_alive():
+            sender.join()
+        for connection in connections:
+            connection.close()
+
+
+def _child_pids(pid):
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as file:
+                children.extend(int(child) for child in file.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def peak_rss_mb(pid=None):
+    """
+    Returns the peak resident set size of a process (this one by default) in MB,
+    or None when it cannot be read.
+
+    For another process the peaks of its child processes (gunicorn workers,
+    the ASGI process pool) are added; pages they share count once per process.
+    """
+    if pid is None:
+        # ru_maxrss is in KB on Linux and bytes on macOS.
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    total = None
+    for process in [pid] + _child_pids(pid):
+        try:
+            with open(f"/proc/{process}/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        total = (total or 0) + int(line.split()[1]) / 1024
+        except OSError:
+            pass
+    return total
+
+
+def summarize(latencies, errors, seconds, unknown=0):
+    """
+    Returns latency percentiles in milliseconds and throughput for one phase;
+    throughput counts successful requests only, so failing fast never raises it.
+    ``unknown`` of the successful requests had no text to classify.
+    """
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "unknown": unknown,
+        "p50_ms": float(np.percentile(latencies, 50)) if latencies else None,
+        "p95_ms": float(np.percentile(latencies, 95)) if latencies else None,
+        "p99_ms": float(np.percentile(latencies, 99)) if latencies else None,
+        "docs_per_second": len(latencies) / seconds if seconds else None,
+    }
+
+
+def run_phase(post, documents, concurrency):
+    """
+    Uploads every document ``concurrency`` at a time.
+
+    Returns:
+        tuple[list[float], int, int, float]: Latencies of successful requests
+        in milliseconds, the number of failed requests, how many successful
+        ones came back "Unknown", and the wall time.
+    """
+
+    def timed_post(document):
+        start = time.perf_counter()
+        outcome = post(*document)
+        return outcome, (time.perf_counter() - start) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(timed_post, documents))
+    seconds = time.perf_counter() - started
+    latencies = [latency for outcome, latency in outcomes if outcome != "error"]
+    unknown = sum(1 for outcome, _ in outcomes if outcome == "unknown")
+    return latencies, len(outcomes) - len(latencies), unknown, seconds
+
+
+def run_benchmark(post, corpus, concurrency, repeat, rss=peak_rss_mb):
+    """
+    Runs one phase per file type, then reports each type and the overall totals.
+
+    ``rss`` returns the serving process's peak RSS in MB (or None). It is the
+    high-water mark when a phase ends, so it only grows from one file type to
+    the next (types run in alphabetical order).
+    """
+    by_type = {}
+    for document in corpus:
+        by_type.setdefault(get_extension(document[0]), []).append(document)
+
+    # One unmeasured pass loads the model and the extractor backends.
+    run_phase(post, [documents[0] for documents in by_type.values()], 1)
+
+    report = {"by_type": {}}
+    all_latencies, all_errors, all_unknown, all_seconds = [], 0, 0, 0.0
+    for file_type in sorted(by_type):
+        latencies, errors, unknown, seconds = run_phase(
+            post, by_type[file_type] * repeat, concurrency
+        )
+        report["by_type"][file_type] = {
+            "documents": len(by_type[file_type]),
+            **summarize(latencies, errors, seconds, unknown),
+            "peak_rss_mb": rss(),
+        }
+        all_latencies.extend(latencies)
+        all_errors += errors
+        all_unknown += unknown
+        all_seconds += seconds
+    report["overall"] = {
+        "documents": len(corpus),
+        **summarize(all_latencies, all_errors, all_seconds, all_unknown),
+        "peak_rss_mb": rss(),
+    }
+    return report
+
+
+def compare_to_baseline(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Lists the regressions of a report against a baseline report: more errors, or
+    p50/p95/p99 latency or peak RSS above, or throughput below, the baseline by
+    more than ``tolerance``. File types missing from either side are skipped.
+
+    Returns:
+        list[str]: One message per regression; empty when there is none.
+    """
+    regressions = []
+    sections = {"overall": (report["overall"], baseline["overall"])}
+    for file_type, current in report["by_type"].items():
+        if file_type in baseline.get("by_type", {}):
+            sections[file_type] = (current, baseline["by_type"][file_type])
+
+    for section, (current, previous) in sections.items():
+        if current["errors"] > previous["errors"]:
+            regressions.append(
+                f"{section}: {current['errors']} errors, baseline {previous['errors']}"
+            )
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "peak_rss_mb"):
+            if current.get(metric) is None or previous.get(metric) is None:
+                continue
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{section}: {metric} {current[metric]:.1f}, "
+                    f"baseline {previous[metric]:.1f}"
+                )
+        if current["docs_per_second"] is not None and previous["docs_per_second"]:
+            if current["docs_per_second"] < previous["docs_per_second"] * (
+                1 - tolerance
+            ):
+                regressions.append(
+                    f"{section}: docs_per_second {current['docs_per_second']:.2f}, "
+                    f"baseline {previous['docs_per_second']:.2f}"
+                )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure /classify_file latency, throughput and memory per file type."
+    )
+    parser.add_argument(
+        "--target",
+        choices=("client", "server"),
+        default="client",
+        help="Drive the app in-process through the Flask test client, or over HTTP.",
+    )
+    parser.add_argument(
+        "--server",
+        choices=sorted(SERVERS),
+        default="werkzeug",
+        help="With --target server, the server started for the run.",
+    )
+    parser.add_argument(
+        "--url",
+        help="With --target server, benchmark this running server instead of "
+        "starting a local one (its RSS is then not reported).",
+    )
+    parser.add_argument(
+        "--slow-clients",
+        type=int,
+        default=0,
+        help="With --target server, uploads held open and trickled in during the run.",
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Uploads of each document per phase."
+    )
+    parser.add_argument("--test-dir", default="./test_data")
+    parser.add_argument(
+        "--generate",
+        type=int,
+        default=5,
+        help="Synthetic documents per generated format; 0 uses test_data only.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Keep the result cache on; by default every upload is extracted.",
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument(
+        "--baseline", help="Fail when the report regresses against this JSON report."
+    )
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    if not args.cache:
+        # Before src.app is imported, in-process or by the server child.
+        os.environ["CACHE_ENABLED"] = "false"
+
+    with tempfile.TemporaryDirectory() as generated_dir:
+        if args.generate:
+            generate_documents(generated_dir, args.generate, args.seed)
+        corpus = build_corpus(args.test_dir, generated_dir if args.generate else None)
+
+    with contextlib.ExitStack() as stack:
+        if args.target == "client":
+            # In-process, the serving process is this interpreter.
+            post, rss = flask_client_poster(), peak_rss_mb
+        elif args.url:
+            url = args.url.rstrip("/")
+            post, rss = http_poster(url), lambda: None
+        else:
+            url, server_pid = stack.enter_context(
+                local_server(dict(os.environ), args.server)
+            )
+            post, rss = http_poster(url), lambda: peak_rss_mb(server_pid)
+        if args.target == "server":
+            stack.enter_context(slow_clients(url, args.slow_clients))
+        results = run_benchmark(post, corpus, args.concurrency, args.repeat, rss=rss)
+
+    report = {
+        "target": args.url or args.target,
+        "server": args.server if args.target == "server" and not args.url else None,
+        "concurrency": args.concurrency,
+        "slow_clients": args.slow_clients if args.target == "server" else 0,
+        "repeat": args.repeat,
+        "corpus": dict(sorted(Counter(get_extension(n) for n, _ in corpus).items())),
+        **results,
+    }
+    output = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare_to_baseline(report, json.load(file), args.tolerance)
+        if regressions:
+            parser.exit(
+                1,
+                "Performance regressions against "
+                f"{args.baseline}:\n  " + "\n  ".join(regressions) + "\n",
+            )
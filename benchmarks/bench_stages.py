@@ -0,0 +1,196 @@
+import argparse
+import io
+import json
+import statistics
+import time
+
+import fitz
+import joblib
+import numpy as np
+import pandas as pd
+from docx import Document
+from PIL import Image
+
+from benchmarks.bench_ocr_backends import backend_available
+from src import config
+from src.file_io import (extract_text_from_docx, extract_text_from_excel,
+                         extract_text_from_image, extract_text_from_pdf,
+                         preprocess_text)
+
+# Units of one "page" for formats without pages.
+DOCX_PARAGRAPHS_PER_PAGE = 40
+XLSX_ROWS_PER_PAGE = 50
+# A log-log slope above this flags a stage as growing faster than its input.
+SUPER_LINEAR_SLOPE = 1.15
+
+
+def repeat_pdf_pages(path, pages):
+    """
+    Returns a PDF of ``pages`` pages made by repeating the pages of ``path``.
+    """
+    with fitz.open(path) as source, fitz.open() as output:
+        while len(output) < pages:
+            output.insert_pdf(source, to_page=min(len(source), pages - len(output)) - 1)
+        return output.tobytes()
+
+
+def make_tiff(path, frames):
+    """
+    Returns a multi-page TIFF repeating the image at ``path`` ``frames`` times.
+    """
+    image = Image.open(path).convert("L")
+    buffer = io.BytesIO()
+    image.save(buffer, "TIFF", save_all=True, append_images=[image] * (frames - 1))
+    return buffer.getvalue()
+
+
+def make_docx(pages):
+    document = Document()
+    for index in range(pages * DOCX_PARAGRAPHS_PER_PAGE):
+        document.add_paragraph(
+            f"Transaction {index}: payment to Example Supplier, ${index % 997}.42"
+        )
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def make_xlsx(pages):
+    rows = pages * XLSX_ROWS_PER_PAGE
+    frame = pd.DataFrame(
+        {
+            "Date": ["01/02/2024"] * rows,
+            "Description": [f"Payment {index}" for index in range(rows)],
+            "Amount": [round(index * 1.37, 2) for index in range(rows)],
+        }
+    )
+    buffer = io.BytesIO()
+    frame.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def time_call(function, argument, repeat):
+    """
+    Returns the median wall time of ``function(argument)`` in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def scaling_slope(sizes, seconds):
+    """
+    Returns the slope of log(time) against log(size): about 1 for linear stages,
+    above 1 for super-linear ones. None with fewer than two sizes.
+    """
+    if len(sizes) < 2:
+        return None
+    return float(np.polyfit(np.log(sizes), np.log(np.maximum(seconds, 1e-9)), 1)[0])
+
+
+def bench_stage(build, function, sizes, repeat):
+    """
+    Times one stage on inputs built for each size.
+
+    Returns:
+        dict: Per-size timings plus the log-log scaling slope.
+    """
+    runs = []
+    for size in sizes:
+        argument = build(size)
+        seconds = time_call(function, argument, repeat)
+        runs.append(
+            {"pages": size, "seconds": seconds, "seconds_per_page": seconds / size}
+        )
+    slope = scaling_slope(
+        [run["pages"] for run in runs], [run["seconds"] for run in runs]
+    )
+    return {
+        "runs": runs,
+        "scaling_slope": slope,
+        "super_linear": slope is not None and slope > SUPER_LINEAR_SLOPE,
+    }
+
+
+def _sizes(value):
+    return [int(size) for size in value.split(",") if size]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time each extraction and inference stage across document sizes."
+    )
+    parser.add_argument("--test-dir", default="./test_data")
+    parser.add_argument(
+        "--sizes", type=_sizes, default=[1, 10, 100, 1000], help="Pages per input."
+    )
+    parser.add_argument(
+        "--ocr-sizes",
+        type=_sizes,
+        default=[1, 2, 4, 8],
+        help="Pages per input for the OCR stages.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--stages", help="Comma-separated subset of stages to run (default: all)."
+    )
+    args = parser.parse_args()
+
+    model = joblib.load(config.MODEL_PATH)
+    vectorizer = joblib.load(config.VECTORIZER_PATH)
+    text_pdf = f"{args.test_dir}/bank_statement_1.pdf"
+    scanned_pdf = f"{args.test_dir}/bank_statement_2500.pdf"
+    image = f"{args.test_dir}/drivers_license_1.jpg"
+
+    def page_text(pages):
+        return extract_text_from_pdf(repeat_pdf_pages(text_pdf, pages))
+
+    stages = {
+        "extract_text_from_pdf[text_layer]": (
+            lambda pages: repeat_pdf_pages(text_pdf, pages),
+            extract_text_from_pdf,
+            args.sizes,
+        ),
+        "extract_text_from_pdf[ocr]": (
+            lambda pages: repeat_pdf_pages(scanned_pdf, pages),
+            extract_text_from_pdf,
+            args.ocr_sizes,
+        ),
+        "extract_text_from_image": (
+            lambda pages: make_tiff(image, pages),
+            extract_text_from_image,
+            args.ocr_sizes,
+        ),
+        "extract_text_from_docx": (make_docx, extract_text_from_docx, args.sizes),
+        "extract_text_from_excel": (make_xlsx, extract_text_from_excel, args.sizes),
+        "preprocess_text": (page_text, preprocess_text, args.sizes),
+        "vectorizer.transform": (
+            lambda pages: [preprocess_text(page_text(pages))],
+            vectorizer.transform,
+            args.sizes,
+        ),
+        "model.predict_proba": (
+            lambda pages: vectorizer.transform([preprocess_text(page_text(pages))]),
+            model.predict_proba,
+            args.sizes,
+        ),
+    }
+    selected = args.stages.split(",") if args.stages else list(stages)
+
+    # Page OCR runs inline, so the numbers measure the stage, not the pool.
+    config.OCR_MAX_WORKERS = 1
+    report = {"skipped": {}}
+    ocr_unavailable = backend_available(config.OCR_BACKEND)
+    for name in selected:
+        build, function, sizes = stages[name]
+        if ocr_unavailable and name in {
+            "extract_text_from_pdf[ocr]",
+            "extract_text_from_image",
+        }:
+            report["skipped"][name] = ocr_unavailable
+            continue
+        report[name] = bench_stage(build, function, sizes, args.repeat)
+    print(json.dumps(report, indent=4))
@@ -0,0 +1,69 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import src.app
+print(json.dumps({
+    "import_seconds": time.perf_counter() - start,
+    "app_startup_seconds": src.app.startup_seconds,
+    "extractor_backends_loaded": sorted(
+        name for name in ("fitz", "pytesseract", "pandas", "docx", "PIL") if name in sys.modules
+    ),
+}))
+"""
+
+
+def measure_cold_start(env):
+    """
+    Starts a fresh interpreter, imports src.app and returns its timings.
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_seconds"] = time.perf_counter() - start
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measure cold start time of the API module in fresh interpreters."
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    report = {}
+    variants = {
+        "sklearn_mmap": {"USE_INFERENCE_BUNDLE": "false", "MODEL_MMAP_MODE": "r"},
+        "sklearn_no_mmap": {"USE_INFERENCE_BUNDLE": "false", "MODEL_MMAP_MODE": "none"},
+        "inference_bundle": {"USE_INFERENCE_BUNDLE": "true", "MODEL_MMAP_MODE": "r"},
+    }
+    for name, overrides in variants.items():
+        env = {**os.environ, **overrides}
+        runs = [measure_cold_start(env) for _ in range(args.runs)]
+        report[name] = {
+            "process_seconds_median": statistics.median(
+                r["process_seconds"] for r in runs
+            ),
+            "import_seconds_median": statistics.median(
+                r["import_seconds"] for r in runs
+            ),
+            "app_startup_seconds_median": statistics.median(
+                r["app_startup_seconds"] for r in runs
+            ),
+            "extractor_backends_loaded": runs[-1]["extractor_backends_loaded"],
+        }
+
+    print(json.dumps(report, indent=4))
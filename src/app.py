@@ -1,11 +1,26 @@
+import hmac
 import logging
+import time
+from io import BytesIO
 
-import joblib
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
+from werkzeug.datastructures import FileStorage
 
-from src.classifier import classify_document
-from src.file_io import allowed_file
+from src import config
+from src.cache import ResultCache
+from src.classifier import (classify_document, classify_document_incremental,
+                            classify_documents)
+from src.file_io import DocumentTooLarge, UnsupportedDocument, inspect_document
+from src.jobs import JobManager, JobQueueFull
 from src.logging_config import setup_logger
+from src.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS, REGISTRY
+from src.model_loader import load_model_artifacts
+from src.model_registry import (ActiveModel, activate_version, list_versions,
+                                load_version)
+from src.profiling import finish_profile, should_profile, start_profile
+from src.shadow import ShadowScorer
+
+_startup_started = time.perf_counter()
 
 # Setup main app logger
 logger = setup_logger("app", "./logs/app.log")
@@ -20,22 +35,205 @@ flask_file_handler.setFormatter(
 flask_logger.addHandler(flask_file_handler)
 
 app = Flask(__name__)
+# Werkzeug also stops reading bodies past this limit, including chunked ones
+# without a Content-Length.
+app.config["MAX_CONTENT_LENGTH"] = config.MAX_UPLOAD_BYTES or None
+
+MAX_BATCH_FILES = 500
+# Endpoints that can be profiled with PROFILE_SAMPLE_RATE or the X-Profile header.
+PROFILED_ENDPOINTS = {"classify_file_route", "classify_batch_route"}
 
 try:
     logger.info("Loading model and vectorizer...")
-    model = joblib.load("./src/models/text_classifier.pkl")
-    vectorizer = joblib.load("./src/models/tfidf_vectorizer.pkl")
-    logger.info("Model and vectorizer loaded successfully.")
+    active_model = ActiveModel(
+        load_model_artifacts(),
+        registry_dir=config.MODEL_REGISTRY_DIR,
+        poll_seconds=config.MODEL_REGISTRY_POLL_SECONDS,
+    )
+    logger.info(
+        "Model and vectorizer loaded successfully "
+        f"(version {active_model.current.version})."
+    )
+    shadow = None
+    if config.SHADOW_MODEL_VERSION:
+        if not config.MODEL_REGISTRY_DIR:
+            raise ValueError("SHADOW_MODEL_VERSION requires MODEL_REGISTRY_DIR")
+        shadow = ShadowScorer(
+            load_version(
+                config.MODEL_REGISTRY_DIR,
+                config.SHADOW_MODEL_VERSION,
+                mmap_mode=config.MODEL_MMAP_MODE,
+            ),
+            sample_rate=config.SHADOW_SAMPLE_RATE,
+            max_queue=config.SHADOW_QUEUE_SIZE,
+        )
+        logger.info(
+            f"Shadow model {shadow.version} scoring "
+            f"{config.SHADOW_SAMPLE_RATE:.0%} of requests."
+        )
 except Exception:
     logger.error("Error loading model or vectorizer", exc_info=True)
     raise
 
+cache = (
+    ResultCache(
+        max_entries=config.CACHE_MAX_ENTRIES,
+        ttl_seconds=config.CACHE_TTL_SECONDS,
+        db_path=config.CACHE_DB_PATH,
+    )
+    if config.CACHE_ENABLED
+    else None
+)
+
+
+def _run_classification_job(filename, data):
+    """
+    Classifies an uploaded document on a background job worker.
+
+    Raises:
+        RuntimeError: If classification failed, so the job is reported failed.
+    """
+    file = FileStorage(stream=BytesIO(data), filename=filename)
+    served = active_model.current
+    file_class = classify_document(
+        file,
+        served.model,
+        served.vectorizer,
+        cache=cache,
+        model_version=served.version,
+        shadow=shadow,
+    )
+    if file_class == "Error":
+        raise RuntimeError(f"Classification of {filename} failed")
+    return {"file_class": file_class, "model_version": served.version}
+
+
+jobs = JobManager(
+    _run_classification_job,
+    max_workers=config.JOB_WORKERS,
+    max_queue=config.JOB_QUEUE_SIZE,
+    result_ttl_seconds=config.JOB_RESULT_TTL_SECONDS,
+    db_path=config.JOB_DB_PATH,
+    timeout_seconds=config.JOB_TIMEOUT_SECONDS,
+)
+
+startup_seconds = time.perf_counter() - _startup_started
+logger.info(f"App startup completed in {startup_seconds:.3f}s")
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.before_request
+def _reject_oversized_request():
+    limit = app.config["MAX_CONTENT_LENGTH"]
+    if limit is not None and (request.content_length or 0) > limit:
+        logger.warning(f"Request too large: {request.content_length} bytes")
+        return jsonify({"error": "Request too large"}), 413
+
+
+@app.before_request
+def _follow_model_registry():
+    active_model.maybe_reload()
+
+
+def _admin_token_valid():
+    """
+    Checks the X-Admin-Token header against ADMIN_TOKEN in constant time.
+    """
+    token = request.headers.get("X-Admin-Token", "")
+    return hmac.compare_digest(token.encode(), config.ADMIN_TOKEN.encode())
+
+
+@app.before_request
+def _start_profiling():
+    if request.endpoint not in PROFILED_ENDPOINTS:
+        return
+    requested = (
+        request.headers.get("X-Profile", "").lower() in {"1", "true", "yes"}
+        and config.ADMIN_TOKEN is not None
+        and _admin_token_valid()
+    )
+    if should_profile(requested):
+        g.profiler = start_profile()
+
+
+@app.after_request
+def _store_profile(response):
+    if "profiler" in g:
+        response.headers["X-Profile-Id"] = finish_profile(
+            g.pop("profiler"), request.endpoint
+        )
+    return response
+
+
+@app.teardown_request
+def _discard_profile(exc):
+    # Only reached with a profiler still running when the request raised.
+    if "profiler" in g:
+        g.pop("profiler").stop()
+
+
+def _served_model():
+    """
+    Pins the served model for the rest of the request, so a concurrent reload
+    cannot mix versions within one response.
+    """
+    if "served_model" not in g:
+        g.served_model = active_model.current
+    return g.served_model
+
+
+@app.after_request
+def _record_request_metrics(response):
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    HTTP_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    if "served_model" in g:
+        response.headers["X-Model-Version"] = g.served_model.version
+    if "request_started" in g:
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - g.request_started, endpoint=endpoint
+        )
+    return response
+
+
+def _rejected_upload(file):
+    """
+    Sniffs an upload's size and type from its first bytes, before anything parses it.
+
+    Returns:
+        The error response for a refused upload, or None when it can be classified.
+    """
+    try:
+        inspect_document(file.stream, file.filename)
+    except DocumentTooLarge as e:
+        logger.warning(f"File too large: {e}")
+        return jsonify({"error": "File too large"}), 413
+    except UnsupportedDocument:
+        logger.warning(f"File type not allowed: {file.filename}")
+        return jsonify({"error": "File type not allowed"}), 400
+    return None
+
+
+def _query_number(name, cast):
+    """
+    Reads an optional numeric query parameter, raising ValueError when malformed.
+    """
+    value = request.args.get(name)
+    return cast(value) if value not in (None, "") else None
+
 
 @app.route("/classify_file", methods=["POST"])
 def classify_file_route():
     """
     Route to classify an uploaded file.
 
+    With ``?early_exit=true`` the document is read chunk by chunk and scoring
+    stops once ``confidence_threshold`` or ``page_budget`` (optional query
+    parameters) is reached; the response then also reports "pages_consumed".
+
     Returns:
         JSON response with the predicted class or error message.
     """
@@ -50,20 +248,217 @@ def classify_file_route():
             logger.warning("No selected file")
             return jsonify({"error": "No selected file"}), 400
 
-        if not allowed_file(file.filename):
-            logger.warning(f"File type not allowed: {file.filename}")
-            return jsonify({"error": "File type not allowed"}), 400
+        rejected = _rejected_upload(file)
+        if rejected is not None:
+            return rejected
+
+        served = _served_model()
+        if request.args.get("early_exit", "").lower() in {"1", "true", "yes"}:
+            try:
+                confidence_threshold = _query_number("confidence_threshold", float)
+                page_budget = _query_number("page_budget", int)
+            except ValueError:
+                return jsonify({"error": "Invalid early exit parameters"}), 400
+
+            logger.info(f"Classifying file with early exit: {file.filename}")
+            result = classify_document_incremental(
+                file,
+                served.model,
+                served.vectorizer,
+                confidence_threshold=confidence_threshold,
+                page_budget=page_budget,
+            )
+            logger.info(f"Classification result: {result}")
+            return jsonify({**result, "model_version": served.version}), 200
 
         logger.info(f"Classifying file: {file.filename}")
-        file_class = classify_document(file, model, vectorizer)
+        file_class = classify_document(
+            file,
+            served.model,
+            served.vectorizer,
+            cache=cache,
+            model_version=served.version,
+            shadow=shadow,
+        )
         logger.info(f"Classification result: {file_class}")
 
-        return jsonify({"file_class": file_class}), 200
+        return jsonify({"file_class": file_class, "model_version": served.version}), 200
 
     except Exception:
         logger.error("Error during file classification", exc_info=True)
         return jsonify({"error": "An error occurred during classification"}), 500
 
 
+@app.route("/classify_batch", methods=["POST"])
+def classify_batch_route():
+    """
+    Route to classify many uploaded files, or the members of zip/tar archives, in one request.
+
+    Returns:
+        JSON response with per-file results in input order or error message.
+    """
+    try:
+        files = [file for file in request.files.getlist("files") if file.filename]
+
+        if not files:
+            logger.warning("No files in the batch request")
+            return jsonify({"error": "No files in the request"}), 400
+
+        if len(files) > MAX_BATCH_FILES:
+            logger.warning(f"Batch too large: {len(files)} files")
+            return jsonify({"error": f"Too many files (max {MAX_BATCH_FILES})"}), 400
+
+        logger.info(f"Classifying batch of {len(files)} uploads")
+        served = _served_model()
+        try:
+            results = classify_documents(
+                files,
+                served.model,
+                served.vectorizer,
+                max_documents=MAX_BATCH_FILES,
+                cache=cache,
+                model_version=served.version,
+                shadow=shadow,
+            )
+        except ValueError as e:
+            logger.warning(f"Batch rejected: {e}")
+            return jsonify({"error": f"Too many files (max {MAX_BATCH_FILES})"}), 400
+
+        return jsonify({"results": results, "model_version": served.version}), 200
+
+    except Exception:
+        logger.error("Error during batch classification", exc_info=True)
+        return jsonify({"error": "An error occurred during classification"}), 500
+
+
+@app.route("/jobs", methods=["POST"])
+def submit_job_route():
+    """
+    Route to queue an uploaded file for asynchronous classification.
+
+    Returns:
+        JSON response with the job id, or an error message; 429 when the queue is full.
+    """
+    try:
+        if "file" not in request.files:
+            logger.warning("No file part in the request")
+            return jsonify({"error": "No file part in the request"}), 400
+
+        file = request.files["file"]
+
+        if file.filename == "":
+            logger.warning("No selected file")
+            return jsonify({"error": "No selected file"}), 400
+
+        rejected = _rejected_upload(file)
+        if rejected is not None:
+            return rejected
+
+        try:
+            job_id = jobs.submit(file.filename, file.read())
+        except JobQueueFull:
+            logger.warning(f"Job queue full, rejecting file: {file.filename}")
+            return jsonify({"error": "Job queue is full, retry later"}), 429
+
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+    except Exception:
+        logger.error("Error during job submission", exc_info=True)
+        return jsonify({"error": "An error occurred during job submission"}), 500
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job_route(job_id):
+    """
+    Route to fetch the status, and once finished the result, of a job.
+
+    Returns:
+        JSON response with the job state or error message.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job), 200
+
+
+@app.route("/health", methods=["GET"])
+def health_route():
+    """
+    Route reporting liveness, the served model version and startup time.
+
+    Returns:
+        JSON response with health information.
+    """
+    return (
+        jsonify(
+            {
+                "status": "ok",
+                "model_version": active_model.current.version,
+                "startup_seconds": startup_seconds,
+            }
+        ),
+        200,
+    )
+
+
+@app.route("/admin/reload_model", methods=["POST"])
+def reload_model_route():
+    """
+    Route to hot-swap the served model to a registry version.
+
+    An optional JSON body ``{"version": ...}`` activates that version (moving
+    the registry's CURRENT pointer, so workers polling the registry follow);
+    without it, the version CURRENT already names is loaded. In-flight requests
+    finish on the version they started with.
+
+    Returns:
+        JSON response with the previous and now-served versions or error message.
+    """
+    if config.ADMIN_TOKEN is None:
+        return jsonify({"error": "Admin endpoints are disabled"}), 403
+    if not _admin_token_valid():
+        return jsonify({"error": "Invalid admin token"}), 403
+    if not config.MODEL_REGISTRY_DIR:
+        return jsonify({"error": "Model registry is not configured"}), 409
+
+    previous = active_model.current.version
+    version = (request.get_json(silent=True) or {}).get("version")
+    if version and version not in list_versions(config.MODEL_REGISTRY_DIR):
+        return jsonify({"error": f"Unknown model version {version}"}), 404
+    try:
+        if version:
+            activate_version(config.MODEL_REGISTRY_DIR, version)
+        served_version = active_model.reload(version)
+    except (OSError, ValueError) as e:
+        logger.error(f"Error reloading model version {version}: {e}", exc_info=True)
+        return jsonify({"error": f"Could not load model version: {e}"}), 400
+
+    return jsonify({"previous_version": previous, "model_version": served_version}), 200
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_route():
+    """
+    Route exposing request counts, error counts and per-stage latency histograms.
+
+    Returns:
+        Plain-text Prometheus exposition of every metric in this worker.
+    """
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats_route():
+    """
+    Route exposing result cache hit/miss counters.
+
+    Returns:
+        JSON response with cache statistics.
+    """
+    if cache is None:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"enabled": True, **cache.stats()}), 200
+
+
 if __name__ == "__main__":
     app.run(debug=True)
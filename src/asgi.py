@@ -0,0 +1,286 @@
+import asyncio
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from starlette.applications import Starlette
+from starlette.datastructures import UploadFile
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from werkzeug.datastructures import FileStorage
+
+from src import config
+from src.cache import ResultCache
+from src.classifier import classify_document, classify_document_incremental
+from src.file_io import DocumentTooLarge, UnsupportedDocument, inspect_document
+from src.logging_config import setup_logger
+from src.model_loader import load_model_artifacts
+from src.model_registry import ActiveModel
+
+logger = setup_logger("asgi", "./logs/asgi.log")
+
+# Per-process state of the classification pool, set up by _init_worker.
+_active_model = None
+_cache = None
+
+
+def _init_worker():
+    """
+    Loads the model in a pool process and warms it up. Model arrays are
+    memory-mapped (MODEL_MMAP_MODE), so the processes share their pages.
+    """
+    global _active_model, _cache
+    from src.serve import warm_up_classifier
+
+    _active_model = ActiveModel(
+        load_model_artifacts(),
+        registry_dir=config.MODEL_REGISTRY_DIR,
+        poll_seconds=config.MODEL_REGISTRY_POLL_SECONDS,
+    )
+    _cache = (
+        ResultCache(
+            max_entries=config.CACHE_MAX_ENTRIES,
+            ttl_seconds=config.CACHE_TTL_SECONDS,
+            db_path=config.CACHE_DB_PATH,
+        )
+        if config.CACHE_ENABLED
+        else None
+    )
+    warm_up_classifier(_active_model.current)
+
+
+def _ready():
+    return True
+
+
+def _create_pool(workers):
+    # Spawned, not forked: forking the server's threads and event loop is unsafe.
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+
+
+def _pool_broken(pool):
+    # Set once a pool process dies (OOM kill, crash in native code); the executor
+    # then refuses all work.
+    return bool(getattr(pool, "_broken", False))
+
+
+def _classification_pool(app):
+    """
+    Returns the app's process pool, first replacing it if a dead process broke it.
+    """
+    pool = app.state.pool
+    if _pool_broken(pool):
+        logger.error(f"Classification pool broken ({pool._broken}); restarting it")
+        pool.shutdown(wait=False, cancel_futures=True)
+        pool = app.state.pool = _create_pool(app.state.process_workers)
+        app.state.pool_restarts += 1
+    return pool
+
+
+def classify_upload(filename, data, early_exit=None):
+    """
+    Classifies uploaded bytes in a pool process.
+
+    ``early_exit`` holds the confidence_threshold and page_budget of an early
+    exit request, or is None for a full classification.
+
+    Returns:
+        dict: The /classify_file response body.
+
+    Raises:
+        DocumentRejected: When the upload is too large or not a supported type.
+    """
+    _active_model.maybe_reload()
+    served = _active_model.current
+    inspect_document(BytesIO(data), filename)
+    file = FileStorage(stream=BytesIO(data), filename=filename)
+    if early_exit is not None:
+        result = classify_document_incremental(
+            file, served.model, served.vectorizer, **early_exit
+        )
+        return {**result, "model_version": served.version}
+    file_class = classify_document(
+        file,
+        served.model,
+        served.vectorizer,
+        cache=_cache,
+        model_version=served.version,
+    )
+    return {"file_class": file_class, "model_version": served.version}
+
+
+def _query_number(request, name, cast):
+    """
+    Reads an optional numeric query parameter, raising ValueError when malformed.
+    """
+    value = request.query_params.get(name)
+    return cast(value) if value not in (None, "") else None
+
+
+class _RequestTooLarge(Exception):
+    pass
+
+
+def _limit_body(receive, limit):
+    """
+    Wraps an ASGI receive callable so that it raises _RequestTooLarge once more
+    than ``limit`` body bytes have arrived, whatever Content-Length claimed
+    (chunked uploads have none).
+    """
+    received = 0
+
+    async def limited_receive():
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > limit:
+                raise _RequestTooLarge(f"Request body over {limit} bytes")
+        return message
+
+    return limited_receive
+
+
+def _error(message, status_code):
+    return JSONResponse({"error": message}, status_code=status_code)
+
+
+async def classify_file(request: Request):
+    """
+    Route to classify an uploaded file, with the contract of the Flask
+    /classify_file route (including ``?early_exit=true``).
+
+    The multipart body is parsed as it arrives, spilling large files to disk
+    off the event loop, and refused once it outgrows MAX_UPLOAD_BYTES;
+    extraction and inference run in the process pool.
+
+    Returns:
+        JSON response with the predicted class or error message.
+    """
+    content_length = int(request.headers.get("content-length") or 0)
+    if config.MAX_UPLOAD_BYTES and content_length > config.MAX_UPLOAD_BYTES:
+        logger.warning(f"Request too large: {content_length} bytes")
+        return _error("Request too large", 413)
+    if config.MAX_UPLOAD_BYTES:
+        request = Request(
+            request.scope, _limit_body(request.receive, config.MAX_UPLOAD_BYTES)
+        )
+
+    early_exit = None
+    if request.query_params.get("early_exit", "").lower() in {"1", "true", "yes"}:
+        try:
+            early_exit = {
+                "confidence_threshold": _query_number(
+                    request, "confidence_threshold", float
+                ),
+                "page_budget": _query_number(request, "page_budget", int),
+            }
+        except ValueError:
+            return _error("Invalid early exit parameters", 400)
+
+    try:
+        try:
+            async with request.form() as form:
+                file = form.get("file")
+                if not isinstance(file, UploadFile):
+                    logger.warning("No file part in the request")
+                    return _error("No file part in the request", 400)
+                if not file.filename:
+                    logger.warning("No selected file")
+                    return _error("No selected file", 400)
+                data = await file.read()
+                filename = file.filename
+        except _RequestTooLarge as e:
+            logger.warning(f"Request too large: {e}")
+            return _error("Request too large", 413)
+
+        logger.info(f"Classifying file: {filename}")
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                _classification_pool(request.app),
+                classify_upload,
+                filename,
+                data,
+                early_exit,
+            )
+        except BrokenProcessPool:
+            logger.error(f"Classification process died on {filename}", exc_info=True)
+            _classification_pool(request.app)
+            return _error("An error occurred during classification", 500)
+        except DocumentTooLarge as e:
+            logger.warning(f"File too large: {e}")
+            return _error("File too large", 413)
+        except UnsupportedDocument:
+            logger.warning(f"File type not allowed: {filename}")
+            return _error("File type not allowed", 400)
+        logger.info(f"Classification result: {result}")
+        return JSONResponse(
+            result, headers={"X-Model-Version": result["model_version"]}
+        )
+
+    except Exception:
+        logger.error("Error during file classification", exc_info=True)
+        return _error("An error occurred during classification", 500)
+
+
+async def health(request: Request):
+    """
+    Route reporting liveness and the state of the classification pool: 503
+    while the pool is broken, until the next classification restarts it.
+    """
+    state = request.app.state
+    broken = _pool_broken(state.pool)
+    return JSONResponse(
+        {
+            "status": "unavailable" if broken else "ok",
+            "process_workers": state.process_workers,
+            "pool_restarts": state.pool_restarts,
+        },
+        status_code=503 if broken else 200,
+    )
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """
+    Starts the classification pool, with every process loaded and warmed up,
+    before the server takes requests, and shuts it down on exit.
+    """
+    workers = max(config.ASGI_PROCESS_WORKERS, 1)
+    pool = _create_pool(workers)
+    loop = asyncio.get_running_loop()
+    # Processes start on demand, so one task per worker starts them all; each
+    # loads and warms up in its initializer before it takes any task.
+    await asyncio.gather(*(loop.run_in_executor(pool, _ready) for _ in range(workers)))
+    logger.info(f"Classification pool ready with {workers} processes")
+    app.state.pool = pool
+    app.state.process_workers = workers
+    app.state.pool_restarts = 0
+    try:
+        yield
+    finally:
+        app.state.pool.shutdown(cancel_futures=True)
+
+
+app = Starlette(
+    routes=[
+        Route("/classify_file", classify_file, methods=["POST"]),
+        Route("/health", health, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    host, _, port = config.SERVER_BIND.rpartition(":")
+    uvicorn.run("src.asgi:app", host=host, port=int(port))
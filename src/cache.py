@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from src.logging_config import setup_logger
+from src.metrics import CACHE_LOOKUPS
+
+logger = setup_logger("cache", "./logs/cache.log")
+
+
+def file_fingerprint(*paths):
+    """
+    Returns a short content hash over one or more files, used as a model version.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+class ResultCache:
+    """
+    Content-addressed cache of extracted text and class probabilities.
+
+    Entries live in an in-process LRU tier bounded by size and TTL. When a
+    SQLite path is given, entries are also written through to disk so a
+    restarted worker keeps its hits. Expired disk rows are deleted when the
+    cache opens and every ``purge_every`` writes. The disk tier has its own
+    lock, so memory hits never wait on disk I/O, and a disk error (a database
+    locked by another worker, a corrupt row) is logged and treated as a miss.
+    A SQLite connection must not cross fork(), so a worker forked from a
+    preloading server opens its own.
+    """
+
+    def __init__(
+        self,
+        max_entries=1024,
+        ttl_seconds=24 * 60 * 60,
+        db_path=None,
+        purge_every=1000,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.purge_every = purge_every
+        self._writes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db = None
+        self._db_pid = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if db_path:
+            self._connect()
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS results_created ON results (created)"
+            )
+            self._db.commit()
+            self._purge_expired(self._db)
+            logger.info(f"Result cache disk tier opened at {db_path}")
+
+    def _connect(self):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db_pid = os.getpid()
+
+    def _database(self):
+        """
+        Returns this process's disk tier connection, or None without a disk tier.
+        """
+        if self._db is not None and self._db_pid != os.getpid():
+            self._connect()
+        return self._db
+
+    @staticmethod
+    def make_key(data, model_version):
+        """
+        Builds the cache key from the file bytes and the model/vectorizer version.
+        """
+        return f"{hashlib.sha256(data).hexdigest()}:{model_version}"
+
+    def _expired(self, created):
+        return self.ttl_seconds is not None and time.time() - created > self.ttl_seconds
+
+    def _purge_expired(self, db):
+        """
+        Deletes disk rows older than the TTL; a failure leaves them for the next purge.
+        """
+        if self.ttl_seconds is None:
+            return
+        try:
+            deleted = db.execute(
+                "DELETE FROM results WHERE created < ?",
+                (time.time() - self.ttl_seconds,),
+            ).rowcount
+            db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error purging expired cache entries: {e}", exc_info=True)
+            return
+        if deleted:
+            logger.info(f"Purged {deleted} expired entries from the disk tier")
+
+    def _disk_get(self, key):
+        """
+        Returns the (value, created) row stored on disk for a key, or None.
+        """
+        with self._db_lock:
+            db = self._database()
+            if db is None:
+                return None
+            try:
+                row = db.execute(
+                    "SELECT value, created FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or self._expired(row[1]):
+                    return None
+                return json.loads(row[0]), row[1]
+            except (sqlite3.Error, ValueError) as e:
+                logger.error(f"Error reading cache entry from disk: {e}", exc_info=True)
+                return None
+
+    def get(self, key):
+        """
+        Returns the cached value for a key, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, created = entry
+                if not self._expired(created):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    CACHE_LOOKUPS.inc(result="hit", tier="memory")
+                    return value
+                del self._entries[key]
+
+        row = self._disk_get(key)
+        with self._lock:
+            if row is not None:
+                value, created = row
+                self._store_in_memory(key, value, created)
+                self.hits += 1
+                self.disk_hits += 1
+                CACHE_LOOKUPS.inc(result="hit", tier="disk")
+                return value
+
+            self.misses += 1
+            CACHE_LOOKUPS.inc(result="miss", tier="none")
+            return None
+
+    def set(self, key, value):
+        """
+        Stores a JSON-serializable value under a key in every tier.
+        """
+        created = time.time()
+        with self._lock:
+            self._store_in_memory(key, value, created)
+        with self._db_lock:
+            db = self._database()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, created) "
+                    "VALUES (?, ?, ?)",
+                    (key, json.dumps(value), created),
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Error writing cache entry to disk: {e}", exc_info=True)
+                return
+            self._writes += 1
+            if self.purge_every and self._writes % self.purge_every == 0:
+                self._purge_expired(db)
+
+    def _store_in_memory(self, key, value, created):
+        self._entries[key] = (value, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Returns hit/miss counters and the current in-memory size.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
@@ -1,12 +1,65 @@
-import os
+import logging
+import time
+from contextlib import closing
 
-from src.file_io import extract_text_with_fallback, preprocess_text
+from src import config
+from src.file_io import (ALLOWED_EXTENSIONS, ArchiveTooLarge, DocumentRejected,
+                         DocumentTooLarge, extract_archive_members,
+                         extract_text_with_fallback, get_extension,
+                         inspect_document, is_archive, iter_text_chunks,
+                         preprocess_text)
 from src.logging_config import setup_logger
+from src.metrics import (CLASSIFICATION_ERRORS, DOCUMENT_SECONDS,
+                         DOCUMENTS_CLASSIFIED, STAGE_SECONDS)
 
 logger = setup_logger("classifier", "./logs/classifier.log")
 
 
-def classify_document(file, model, vectorizer):
+def _metric_extension(filename):
+    """
+    Returns the extension to label metrics with: the filename's extension when
+    it is an allowed one, "other" otherwise, so client-chosen filenames cannot
+    add series without bound.
+    """
+    extension = get_extension(filename)
+    return extension if extension in ALLOWED_EXTENSIONS else "other"
+
+
+def _predict_probabilities(texts, model, vectorizer, extension="batch"):
+    """
+    Scores preprocessed texts in one vectorizer/model pass.
+
+    Returns:
+        list[dict]: One {label: probability} mapping per text, in model class order.
+    """
+    with STAGE_SECONDS.time(stage="vectorize", extension=extension):
+        features = vectorizer.transform(texts)
+    with STAGE_SECONDS.time(stage="predict", extension=extension):
+        probabilities = model.predict_proba(features)
+    classes = [str(label) for label in model.classes_]
+    return [dict(zip(classes, row.tolist())) for row in probabilities]
+
+
+def _record_result(extension, file_class, started):
+    """
+    Counts a classified document and observes its end-to-end latency.
+    """
+    DOCUMENTS_CLASSIFIED.inc(extension=extension, file_class=file_class)
+    DOCUMENT_SECONDS.observe(
+        time.perf_counter() - started, extension=extension, file_class=file_class
+    )
+
+
+def _top_label(probabilities):
+    """
+    Returns the most probable label from a {label: probability} mapping.
+    """
+    return max(probabilities, key=probabilities.get)
+
+
+def classify_document(
+    file, model, vectorizer, cache=None, model_version="", shadow=None
+):
     """
     Classify a document by extracting its text, preprocessing it, and using the model to predict its class.
 
@@ -14,41 +67,298 @@ def classify_document(file, model, vectorizer):
         file: Uploaded file object.
         model: Trained classification model.
         vectorizer: Pretrained vectorizer for text transformation.
+        cache: Optional ResultCache keyed on the file bytes and model_version.
+        model_version: Version of the model/vectorizer pair, part of the cache key.
+        shadow: Optional ShadowScorer that re-scores a sample of the preprocessed
+            text with a candidate model in the background.
 
     Returns:
         str: Predicted label of the document.
     """
-    temp_path = f"/tmp/{file.filename}"
+    started = time.perf_counter()
+    extension = _metric_extension(file.filename)
     try:
-        file.save(temp_path)
-        logger.info(f"File saved temporarily: {temp_path}")
+        with STAGE_SECONDS.time(stage="read_upload", extension=extension):
+            data = file.read()
 
-        text = extract_text_with_fallback(temp_path)
+        with STAGE_SECONDS.time(stage="cache_lookup", extension=extension):
+            cache_key = (
+                cache.make_key(data, model_version) if cache is not None else None
+            )
+            cached = cache.get(cache_key) if cache is not None else None
+        if cached is not None:
+            logger.info(f"Cache hit for file: {file.filename}")
+            predicted_label = _top_label(cached["probabilities"])
+            if shadow is not None:
+                shadow.submit(cached["text"], cached["probabilities"], model_version)
+            _record_result(extension, predicted_label, started)
+            return predicted_label
+
+        # Extract straight from the upload bytes: nothing is written to disk.
+        with STAGE_SECONDS.time(stage="extract", extension=extension):
+            text = extract_text_with_fallback(data, filename=file.filename)
         if not text:
-            logger.warning(f"No text extracted from file: {temp_path}")
+            logger.warning(f"No text extracted from file: {file.filename}")
+            _record_result(extension, "Unknown", started)
             return "Unknown"
 
-        preprocessed_text = preprocess_text(text)
-        logger.debug(f"Preprocessed text: {preprocessed_text}")
+        with STAGE_SECONDS.time(stage="preprocess", extension=extension):
+            preprocessed_text = preprocess_text(text)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Preprocessed text: {preprocessed_text}")
 
-        text_tfidf = vectorizer.transform([preprocessed_text])
+        probabilities_results = _predict_probabilities(
+            [preprocessed_text], model, vectorizer, extension=extension
+        )[0]
+        predicted_label = _top_label(probabilities_results)
 
-        probabilities = model.predict_proba(text_tfidf)[0]
-        probabilities_results = dict(zip(model.classes_, probabilities))
-        predicted_label = model.classes_[probabilities.argmax()]
+        logger.info(
+            f"Predicted Label: {predicted_label} (Class Probabilities: "
+            + ", ".join(
+                f"{label}: {prob:.2f}" for label, prob in probabilities_results.items()
+            )
+            + ")"
+        )
 
-        logger.info(f"Predicted Label: {predicted_label}")
-        logger.info("Class Probabilities:")
-        for label, prob in probabilities_results.items():
-            logger.info(f"  {label}: {prob:.2f}")
+        if cache is not None:
+            cache.set(
+                cache_key,
+                {"text": preprocessed_text, "probabilities": probabilities_results},
+            )
+        if shadow is not None:
+            shadow.submit(preprocessed_text, probabilities_results, model_version)
 
+        _record_result(extension, predicted_label, started)
         return predicted_label
 
     except Exception as e:
         logger.error(f"Error during document classification: {e}", exc_info=True)
+        CLASSIFICATION_ERRORS.inc(extension=extension)
         return "Error"
 
-    finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-            logger.info(f"Temporary file deleted: {temp_path}")
+
+def classify_document_incremental(
+    file,
+    model,
+    vectorizer,
+    confidence_threshold=None,
+    page_budget=None,
+    chunk_pages=None,
+):
+    """
+    Classify a document from its first pages only, re-scoring the text read so far
+    after every chunk and stopping once the top class is confident enough.
+
+    Args:
+        file: Uploaded file object.
+        model: Trained classification model.
+        vectorizer: Pretrained vectorizer for text transformation.
+        confidence_threshold: Top-class probability that ends reading early.
+        page_budget: Max pages to read before giving the current best guess.
+        chunk_pages: Pages extracted between two scoring passes.
+
+    Returns:
+        dict: "file_class", plus "pages_consumed" and the top-class "confidence".
+    """
+    if confidence_threshold is None:
+        confidence_threshold = config.EARLY_EXIT_CONFIDENCE
+    if page_budget is None:
+        page_budget = config.EARLY_EXIT_PAGE_BUDGET
+    if chunk_pages is None:
+        chunk_pages = config.EARLY_EXIT_CHUNK_PAGES
+
+    text_so_far = []
+    pages_consumed = 0
+    probabilities_results = None
+    try:
+        chunks = iter_text_chunks(
+            file.read(), filename=file.filename, chunk_pages=chunk_pages
+        )
+        with closing(chunks):
+            for chunk_text, chunk_page_count in chunks:
+                pages_consumed += chunk_page_count
+                text_so_far.append(chunk_text)
+                preprocessed_text = preprocess_text("".join(text_so_far))
+                if preprocessed_text:
+                    probabilities_results = _predict_probabilities(
+                        [preprocessed_text],
+                        model,
+                        vectorizer,
+                        extension=_metric_extension(file.filename),
+                    )[0]
+                    confidence = max(probabilities_results.values())
+                    logger.debug(
+                        f"{file.filename}: {pages_consumed} pages read, "
+                        f"top class confidence {confidence:.2f}"
+                    )
+                    if confidence >= confidence_threshold:
+                        break
+                if page_budget and pages_consumed >= page_budget:
+                    break
+
+        if probabilities_results is None:
+            logger.warning(f"No text extracted from file: {file.filename}")
+            return {"file_class": "Unknown", "pages_consumed": pages_consumed}
+
+        predicted_label = _top_label(probabilities_results)
+        logger.info(
+            f"Predicted Label: {predicted_label} after {pages_consumed} pages "
+            f"(confidence {probabilities_results[predicted_label]:.2f})"
+        )
+        return {
+            "file_class": predicted_label,
+            "pages_consumed": pages_consumed,
+            "confidence": probabilities_results[predicted_label],
+        }
+
+    except Exception as e:
+        logger.error(f"Error during incremental classification: {e}", exc_info=True)
+        CLASSIFICATION_ERRORS.inc(extension=_metric_extension(file.filename))
+        return {"file_class": "Error", "pages_consumed": pages_consumed}
+
+
+def _expand_uploads(files, max_documents=None):
+    """
+    Reads uploaded files into (filename, bytes, error) entries, expanding archives in place.
+
+    Raises:
+        ArchiveTooLarge: If an archive's members would take the batch past max_documents.
+    """
+    entries = []
+    for file in files:
+        filename = file.filename or ""
+        try:
+            data = file.read()
+            if is_archive(filename):
+                remaining = (
+                    None if max_documents is None else max_documents - len(entries)
+                )
+                entries.extend(
+                    (
+                        name,
+                        member_data,
+                        None if member_data is not None else "File too large",
+                    )
+                    for name, member_data in extract_archive_members(
+                        data, filename, max_members=remaining
+                    )
+                )
+            else:
+                entries.append((filename, data, None))
+        except ArchiveTooLarge:
+            raise
+        except Exception as e:
+            logger.error(f"Error reading upload {filename}: {e}", exc_info=True)
+            entries.append((filename, None, "Could not read file"))
+    return entries
+
+
+def classify_documents(
+    files,
+    model,
+    vectorizer,
+    max_documents=None,
+    cache=None,
+    model_version="",
+    shadow=None,
+):
+    """
+    Classify a batch of documents, running a single vectorizer transform and model prediction
+    over every document that yielded text.
+
+    Args:
+        files: Uploaded file objects; zip/tar archives are expanded into their members.
+        model: Trained classification model.
+        vectorizer: Pretrained vectorizer for text transformation.
+        max_documents: Optional cap on the number of documents after archive expansion.
+        cache: Optional ResultCache keyed on the file bytes and model_version.
+        model_version: Version of the model/vectorizer pair, part of the cache key.
+        shadow: Optional ShadowScorer that re-scores a sample of the documents.
+
+    Returns:
+        list[dict]: One result per document, in input order, holding either a
+        "file_class" or an "error" alongside the "filename".
+
+    Raises:
+        ValueError: If the expanded batch exceeds max_documents.
+    """
+    entries = _expand_uploads(files, max_documents)
+    if max_documents is not None and len(entries) > max_documents:
+        raise ValueError(
+            f"Batch holds {len(entries)} documents, max is {max_documents}"
+        )
+
+    results = [{"filename": filename} for filename, _, _ in entries]
+    texts, indices, cache_keys = [], [], []
+
+    for index, (filename, data, error) in enumerate(entries):
+        if error:
+            results[index]["error"] = error
+            continue
+        try:
+            file_type = inspect_document(data, filename)
+        except DocumentRejected as e:
+            logger.warning(f"Document rejected in batch: {e}")
+            results[index]["error"] = (
+                "File too large"
+                if isinstance(e, DocumentTooLarge)
+                else "File type not allowed"
+            )
+            continue
+
+        cache_key = cache.make_key(data, model_version) if cache is not None else None
+        cached = cache.get(cache_key) if cache is not None else None
+        if cached is not None:
+            results[index]["file_class"] = _top_label(cached["probabilities"])
+            if shadow is not None:
+                shadow.submit(cached["text"], cached["probabilities"], model_version)
+            continue
+
+        try:
+            text = extract_text_with_fallback(
+                data, filename=filename, file_type=file_type
+            )
+        except Exception as e:
+            logger.error(f"Error extracting text from {filename}: {e}", exc_info=True)
+            results[index]["error"] = "Error during text extraction"
+            continue
+
+        if not text:
+            logger.warning(f"No text extracted from file: {filename}")
+            results[index]["file_class"] = "Unknown"
+            continue
+
+        texts.append(preprocess_text(text))
+        indices.append(index)
+        cache_keys.append(cache_key)
+
+    if texts:
+        try:
+            probabilities = _predict_probabilities(texts, model, vectorizer)
+            for index, text, cache_key, probabilities_results in zip(
+                indices, texts, cache_keys, probabilities
+            ):
+                results[index]["file_class"] = _top_label(probabilities_results)
+                if cache is not None:
+                    cache.set(
+                        cache_key,
+                        {"text": text, "probabilities": probabilities_results},
+                    )
+                if shadow is not None:
+                    shadow.submit(text, probabilities_results, model_version)
+        except Exception as e:
+            logger.error(f"Error during batch classification: {e}", exc_info=True)
+            for index in indices:
+                results[index]["error"] = "Error during classification"
+
+    for result in results:
+        extension = _metric_extension(result["filename"])
+        if "file_class" in result:
+            DOCUMENTS_CLASSIFIED.inc(
+                extension=extension, file_class=result["file_class"]
+            )
+        else:
+            CLASSIFICATION_ERRORS.inc(extension=extension)
+
+    logger.info(f"Batch classified: {len(texts)} of {len(entries)} documents scored")
+    return results
@@ -0,0 +1,122 @@
+import os
+from typing import Optional
+
+
+def _env_int(name, default):
+    """
+    Reads an integer setting from the environment.
+    """
+    value = os.environ.get(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name, default):
+    """
+    Reads a float setting from the environment.
+    """
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name, default):
+    """
+    Reads a boolean setting ("1", "true", "yes", "on") from the environment.
+    """
+    value = os.environ.get(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+# Logging: LOG_QUEUE moves formatting and disk writes to a background thread.
+LOG_QUEUE = _env_bool("LOG_QUEUE", False)
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()
+LOG_DEBUG_SAMPLE_RATE = _env_float("LOG_DEBUG_SAMPLE_RATE", 1.0)
+
+MODEL_PATH = os.environ.get("MODEL_PATH", "./src/models/text_classifier.pkl")
+VECTORIZER_PATH = os.environ.get("VECTORIZER_PATH", "./src/models/tfidf_vectorizer.pkl")
+# joblib/NumPy mmap mode for model arrays ("r" shares pages across forked workers,
+# "none" loads private copies).
+_mmap_mode = os.environ.get("MODEL_MMAP_MODE", "r")
+MODEL_MMAP_MODE: Optional[str] = None if _mmap_mode.lower() == "none" else _mmap_mode
+
+# Lean NumPy scorer exported by `python -m src.inference`, used instead of sklearn when enabled.
+USE_INFERENCE_BUNDLE = _env_bool("USE_INFERENCE_BUNDLE", False)
+INFERENCE_BUNDLE_DIR = os.environ.get(
+    "INFERENCE_BUNDLE_DIR", "./src/models/inference_bundle"
+)
+
+# Versioned model registry: when set, the version named by <dir>/CURRENT is served
+# instead of MODEL_PATH/VECTORIZER_PATH, and workers follow CURRENT every
+# MODEL_REGISTRY_POLL_SECONDS (0 disables polling).
+MODEL_REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR") or None
+MODEL_REGISTRY_POLL_SECONDS = _env_float("MODEL_REGISTRY_POLL_SECONDS", 5)
+# Shadow scoring: a registry version scored in the background on a sample of
+# requests, for agreement metrics only; its predictions are never returned.
+SHADOW_MODEL_VERSION = os.environ.get("SHADOW_MODEL_VERSION") or None
+SHADOW_SAMPLE_RATE = _env_float("SHADOW_SAMPLE_RATE", 0.1)
+SHADOW_QUEUE_SIZE = _env_int("SHADOW_QUEUE_SIZE", 1000)
+# Shared secret for /admin endpoints (X-Admin-Token header); unset disables them.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN") or None
+
+# Request profiling (see src/profiling.py): a PROFILE_SAMPLE_RATE fraction of
+# classification requests, plus any sent with "X-Profile: true" and the admin
+# token, are stack-sampled every PROFILE_INTERVAL_MS and stored under PROFILE_DIR.
+PROFILE_SAMPLE_RATE = _env_float("PROFILE_SAMPLE_RATE", 0.0)
+PROFILE_INTERVAL_MS = _env_float("PROFILE_INTERVAL_MS", 5)
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "./profiles")
+
+# Result cache: in-process LRU tier, plus an optional SQLite tier when a path is set.
+CACHE_ENABLED = _env_bool("CACHE_ENABLED", True)
+CACHE_MAX_ENTRIES = _env_int("CACHE_MAX_ENTRIES", 1024)
+CACHE_TTL_SECONDS = _env_float("CACHE_TTL_SECONDS", 24 * 60 * 60)
+CACHE_DB_PATH = os.environ.get("CACHE_DB_PATH") or None
+
+# Production server (`python -m src.serve`): gunicorn workers forked from a master
+# that loaded the model, each serving SERVER_THREADS requests at a time. Request
+# bodies above MAX_UPLOAD_BYTES are refused with 413 (0 disables the cap).
+SERVER_BIND = os.environ.get("SERVER_BIND", "127.0.0.1:5000")
+SERVER_WORKERS = _env_int("SERVER_WORKERS", os.cpu_count() or 1)
+SERVER_THREADS = _env_int("SERVER_THREADS", 4)
+SERVER_TIMEOUT_SECONDS = _env_int("SERVER_TIMEOUT_SECONDS", 120)
+MAX_UPLOAD_BYTES = _env_int("MAX_UPLOAD_BYTES", 0)
+# ASGI server (`python -m src.asgi`): one event loop on SERVER_BIND takes the uploads
+# and hands extraction and inference to a pool of ASGI_PROCESS_WORKERS processes.
+ASGI_PROCESS_WORKERS = _env_int("ASGI_PROCESS_WORKERS", os.cpu_count() or 1)
+
+# Documents larger than this many bytes are rejected before parsing; 0 disables the cap.
+MAX_DOCUMENT_BYTES = _env_int("MAX_DOCUMENT_BYTES", 50 * 1024 * 1024)
+
+# OCR of image-only PDF pages: Tesseract runs on a shared, bounded thread pool.
+OCR_MAX_WORKERS = _env_int("OCR_MAX_WORKERS", min(4, os.cpu_count() or 1))
+OCR_MAX_PAGES = _env_int("OCR_MAX_PAGES", 200)
+# Image preprocessing before Tesseract (see src/ocr_preprocessing.py). Scanned PDF
+# pages are rendered at OCR_RENDER_DPI, and every OCR input is held to OCR_MAX_PIXELS.
+OCR_PREPROCESS = _env_bool("OCR_PREPROCESS", True)
+OCR_RENDER_DPI = _env_int("OCR_RENDER_DPI", 200)
+OCR_MAX_PIXELS = _env_int("OCR_MAX_PIXELS", 4_000_000)
+OCR_DESKEW = _env_bool("OCR_DESKEW", False)
+OCR_CROP_MARGINS = _env_bool("OCR_CROP_MARGINS", True)
+OCR_BINARIZE = _env_bool("OCR_BINARIZE", False)
+# OCR engine (see src/ocr_backends.py): "pytesseract" spawns the tesseract binary per
+# image; "tesserocr" keeps a pool of in-process engines (OCR_ENGINE_POOL_SIZE, 0 for
+# OCR_MAX_WORKERS) with the language model loaded once.
+OCR_BACKEND = os.environ.get("OCR_BACKEND", "pytesseract").lower()
+OCR_ENGINE_POOL_SIZE = _env_int("OCR_ENGINE_POOL_SIZE", 0)
+OCR_LANG = os.environ.get("OCR_LANG", "eng")
+OCR_TESSDATA_PATH = os.environ.get("OCR_TESSDATA_PATH") or None
+
+# Early-exit classification: read PDFs chunk by chunk and stop once confident.
+EARLY_EXIT_CONFIDENCE = _env_float("EARLY_EXIT_CONFIDENCE", 0.9)
+EARLY_EXIT_PAGE_BUDGET = _env_int("EARLY_EXIT_PAGE_BUDGET", 10)
+EARLY_EXIT_CHUNK_PAGES = _env_int("EARLY_EXIT_CHUNK_PAGES", 1)
+
+# Asynchronous jobs: bounded queue drained by background worker threads.
+JOB_WORKERS = _env_int("JOB_WORKERS", 2)
+JOB_QUEUE_SIZE = _env_int("JOB_QUEUE_SIZE", 100)
+JOB_RESULT_TTL_SECONDS = _env_float("JOB_RESULT_TTL_SECONDS", 60 * 60)
+# Jobs unfinished this long after submission are reported failed.
+JOB_TIMEOUT_SECONDS = _env_float("JOB_TIMEOUT_SECONDS", 10 * 60)
+# SQLite file holding job state, shared by every worker process; unset keeps it in
+# process (python -m src.serve then picks a temporary file when it forks workers).
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH") or None
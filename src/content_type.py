@@ -0,0 +1,89 @@
+from src.logging_config import setup_logger
+
+logger = setup_logger("content_type", "./logs/content_type.log")
+
+# Bytes read from the start of a document to detect its type.
+SNIFF_BYTES = 8192
+
+# Detected MIME type -> file type, which picks the extractor in src.file_io.
+MIME_FILE_TYPES = {
+    "application/pdf": "pdf",
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/pjpeg": "jpg",
+    "image/tiff": "tiff",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+    "text/plain": "txt",
+    "text/html": "html",
+    "message/rfc822": "eml",
+}
+# Extensions trusted to refine a generic detection: Office files whose zip
+# entries lie past the sniffed head, and HTML fragments or emails that
+# libmagic only recognises as plain text.
+EXTENSION_HINTS = {
+    "application/zip": {"docx": "docx", "xlsx": "xlsx"},
+    "application/octet-stream": {"docx": "docx", "xlsx": "xlsx"},
+    "text/plain": {"html": "html", "htm": "html", "eml": "eml"},
+}
+
+# Used when libmagic is not installed: (offset, signature, MIME type).
+SIGNATURES = (
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"II*\x00", "image/tiff"),
+    (0, b"MM\x00*", "image/tiff"),
+    (0, b"PK\x03\x04", "application/zip"),
+)
+
+
+def _signature_mime(head):
+    """
+    Detects a MIME type from the SIGNATURES table; anything else without NUL
+    bytes is taken as text.
+    """
+    for offset, signature, mime_type in SIGNATURES:
+        if head[offset : offset + len(signature)] == signature:
+            return mime_type
+    if b"\x00" in head:
+        return "application/octet-stream"
+    start = head.lstrip()[:64].lower()
+    if start.startswith((b"<!doctype html", b"<html")):
+        return "text/html"
+    return "text/plain"
+
+
+def sniff_mime(head):
+    """
+    Returns the MIME type of a document from its first bytes, using libmagic
+    (python-magic) when it is available.
+    """
+    try:
+        import magic
+    except ImportError:
+        return _signature_mime(head)
+    return magic.from_buffer(head, mime=True)
+
+
+def detect_file_type(head, filename=None):
+    """
+    Returns the file type of a document from its first SNIFF_BYTES bytes, or
+    None when the content is not a supported type.
+
+    The filename extension is only consulted to refine a generic detection,
+    so a mislabelled file is still parsed by the extractor for its content.
+    """
+    if not head:
+        return None
+    mime_type = sniff_mime(bytes(head[:SNIFF_BYTES]))
+    file_type = MIME_FILE_TYPES.get(mime_type)
+    extension = (
+        filename.rsplit(".", 1)[1].lower() if filename and "." in filename else ""
+    )
+    file_type = EXTENSION_HINTS.get(mime_type, {}).get(extension, file_type)
+    if file_type is None:
+        logger.warning(f"Unsupported content type {mime_type} for {filename}")
+    elif extension and extension != file_type:
+        logger.debug(f"{filename} sniffed as {mime_type}, parsing as {file_type}")
+    return file_type
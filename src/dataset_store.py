@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+from array import array
+
+import numpy as np
+
+from src.file_io import preprocess_text
+from src.logging_config import setup_logger
+
+logger = setup_logger("dataset_store", "./logs/dataset_store.log")
+
+FORMAT_VERSION = 1
+
+
+def _iter_json_records(dataset_file):
+    """
+    Yields (text, label, source) from a dataset.json array or a dataset.jsonl file.
+    """
+    with open(dataset_file, "r", encoding="utf-8") as f:
+        if dataset_file.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record["text"], record["label"], record.get("source", "")
+        else:
+            for text, label in json.load(f):
+                yield text, label, ""
+
+
+def write_dataset_store(records, output_dir):
+    """
+    Writes (text, label, source) records to a columnar offsets+blob dataset directory.
+
+    Texts are normalized with preprocess_text once here, so training never has
+    to re-run it. Records are streamed to disk, so the input can be larger than
+    memory. The directory holds:
+
+    - texts.bin / text_offsets.npy: UTF-8 texts back to back, and n + 1 offsets.
+    - sources.bin / source_offsets.npy: the same for source paths.
+    - labels.npy: int32 label codes indexing meta.json "labels".
+
+    Returns:
+        int: Number of records written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    text_offsets, source_offsets = array("q", [0]), array("q", [0])
+    label_codes = array("i")
+    label_index = {}
+
+    with open(os.path.join(output_dir, "texts.bin"), "wb") as texts_out, open(
+        os.path.join(output_dir, "sources.bin"), "wb"
+    ) as sources_out:
+        for text, label, source in records:
+            encoded_text = preprocess_text(text).encode("utf-8")
+            encoded_source = (source or "").encode("utf-8")
+            texts_out.write(encoded_text)
+            sources_out.write(encoded_source)
+            text_offsets.append(text_offsets[-1] + len(encoded_text))
+            source_offsets.append(source_offsets[-1] + len(encoded_source))
+            label_codes.append(label_index.setdefault(label, len(label_index)))
+
+    np.save(
+        os.path.join(output_dir, "text_offsets.npy"),
+        np.frombuffer(text_offsets, dtype=np.int64),
+    )
+    np.save(
+        os.path.join(output_dir, "source_offsets.npy"),
+        np.frombuffer(source_offsets, dtype=np.int64),
+    )
+    np.save(
+        os.path.join(output_dir, "labels.npy"),
+        np.frombuffer(label_codes, dtype=np.int32),
+    )
+    with open(os.path.join(output_dir, "meta.json"), "w") as f:
+        json.dump(
+            {
+                "format_version": FORMAT_VERSION,
+                "count": len(label_codes),
+                "labels": list(label_index),
+            },
+            f,
+            indent=4,
+        )
+
+    logger.info(f"Wrote {len(label_codes)} records to dataset store {output_dir}")
+    return len(label_codes)
+
+
+class DatasetStore:
+    """
+    Read-only, memory-mapped view over a dataset directory from write_dataset_store.
+
+    Nothing is loaded up front: texts are decoded from the mapped blob only when
+    a record or batch is read.
+    """
+
+    def __init__(self, store_dir):
+        with open(os.path.join(store_dir, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["format_version"] != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported dataset store version {meta['format_version']}"
+            )
+
+        self.store_dir = store_dir
+        self.label_names = np.asarray(meta["labels"])
+        self.text_offsets = np.load(
+            os.path.join(store_dir, "text_offsets.npy"), mmap_mode="r"
+        )
+        self.source_offsets = np.load(
+            os.path.join(store_dir, "source_offsets.npy"), mmap_mode="r"
+        )
+        self.label_codes = np.load(os.path.join(store_dir, "labels.npy"), mmap_mode="r")
+        self._texts = self._map_blob("texts.bin")
+        self._sources = self._map_blob("sources.bin")
+
+    def _map_blob(self, name):
+        path = os.path.join(self.store_dir, name)
+        # np.memmap cannot map an empty file.
+        if os.path.getsize(path) == 0:
+            return np.empty(0, dtype=np.uint8)
+        return np.memmap(path, dtype=np.uint8, mode="r")
+
+    def __len__(self):
+        return len(self.label_codes)
+
+    def text(self, index):
+        start, end = self.text_offsets[index], self.text_offsets[index + 1]
+        return self._texts[start:end].tobytes().decode("utf-8")
+
+    def source(self, index):
+        start, end = self.source_offsets[index], self.source_offsets[index + 1]
+        return self._sources[start:end].tobytes().decode("utf-8")
+
+    def __getitem__(self, index):
+        """
+        Returns the (text, label) pair at an index.
+        """
+        return self.text(index), str(self.label_names[self.label_codes[index]])
+
+    @property
+    def labels(self):
+        """
+        Returns every label as an array of strings.
+        """
+        return self.label_names[np.asarray(self.label_codes)]
+
+    def iter_batches(self, batch_size=1024, indices=None):
+        """
+        Yields (texts, labels) lists of up to batch_size records, in index order.
+        """
+        indices = range(len(self)) if indices is None else indices
+        for start in range(0, len(indices), batch_size):
+            batch = indices[start : start + batch_size]
+            yield [self.text(i) for i in batch], [
+                str(label) for label in self.label_names[self.label_codes[batch]]
+            ]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+def convert_json_to_store(dataset_file, output_dir):
+    """
+    Converts dataset.json or dataset.jsonl into a dataset store directory.
+    """
+    return write_dataset_store(_iter_json_records(dataset_file), output_dir)
+
+
+def convert_store_to_json(store_dir, dataset_file):
+    """
+    Converts a dataset store back to dataset.json (array) or dataset.jsonl records.
+    """
+    store = DatasetStore(store_dir)
+    with open(dataset_file, "w", encoding="utf-8") as f:
+        if dataset_file.endswith(".jsonl"):
+            for index in range(len(store)):
+                text, label = store[index]
+                record = {"text": text, "label": label, "source": store.source(index)}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            json.dump(
+                [list(record) for record in store], f, ensure_ascii=False, indent=4
+            )
+    logger.info(f"Exported {len(store)} records from {store_dir} to {dataset_file}")
+    return len(store)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert between dataset.json/.jsonl and the memory-mapped dataset store."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    to_store = subparsers.add_parser("to-store")
+    to_store.add_argument("dataset_file")
+    to_store.add_argument("store_dir")
+    to_json = subparsers.add_parser("to-json")
+    to_json.add_argument("store_dir")
+    to_json.add_argument("dataset_file")
+    args = parser.parse_args()
+
+    if args.command == "to-store":
+        convert_json_to_store(args.dataset_file, args.store_dir)
+    else:
+        convert_store_to_json(args.store_dir, args.dataset_file)
@@ -1,22 +1,98 @@
+import importlib
+import io
+import os
 import re
+import tarfile
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-import fitz
-import pandas as pd
-import pytesseract
-from docx import Document
-from PIL import Image
-
+from src import config
+from src.content_type import SNIFF_BYTES, detect_file_type
 from src.logging_config import setup_logger
+from src.metrics import EXTRACTION_SECONDS, OCR_SECONDS
 
 logger = setup_logger("file_io", "./logs/file_io.log")
 
 
-ALLOWED_EXTENSIONS = {"pdf", "png", "jpg", "docx", "xlsx"}
+ALLOWED_EXTENSIONS = {
+    "pdf",
+    "png",
+    "jpg",
+    "jpeg",
+    "jfif",
+    "tif",
+    "tiff",
+    "docx",
+    "xlsx",
+    "txt",
+    "html",
+    "htm",
+    "eml",
+}
+ARCHIVE_EXTENSIONS = {"zip", "tar", "tgz", "gz"}
+
+# Extractor backends (fitz, PIL, python-docx, pandas, BeautifulSoup and the OCR
+# engine) are imported inside the functions that use them, so each is only loaded
+# the first time a file of its type is seen instead of on every import of this module.
+BACKEND_MODULES = {
+    "pdf": ("fitz", "PIL.Image"),
+    "png": ("PIL.Image",),
+    "jpg": ("PIL.Image",),
+    "tiff": ("PIL.Image",),
+    "docx": ("docx",),
+    "xlsx": ("pandas", "openpyxl"),
+    "html": ("bs4",),
+    "eml": ("email.parser", "bs4"),
+}
+OCR_FILE_TYPES = {"pdf", "png", "jpg", "tiff"}
+
+
+class DocumentRejected(ValueError):
+    """
+    Raised when a document is refused before any parsing or OCR.
+    """
+
+
+class UnsupportedDocument(DocumentRejected):
+    pass
+
+
+class DocumentTooLarge(DocumentRejected):
+    pass
+
+
+class ArchiveTooLarge(DocumentRejected):
+    pass
+
+
+_ocr_executor = None
+_ocr_executor_lock = threading.Lock()
+
+
+def warm_up_backends(extensions=None, start_ocr=True):
+    """
+    Imports the extractor backends for the given file types (all by default) ahead of use.
+
+    Formats that may need OCR also start the configured OCR engine, unless
+    ``start_ocr`` is False; it then starts on first use.
+    """
+    for extension in extensions or BACKEND_MODULES:
+        for module_name in BACKEND_MODULES.get(extension, ()):
+            importlib.import_module(module_name)
+    if start_ocr and OCR_FILE_TYPES.intersection(extensions or BACKEND_MODULES):
+        from src.ocr_backends import get_ocr_backend
+
+        get_ocr_backend().warm_up()
+    logger.debug(f"Extractor backends warmed up for: {extensions or 'all formats'}")
 
 
 def allowed_file(filename):
     """
     Checks if a file has an allowed extension.
+
+    The extension only pre-filters; the parser is picked from the content (see inspect_document).
     """
     result = (
         "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -25,109 +101,555 @@ def allowed_file(filename):
     return result
 
 
-def extract_text_with_fallback(file_path):
+def is_archive(filename):
+    """
+    Checks if a file is a zip or tar archive that can be expanded into a batch.
+    """
+    return "." in filename and filename.rsplit(".", 1)[1].lower() in ARCHIVE_EXTENSIONS
+
+
+def get_extension(filename):
+    """
+    Returns the lower-cased extension of a filename, or "" when it has none.
+    """
+    return filename.rsplit(".", 1)[1].lower() if filename and "." in filename else ""
+
+
+def _member_fits(name, size):
+    """
+    Checks an archive member's declared size against config.MAX_DOCUMENT_BYTES.
+    """
+    if config.MAX_DOCUMENT_BYTES and size > config.MAX_DOCUMENT_BYTES:
+        logger.warning(
+            f"Archive member {name} is {size} bytes, max is {config.MAX_DOCUMENT_BYTES}"
+        )
+        return False
+    return True
+
+
+def _check_member_count(filename, count, max_members):
+    if max_members is not None and count > max_members:
+        raise ArchiveTooLarge(
+            f"{filename} holds {count} documents, max is {max_members}"
+        )
+
+
+def extract_archive_members(data, filename, max_members=None):
+    """
+    Extracts (member name, bytes) pairs from a zip or tar archive, in archive order.
+
+    Member counts and sizes are checked from the archive index before anything
+    is decompressed: a member over config.MAX_DOCUMENT_BYTES is not read and
+    comes back with None for its bytes.
+
+    Raises:
+        ArchiveTooLarge: If the archive holds more than ``max_members`` files.
+    """
+    if filename.lower().endswith(".zip"):
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            infos = [
+                info
+                for info in archive.infolist()
+                if not info.is_dir() and not info.filename.startswith("__MACOSX/")
+            ]
+            _check_member_count(filename, len(infos), max_members)
+            members = []
+            for info in infos:
+                if not _member_fits(info.filename, info.file_size):
+                    members.append((info.filename, None))
+                    continue
+                members.append((info.filename, archive.read(info)))
+    else:
+        with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+            files = [member for member in archive.getmembers() if member.isfile()]
+            _check_member_count(filename, len(files), max_members)
+            members = []
+            for member in files:
+                if not _member_fits(member.name, member.size):
+                    members.append((member.name, None))
+                    continue
+                member_file = archive.extractfile(member)
+                if member_file is not None:
+                    members.append((member.name, member_file.read()))
+    logger.info(f"Extracted {len(members)} members from archive {filename}")
+    return members
+
+
+def _source_name(source, filename=None):
+    """
+    Returns a printable name for a path, byte string, or file-like source.
+    """
+    if filename:
+        return filename
+    if isinstance(source, (str, os.PathLike)):
+        return str(source)
+    return getattr(source, "name", None) or f"<in-memory {type(source).__name__}>"
+
+
+def _as_stream(source):
     """
-    Extracts text from a file, handling PDFs, images, Word, and Excel files.
+    Wraps raw bytes in a BytesIO; paths and file-like objects pass through unchanged.
     """
-    file_path = str(file_path)
-    file_extension = file_path.rsplit(".", 1)[-1].lower()
-    logger.info(f"Extracting text from file: {file_path} (Extension: {file_extension})")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
 
+
+def read_head(source, size=SNIFF_BYTES):
+    """
+    Returns the first ``size`` bytes of a path, byte string, or file-like
+    source; a file-like source is rewound to where it was.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:size])
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            return file.read(size)
+    position = source.tell()
     try:
-        if file_extension == "pdf":
-            return extract_text_from_pdf(file_path)
-        elif file_extension in {"png", "jpg"}:
-            return extract_text_from_image(file_path)
-        elif file_extension == "docx":
-            return extract_text_from_docx(file_path)
-        elif file_extension == "xlsx":
-            return extract_text_from_excel(file_path)
-        else:
-            raise ValueError(f"Unsupported file extension: {file_extension}")
-    except Exception as e:
-        logger.error(
-            f"Error during text extraction for {file_path}: {e}", exc_info=True
+        return source.read(size)
+    finally:
+        source.seek(position)
+
+
+def _source_size(source):
+    """
+    Returns the size in bytes of a path, byte string, or seekable file-like source.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return len(source)
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    position = source.tell()
+    try:
+        return source.seek(0, os.SEEK_END) - position
+    finally:
+        source.seek(position)
+
+
+def inspect_document(source, filename=None):
+    """
+    Checks a document's size and sniffs its type from the first few KB, before
+    anything parses it.
+
+    Returns:
+        str: The file type that picks the extractor.
+
+    Raises:
+        DocumentTooLarge: If the document exceeds config.MAX_DOCUMENT_BYTES.
+        UnsupportedDocument: If the content is not a supported type.
+    """
+    name = _source_name(source, filename)
+    size = _source_size(source)
+    if config.MAX_DOCUMENT_BYTES and size > config.MAX_DOCUMENT_BYTES:
+        raise DocumentTooLarge(
+            f"{name} is {size} bytes, max is {config.MAX_DOCUMENT_BYTES}"
         )
-        return ""
+    file_type = detect_file_type(read_head(source), name)
+    if file_type is None:
+        raise UnsupportedDocument(f"{name} is not a supported document type")
+    return file_type
 
 
-def extract_text_from_pdf(file_path):
+def _open_pdf(source):
     """
-    Extracts text from a PDF file using PyMuPDF, falling back to OCR if necessary.
+    Opens a PDF with PyMuPDF from a path, bytes, or a file-like object.
     """
+    import fitz
+
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(source)
+    data = source if isinstance(source, (bytes, bytearray)) else source.read()
+    return fitz.open(stream=data, filetype="pdf")
+
+
+def _extractor_for(file_type):
+    return {
+        "pdf": extract_text_from_pdf,
+        "png": extract_text_from_image,
+        "jpg": extract_text_from_image,
+        "tiff": extract_text_from_image,
+        "docx": extract_text_from_docx,
+        "xlsx": extract_text_from_excel,
+        "txt": extract_text_from_txt,
+        "html": extract_text_from_html,
+        "eml": extract_text_from_eml,
+    }[file_type]
+
+
+def extract_text_with_fallback(source, filename=None, file_type=None):
+    """
+    Extracts text from a file, handling PDFs, images (including multi-page
+    TIFFs), Word, Excel, plain text, HTML and email files.
+
+    The source may be a path, raw bytes, or a file-like object. The parser is
+    picked from the content (see inspect_document) unless ``file_type`` says
+    it was already checked; ``filename`` names in-memory sources in logs.
+    """
+    name = _source_name(source, filename)
+
     try:
-        text = ""
-        with fitz.open(file_path) as pdf:
-            for page in pdf:
+        if file_type is None:
+            file_type = inspect_document(source, name)
+        logger.info(f"Extracting text from file: {name} (Type: {file_type})")
+        extractor = _extractor_for(file_type)
+        with EXTRACTION_SECONDS.time(function=extractor.__name__, extension=file_type):
+            return extractor(source)
+    except DocumentRejected as e:
+        logger.warning(f"Document rejected: {e}")
+        return ""
+    except Exception as e:
+        logger.error(f"Error during text extraction for {name}: {e}", exc_info=True)
+        return ""
+
+
+def _get_ocr_executor():
+    """
+    Returns the shared OCR thread pool, or None when OCR runs inline.
+
+    Both OCR backends run Tesseract outside the GIL (as a subprocess or in
+    tesserocr's native code), so threads are enough to use every core, and
+    sharing one pool bounds OCR concurrency across requests.
+    """
+    global _ocr_executor
+    if config.OCR_MAX_WORKERS <= 1:
+        return None
+    with _ocr_executor_lock:
+        if _ocr_executor is None:
+            _ocr_executor = ThreadPoolExecutor(
+                max_workers=config.OCR_MAX_WORKERS, thread_name_prefix="ocr"
+            )
+        return _ocr_executor
+
+
+def _ocr_image(image):
+    """
+    Runs Tesseract OCR on a PIL image, preprocessed first unless OCR_PREPROCESS is off.
+
+    The engine is the OCR_BACKEND selected in src.config (see src.ocr_backends).
+    """
+    from src.ocr_backends import get_ocr_backend
+
+    if config.OCR_PREPROCESS:
+        from src.ocr_preprocessing import preprocess_for_ocr
+
+        image = preprocess_for_ocr(image)
+    backend = get_ocr_backend()
+    with OCR_SECONDS.time(backend=backend.name):
+        return backend.image_to_string(image)
+
+
+def _render_page(page):
+    """
+    Renders a PDF page to a PIL image for OCR.
+
+    With OCR_PREPROCESS on, the page is rendered in grayscale at OCR_RENDER_DPI,
+    lowered as needed to fit OCR_MAX_PIXELS.
+    """
+    import fitz
+    from PIL import Image
+
+    if not config.OCR_PREPROCESS:
+        pix = page.get_pixmap()
+        return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+    from src.ocr_preprocessing import render_dpi
+
+    dpi = render_dpi(
+        page.rect.width, page.rect.height, config.OCR_RENDER_DPI, config.OCR_MAX_PIXELS
+    )
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    return Image.frombytes("L", [pix.width, pix.height], pix.samples)
+
+
+def iter_pdf_chunks(source, chunk_pages=None, max_ocr_pages=None):
+    """
+    Yields the page texts of a PDF, ``chunk_pages`` pages at a time.
+
+    Image-only pages within a chunk are rendered in order and OCR'd concurrently
+    on the shared OCR pool; at most ``max_ocr_pages`` pages (default
+    ``config.OCR_MAX_PAGES``, 0 for no cap) are OCR'd per document. With no
+    ``chunk_pages`` the whole document is a single chunk. Rendering waits
+    whenever twice ``config.OCR_MAX_WORKERS`` pages are in flight, so only that
+    many page images are held in memory at a time.
+
+    Yields:
+        list[str]: The text of each page in the chunk, in page order.
+    """
+    name = _source_name(source)
+    if max_ocr_pages is None:
+        max_ocr_pages = config.OCR_MAX_PAGES
+    executor = _get_ocr_executor()
+    max_in_flight = 2 * config.OCR_MAX_WORKERS
+    ocr_pages = 0
+    skipped_pages = 0
+
+    with _open_pdf(source) as pdf:
+        page_count = len(pdf)
+        chunk_pages = chunk_pages or max(page_count, 1)
+        for chunk_start in range(0, page_count, chunk_pages):
+            page_texts = []
+            ocr_futures = deque()
+            for page_number in range(
+                chunk_start, min(chunk_start + chunk_pages, page_count)
+            ):
+                page = pdf[page_number]
                 page_text = page.get_text()
+                page_texts.append(page_text)
                 if page_text.strip():
-                    text += page_text
-                else:
-                    logger.warning(
-                        f"Page text empty for file {file_path}, attempting OCR."
+                    continue
+
+                if max_ocr_pages and ocr_pages >= max_ocr_pages:
+                    skipped_pages += 1
+                    continue
+
+                ocr_pages += 1
+                logger.warning(f"Page text empty for file {name}, attempting OCR.")
+                if executor is None:
+                    page_texts[-1] = _ocr_image(_render_page(page))
+                    continue
+                if len(ocr_futures) >= max_in_flight:
+                    index, future = ocr_futures.popleft()
+                    page_texts[index] = future.result()
+                ocr_futures.append(
+                    (
+                        len(page_texts) - 1,
+                        executor.submit(_ocr_image, _render_page(page)),
                     )
-                    pix = page.get_pixmap()
-                    image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    text += pytesseract.image_to_string(image, config="--psm 6")
-        logger.info(f"Text successfully extracted from PDF: {file_path}")
+                )
+
+            for index, future in ocr_futures:
+                page_texts[index] = future.result()
+            yield page_texts
+
+    if skipped_pages:
+        logger.warning(
+            f"OCR page cap of {max_ocr_pages} reached for {name}, "
+            f"{skipped_pages} pages skipped."
+        )
+
+
+def iter_text_chunks(source, filename=None, chunk_pages=1):
+    """
+    Yields (text, pages) chunks of a document so callers can stop reading early.
+
+    PDFs are read ``chunk_pages`` pages at a time; every other format is
+    extracted in one go and reported as a single page.
+    """
+    name = _source_name(source, filename)
+    file_type = inspect_document(source, name)
+    if file_type == "pdf":
+        for page_texts in iter_pdf_chunks(source, chunk_pages=chunk_pages):
+            yield "".join(page_texts), len(page_texts)
+    else:
+        yield extract_text_with_fallback(
+            source, filename=filename, file_type=file_type
+        ), 1
+
+
+def extract_text_from_pdf(source, max_ocr_pages=None):
+    """
+    Extracts text from a PDF file using PyMuPDF, falling back to OCR if necessary.
+    """
+    name = _source_name(source)
+    try:
+        text = "".join(
+            "".join(page_texts)
+            for page_texts in iter_pdf_chunks(source, max_ocr_pages=max_ocr_pages)
+        )
+        logger.info(f"Text successfully extracted from PDF: {name}")
         return text.strip()
     except Exception as e:
-        logger.error(f"Error extracting text from PDF {file_path}: {e}", exc_info=True)
+        logger.error(f"Error extracting text from PDF {name}: {e}", exc_info=True)
         return ""
 
 
-def extract_text_from_image(file_path):
+def extract_text_from_image(source, max_ocr_pages=None):
     """
     Extracts text from an image file using Tesseract OCR.
+
+    Every frame of a multi-page TIFF is OCR'd, concurrently on the shared OCR
+    pool and up to ``max_ocr_pages`` (default ``config.OCR_MAX_PAGES``, 0 for
+    no cap) frames.
     """
+    from PIL import Image, ImageSequence
+
+    name = _source_name(source)
+    if max_ocr_pages is None:
+        max_ocr_pages = config.OCR_MAX_PAGES
     try:
-        image = Image.open(file_path)
-        text = pytesseract.image_to_string(image, config="--psm 6")
-        logger.info(f"Text successfully extracted from image: {file_path}")
+        with Image.open(_as_stream(source)) as image:
+            frames = []
+            for frame in ImageSequence.Iterator(image):
+                if max_ocr_pages and len(frames) >= max_ocr_pages:
+                    logger.warning(
+                        f"OCR page cap of {max_ocr_pages} reached for {name}, "
+                        f"{image.n_frames - len(frames)} frames skipped."
+                    )
+                    break
+                # CMYK and 16-bit JPEG/TIFF variants are not readable by Tesseract.
+                if frame.mode not in ("1", "L", "RGB", "RGBA", "P", "LA"):
+                    frame = frame.convert("RGB")
+                else:
+                    frame = frame.copy()
+                frames.append(frame)
+
+        executor = _get_ocr_executor()
+        if executor is None or len(frames) == 1:
+            texts = [_ocr_image(frame) for frame in frames]
+        else:
+            texts = list(executor.map(_ocr_image, frames))
+        text = "\n".join(texts)
+        logger.info(f"Text successfully extracted from image: {name}")
         return text.strip()
     except Exception as e:
-        logger.error(
-            f"Error extracting text from image {file_path}: {e}", exc_info=True
-        )
+        logger.error(f"Error extracting text from image {name}: {e}", exc_info=True)
         return ""
 
 
-def extract_text_from_docx(file_path):
+def extract_text_from_docx(source):
     """
     Extracts text from a Word (.docx) file using python-docx.
     """
+    from docx import Document
+
+    name = _source_name(source)
     try:
-        doc = Document(file_path)
+        doc = Document(_as_stream(source))
         text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        logger.info(f"Text successfully extracted from Word document: {file_path}")
+        logger.info(f"Text successfully extracted from Word document: {name}")
         return text.strip()
     except Exception as e:
         logger.error(
-            f"Error extracting text from Word document {file_path}: {e}", exc_info=True
+            f"Error extracting text from Word document {name}: {e}", exc_info=True
         )
         return ""
 
 
-def extract_text_from_excel(file_path):
+def extract_text_from_excel(source):
     """
     Extracts text from an Excel (.xlsx) file using pandas.
     """
+    import pandas as pd
+
+    name = _source_name(source)
     try:
-        df = pd.read_excel(file_path, sheet_name=None)
-        text = ""
-        for sheet_name, sheet_df in df.items():
-            text += f"Sheet: {sheet_name}\n"
-            text += sheet_df.to_string(index=False, header=True)
-            text += "\n\n"
-        logger.info(f"Text successfully extracted from Excel file: {file_path}")
+        df = pd.read_excel(_as_stream(source), sheet_name=None)
+        text = "\n\n".join(
+            f"Sheet: {sheet_name}\n{sheet_df.to_string(index=False, header=True)}"
+            for sheet_name, sheet_df in df.items()
+        )
+        logger.info(f"Text successfully extracted from Excel file: {name}")
         return text.strip()
     except Exception as e:
         logger.error(
-            f"Error extracting text from Excel file {file_path}: {e}", exc_info=True
+            f"Error extracting text from Excel file {name}: {e}", exc_info=True
         )
         return ""
 
 
+def _decode_text(data):
+    """
+    Decodes text as UTF-8 (with or without a BOM), falling back to Windows-1252.
+    """
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("cp1252", errors="replace")
+
+
+def _read_bytes(source):
+    """
+    Returns all bytes of a path, byte string, or file-like source.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            return file.read()
+    return source.read()
+
+
+def extract_text_from_txt(source):
+    """
+    Extracts text from a plain text file.
+    """
+    name = _source_name(source)
+    try:
+        text = _decode_text(_read_bytes(source))
+        logger.info(f"Text successfully extracted from text file: {name}")
+        return text.strip()
+    except Exception as e:
+        logger.error(f"Error extracting text from text file {name}: {e}", exc_info=True)
+        return ""
+
+
+def _html_to_text(markup):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(markup, "html.parser")
+    for element in soup(["script", "style", "head"]):
+        element.decompose()
+    return soup.get_text(separator="\n")
+
+
+def extract_text_from_html(source):
+    """
+    Extracts the visible text from an HTML file using BeautifulSoup.
+    """
+    name = _source_name(source)
+    try:
+        text = _html_to_text(_read_bytes(source))
+        logger.info(f"Text successfully extracted from HTML file: {name}")
+        return text.strip()
+    except Exception as e:
+        logger.error(f"Error extracting text from HTML file {name}: {e}", exc_info=True)
+        return ""
+
+
+def extract_text_from_eml(source):
+    """
+    Extracts the subject, body and supported attachments of an email (.eml).
+
+    The plain text body is preferred over the HTML one. Attachments are sniffed
+    like uploads and extracted with their own parser; nested emails are skipped.
+    """
+    from email import policy
+    from email.parser import BytesParser
+
+    name = _source_name(source)
+    try:
+        message = BytesParser(policy=policy.default).parsebytes(_read_bytes(source))
+        parts = [str(message.get("subject", ""))]
+        body = message.get_body(preferencelist=("plain", "html"))
+        if body is not None:
+            content = body.get_content()
+            parts.append(
+                _html_to_text(content)
+                if body.get_content_type() == "text/html"
+                else content
+            )
+        for attachment in message.iter_attachments():
+            data = attachment.get_payload(decode=True)
+            filename = attachment.get_filename() or f"{name} attachment"
+            try:
+                file_type = inspect_document(data or b"", filename)
+            except DocumentRejected as e:
+                logger.info(f"Skipping attachment of {name}: {e}")
+                continue
+            if file_type != "eml":
+                parts.append(
+                    extract_text_with_fallback(
+                        data, filename=filename, file_type=file_type
+                    )
+                )
+        logger.info(f"Text successfully extracted from email: {name}")
+        return "\n".join(part for part in parts if part).strip()
+    except Exception as e:
+        logger.error(f"Error extracting text from email {name}: {e}", exc_info=True)
+        return ""
+
+
 def preprocess_text(text):
     """
     Preprocess the extracted text.
@@ -0,0 +1,229 @@
+import argparse
+import json
+import os
+import re
+from collections import Counter
+
+import joblib
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from src import config
+from src.logging_config import setup_logger
+
+logger = setup_logger("inference", "./logs/inference.log")
+
+BUNDLE_ARRAYS = ("idf", "coef", "intercept")
+
+
+def bundle_files(bundle_dir):
+    """
+    Lists every file that makes up an inference bundle.
+    """
+    names = ["meta.json", "terms.txt", *(f"{name}.npy" for name in BUNDLE_ARRAYS)]
+    return [os.path.join(bundle_dir, name) for name in names]
+
+
+def _check_supported(model, vectorizer):
+    """
+    Rejects vectorizer settings the lean scorer does not reproduce.
+    """
+    if not hasattr(vectorizer, "vocabulary_"):
+        raise ValueError("Only vocabulary-based TfidfVectorizers can be exported")
+    unsupported = {
+        "analyzer": vectorizer.analyzer != "word",
+        "tokenizer": vectorizer.tokenizer is not None,
+        "preprocessor": vectorizer.preprocessor is not None,
+        "stop_words": vectorizer.stop_words is not None,
+        "strip_accents": vectorizer.strip_accents is not None,
+        "binary": vectorizer.binary,
+        "norm": vectorizer.norm not in ("l2", None),
+    }
+    bad = [name for name, flag in unsupported.items() if flag]
+    if bad:
+        raise ValueError(f"Unsupported vectorizer settings for export: {bad}")
+    if not hasattr(model, "coef_"):
+        raise ValueError("Only linear models with coef_/intercept_ can be exported")
+
+
+def export_inference_bundle(model, vectorizer, output_dir):
+    """
+    Freezes a fitted TfidfVectorizer and linear classifier into plain NumPy arrays.
+
+    The bundle directory holds one uncompressed .npy file per array (so it can be
+    memory-mapped), the vocabulary as terms.txt in column order, and a meta.json
+    with the classes and analyzer settings.
+    """
+    _check_supported(model, vectorizer)
+    os.makedirs(output_dir, exist_ok=True)
+
+    vocabulary = vectorizer.vocabulary_
+    terms = [""] * len(vocabulary)
+    for term, index in vocabulary.items():
+        terms[index] = term
+    idf = vectorizer.idf_ if vectorizer.use_idf else np.ones(len(vocabulary))
+
+    # lbfgs/newton/sag solvers fit a softmax model for 3+ classes; binary and
+    # liblinear models score each class with a sigmoid.
+    multinomial = (
+        len(model.classes_) > 2
+        and getattr(model, "multi_class", "auto")
+        in ("auto", "deprecated", "multinomial")
+        and getattr(model, "solver", "lbfgs") != "liblinear"
+    )
+
+    # Tokens never contain whitespace other than the n-gram separator, so one
+    # term per line is unambiguous.
+    with open(os.path.join(output_dir, "terms.txt"), "w", encoding="utf-8") as f:
+        f.write("\n".join(terms))
+
+    arrays = {
+        "idf": np.asarray(idf, dtype=np.float64),
+        "coef": np.asarray(model.coef_, dtype=np.float64),
+        "intercept": np.asarray(model.intercept_, dtype=np.float64),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(output_dir, f"{name}.npy"), array)
+
+    meta = {
+        "classes": [str(label) for label in model.classes_],
+        "ngram_range": list(vectorizer.ngram_range),
+        "lowercase": vectorizer.lowercase,
+        "token_pattern": vectorizer.token_pattern,
+        "sublinear_tf": vectorizer.sublinear_tf,
+        "norm": vectorizer.norm,
+        "multinomial": multinomial,
+    }
+    with open(os.path.join(output_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=4)
+
+    logger.info(f"Inference bundle with {len(terms)} terms exported to {output_dir}")
+    return output_dir
+
+
+class InferenceBundle:
+    """
+    Lean TF-IDF + linear model scorer over frozen NumPy arrays.
+
+    Produces the same probabilities as the sklearn vectorizer/model pair it was
+    exported from, without sklearn's per-call validation. It exposes
+    ``transform``, ``predict_proba`` and ``classes_`` so a bundle can stand in
+    for both the vectorizer and the model in ``classify_document``.
+    """
+
+    def __init__(self, terms, idf, coef, intercept, meta):
+        self.idf = idf
+        self.coef = coef
+        self.intercept = intercept
+        self.classes_ = np.asarray(meta["classes"])
+        self.min_n, self.max_n = meta["ngram_range"]
+        self.lowercase = meta["lowercase"]
+        self.sublinear_tf = meta["sublinear_tf"]
+        self.norm = meta["norm"]
+        self.multinomial = meta["multinomial"]
+        self._token_pattern = re.compile(meta["token_pattern"])
+        self.vocabulary = {term: index for index, term in enumerate(terms)}
+
+        # Every proper prefix of a vocabulary n-gram. An n-gram is only extended
+        # while its current prefix is in here, which prunes the vast majority of
+        # candidate n-grams without changing the result.
+        self._prefixes = set()
+        for term in self.vocabulary:
+            tokens = term.split(" ")
+            for length in range(1, len(tokens)):
+                self._prefixes.add(" ".join(tokens[:length]))
+
+    @classmethod
+    def load(cls, bundle_dir, mmap_mode=None):
+        """
+        Loads a bundle directory written by export_inference_bundle.
+        """
+        with open(os.path.join(bundle_dir, "meta.json")) as f:
+            meta = json.load(f)
+        with open(os.path.join(bundle_dir, "terms.txt"), encoding="utf-8") as f:
+            terms = f.read().split("\n")
+        arrays = {
+            name: np.load(os.path.join(bundle_dir, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in BUNDLE_ARRAYS
+        }
+        logger.info(f"Inference bundle loaded from {bundle_dir}")
+        return cls(terms=terms, meta=meta, **arrays)
+
+    def _term_counts(self, text):
+        if self.lowercase:
+            text = text.lower()
+        tokens = self._token_pattern.findall(text)
+        vocabulary = self.vocabulary
+        prefixes = self._prefixes
+        counts = Counter()
+
+        for start in range(len(tokens)):
+            gram = tokens[start]
+            for n in range(1, self.max_n + 1):
+                if n > 1:
+                    if gram not in prefixes or start + n > len(tokens):
+                        break
+                    gram = f"{gram} {tokens[start + n - 1]}"
+                if n >= self.min_n:
+                    index = vocabulary.get(gram)
+                    if index is not None:
+                        counts[index] += 1
+        return counts
+
+    def transform(self, texts):
+        """
+        Turns preprocessed texts into an L2-normalized TF-IDF CSR matrix.
+        """
+        indptr, indices, values = [0], [], []
+        for text in texts:
+            counts = self._term_counts(text)
+            row_indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            row_values = np.fromiter(
+                counts.values(), dtype=np.float64, count=len(counts)
+            )
+            if self.sublinear_tf:
+                row_values = np.log(row_values) + 1
+            row_values = row_values * self.idf[row_indices]
+            if self.norm == "l2" and row_values.size:
+                row_values /= np.sqrt(np.dot(row_values, row_values))
+            indices.append(row_indices)
+            values.append(row_values)
+            indptr.append(indptr[-1] + len(row_indices))
+
+        return csr_matrix(
+            (
+                np.concatenate(values) if values else np.empty(0),
+                np.concatenate(indices) if indices else np.empty(0, dtype=np.int64),
+                np.asarray(indptr),
+            ),
+            shape=(len(texts), len(self.vocabulary)),
+        )
+
+    def predict_proba(self, X):
+        """
+        Returns class probabilities for a TF-IDF matrix from ``transform``.
+        """
+        scores = np.asarray(X @ self.coef.T) + self.intercept
+        if self.multinomial:
+            scores = scores - scores.max(axis=1, keepdims=True)
+            exp_scores = np.exp(scores)
+            return exp_scores / exp_scores.sum(axis=1, keepdims=True)
+
+        probabilities = 1.0 / (1.0 + np.exp(-scores))
+        if probabilities.shape[1] == 1:
+            return np.hstack([1 - probabilities, probabilities])
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export the trained model and vectorizer as a NumPy inference bundle."
+    )
+    parser.add_argument("--model", default=config.MODEL_PATH)
+    parser.add_argument("--vectorizer", default=config.VECTORIZER_PATH)
+    parser.add_argument("--output", default=config.INFERENCE_BUNDLE_DIR)
+    args = parser.parse_args()
+
+    export_inference_bundle(
+        joblib.load(args.model), joblib.load(args.vectorizer), args.output
+    )
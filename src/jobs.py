@@ -0,0 +1,260 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+from src.logging_config import setup_logger
+
+logger = setup_logger("jobs", "./logs/jobs.log")
+
+
+class JobQueueFull(Exception):
+    """
+    Raised when a job is submitted while the queue is at capacity.
+    """
+
+
+class JobManager:
+    """
+    Runs classification jobs on a bounded pool of background worker threads.
+
+    Jobs wait in a bounded queue, so submissions beyond capacity are refused
+    instead of piling up. Job state lives in an in-process dict or, when a
+    SQLite path is given, in a database shared by every process using that
+    path, so any worker of a multi-process server can answer for a job that
+    another one runs. Finished jobs are dropped once they are older than
+    ``result_ttl_seconds``.
+
+    Each job records the pid of the process that runs it. A job still unfinished
+    after ``timeout_seconds``, or whose process has exited (crashed or recycled
+    by the server), is marked failed so that it expires like any other. The
+    sweep doing this runs at most every ``sweep_seconds``.
+    """
+
+    def __init__(
+        self,
+        handler,
+        max_workers=2,
+        max_queue=100,
+        result_ttl_seconds=3600,
+        db_path=None,
+        timeout_seconds=600,
+        sweep_seconds=30,
+    ):
+        self.handler = handler
+        self.max_workers = max_workers
+        self.result_ttl_seconds = result_ttl_seconds
+        self.db_path = db_path
+        self.timeout_seconds = timeout_seconds
+        self.sweep_seconds = sweep_seconds
+        self._next_sweep = 0.0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._workers = []
+        self._db = None
+        self._db_pid = None
+
+        if db_path:
+            self._connect()
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, "
+                "state TEXT NOT NULL, finished_at REAL)"
+            )
+            self._db.commit()
+            logger.info(f"Job state stored in {db_path}")
+
+    def _connect(self):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._db_pid = os.getpid()
+
+    def _database(self):
+        """
+        Returns this process's job database connection, or None for in-process
+        state. A connection must not cross fork(), so a forked worker opens its own.
+        """
+        if self._db is not None and self._db_pid != os.getpid():
+            self._connect()
+        return self._db
+
+    def _save(self, job):
+        # Callers hold self._lock.
+        db = self._database()
+        if db is None:
+            self._jobs[job["job_id"]] = job
+            return
+        db.execute(
+            "INSERT OR REPLACE INTO jobs (job_id, state, finished_at) VALUES (?, ?, ?)",
+            (job["job_id"], json.dumps(job), job.get("finished_at")),
+        )
+        db.commit()
+
+    def _load(self, job_id):
+        # Callers hold self._lock.
+        db = self._database()
+        if db is None:
+            return self._jobs.get(job_id)
+        row = db.execute(
+            "SELECT state FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def _delete(self, job_id):
+        # Callers hold self._lock.
+        db = self._database()
+        if db is None:
+            self._jobs.pop(job_id, None)
+            return
+        db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        db.commit()
+
+    def _start_workers(self):
+        # Workers start on first use so a pre-forking server never forks live threads.
+        with self._lock:
+            if self._workers:
+                return
+            for index in range(self.max_workers):
+                worker = threading.Thread(
+                    target=self._run_worker, name=f"job-worker-{index}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(self, filename, data):
+        """
+        Queues a document for classification and returns its job id.
+
+        Raises:
+            JobQueueFull: If the queue is at capacity.
+        """
+        self._start_workers()
+        self._expire_jobs()
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._save(
+                {
+                    "job_id": job_id,
+                    "filename": filename,
+                    "status": "queued",
+                    "submitted_at": time.time(),
+                    "owner_pid": os.getpid(),
+                }
+            )
+        try:
+            self._queue.put_nowait((job_id, filename, data))
+        except queue.Full:
+            with self._lock:
+                self._delete(job_id)
+            raise JobQueueFull(f"Job queue is full ({self._queue.maxsize} jobs)")
+
+        logger.info(f"Job {job_id} queued for file: {filename}")
+        return job_id
+
+    def get(self, job_id):
+        """
+        Returns a copy of a job's state, or None if it is unknown or expired.
+        """
+        self._expire_jobs()
+        now = time.time()
+        with self._lock:
+            job = self._load(job_id)
+            if job is None or self._finished_before(job, now - self.result_ttl_seconds):
+                return None
+            self._fail_if_abandoned(job, now)
+            return dict(job)
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._load(job_id)
+            if job is not None:
+                job.update(fields)
+                self._save(job)
+
+    @staticmethod
+    def _finished_before(job, cutoff):
+        return job.get("finished_at", float("inf")) < cutoff
+
+    @staticmethod
+    def _process_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _fail_if_abandoned(self, job, now):
+        """
+        Marks an unfinished job failed once it is past its deadline or the
+        process running it is gone. Callers hold self._lock.
+        """
+        if "finished_at" in job:
+            return
+        owner = job.get("owner_pid")
+        if now - job["submitted_at"] > self.timeout_seconds:
+            error = "Job did not finish in time"
+        elif owner not in (None, os.getpid()) and not self._process_alive(owner):
+            error = "Job was lost when its worker process stopped"
+        else:
+            return
+        logger.warning(f"Job {job['job_id']} failed: {error}")
+        job.update(status="failed", error=error, finished_at=now)
+        self._save(job)
+
+    def _expire_jobs(self):
+        now = time.time()
+        cutoff = now - self.result_ttl_seconds
+        with self._lock:
+            if now < self._next_sweep:
+                return
+            self._next_sweep = now + self.sweep_seconds
+            db = self._database()
+            if db is None:
+                for job in list(self._jobs.values()):
+                    self._fail_if_abandoned(job, now)
+                expired = [
+                    job_id
+                    for job_id, job in self._jobs.items()
+                    if self._finished_before(job, cutoff)
+                ]
+                for job_id in expired:
+                    del self._jobs[job_id]
+                count = len(expired)
+            else:
+                unfinished = db.execute(
+                    "SELECT state FROM jobs WHERE finished_at IS NULL"
+                ).fetchall()
+                for (state,) in unfinished:
+                    self._fail_if_abandoned(json.loads(state), now)
+                count = db.execute(
+                    "DELETE FROM jobs WHERE finished_at < ?", (cutoff,)
+                ).rowcount
+                db.commit()
+        if count:
+            logger.info(f"Expired {count} finished jobs")
+
+    def _run_worker(self):
+        while True:
+            job_id, filename, data = self._queue.get()
+            self._update(job_id, status="running", started_at=time.time())
+            try:
+                result = self.handler(filename, data)
+                self._update(
+                    job_id, status="done", result=result, finished_at=time.time()
+                )
+                logger.info(f"Job {job_id} finished: {result}")
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}", exc_info=True)
+                self._update(
+                    job_id,
+                    status="failed",
+                    error="An error occurred during classification",
+                    finished_at=time.time(),
+                )
+            finally:
+                self._queue.task_done()
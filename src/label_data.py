@@ -1,10 +1,13 @@
 import json
 import os
+import time
 from collections import Counter
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import ExitStack
 
+from src import config
 from src.file_io import (allowed_file, extract_text_with_fallback,
-                         preprocess_text)
+                         get_extension, preprocess_text, warm_up_backends)
 from src.logging_config import setup_logger
 
 logger = setup_logger("label_data", "./logs/label_data.log")
@@ -57,6 +60,292 @@ def create_dataset(data_folder):
         return dataset
 
 
+def iter_labelled_files(data_folder):
+    """
+    Yields (file_path, label) pairs for every file under a label subdirectory.
+    """
+    for label in sorted(os.listdir(data_folder)):
+        label_path = os.path.join(data_folder, label)
+        if os.path.isdir(label_path):
+            for file_name in sorted(os.listdir(label_path)):
+                yield os.path.join(label_path, file_name), label
+
+
+def _file_signature(file_path, label):
+    stat = os.stat(file_path)
+    return {"label": label, "mtime": stat.st_mtime, "size": stat.st_size}
+
+
+def _load_manifest(manifest_file):
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, "r") as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest, manifest_file):
+    # Write to a sibling file and rename so a crash never leaves a torn manifest.
+    temp_file = f"{manifest_file}.tmp"
+    with open(temp_file, "w") as f:
+        json.dump(manifest, f)
+    os.replace(temp_file, manifest_file)
+
+
+def _compact_jsonl(output_file, manifest):
+    """
+    Rewrites the JSON Lines file keeping one record per source still in the manifest.
+
+    Drops records of changed or deleted files, and any record written after the
+    last manifest save before a crash, so they are rebuilt on this run.
+    """
+    if not os.path.exists(output_file):
+        return
+    temp_file = f"{output_file}.tmp"
+    kept, dropped, seen = 0, 0, set()
+    with open(output_file, "r", encoding="utf-8") as src, open(
+        temp_file, "w", encoding="utf-8"
+    ) as dst:
+        for line in src:
+            try:
+                source = json.loads(line)["source"]
+            except (ValueError, KeyError):
+                dropped += 1
+                continue
+            if source in manifest and source not in seen:
+                seen.add(source)
+                dst.write(line)
+                kept += 1
+            else:
+                dropped += 1
+    os.replace(temp_file, output_file)
+    logger.info(f"Compacted {output_file}: kept {kept} records, dropped {dropped}")
+
+
+OCR_EXTENSIONS = {"png", "jpg", "jpeg", "jfif", "tif", "tiff"}
+# PDFs at least this large per assumed page are taken to be scans: a page image
+# runs to hundreds of KB, a text layer to a few KB.
+SCANNED_PDF_PAGE_BYTES = 256 * 1024
+
+
+def _estimate_work(file_path, size):
+    """
+    Returns ("ocr", pages) for images and scanned PDFs, and ("text", bytes) otherwise.
+
+    Only the extension and size are used, so planning never opens a file; a
+    misjudged PDF is still extracted correctly, just on the other pool.
+    """
+    extension = get_extension(file_path)
+    if extension in OCR_EXTENSIONS:
+        return "ocr", 1
+    if extension == "pdf" and size >= SCANNED_PDF_PAGE_BYTES:
+        return "ocr", size // SCANNED_PDF_PAGE_BYTES
+    return "text", size
+
+
+def plan_chunks(pending, chunk_bytes, chunk_files, ocr_chunk_pages):
+    """
+    Groups pending files into size-aware chunks, one list per worker pool.
+
+    Cheap text-layer files are packed up to ``chunk_bytes`` or ``chunk_files``
+    per chunk; OCR-bound files are packed up to ``ocr_chunk_pages`` pages.
+
+    Returns:
+        dict: {"text": [chunk, ...], "ocr": [chunk, ...]}, each chunk a list of
+        (file_path, label) pairs.
+    """
+    budgets = {"text": chunk_bytes, "ocr": ocr_chunk_pages}
+    chunks = {"text": [], "ocr": []}
+    current = {"text": ([], 0), "ocr": ([], 0)}
+
+    for file_path, label, signature in pending:
+        pool, weight = _estimate_work(file_path, signature["size"])
+        files, total = current[pool]
+        if files and (total + weight > budgets[pool] or len(files) >= chunk_files):
+            chunks[pool].append(files)
+            files, total = [], 0
+        files.append((file_path, label))
+        current[pool] = (files, total + weight)
+
+    for pool, (files, _) in current.items():
+        if files:
+            chunks[pool].append(files)
+    return chunks
+
+
+def _split_workers(chunks, text_workers=None, ocr_workers=None):
+    """
+    Divides one os.cpu_count() budget between the pools that have chunks, half
+    each when both do, so together they never run more processes than cores.
+    """
+    cpu_count = os.cpu_count() or 1
+    if chunks["text"] and chunks["ocr"]:
+        ocr_share = max(cpu_count // 2, 1)
+        text_share = max(cpu_count - ocr_share, 1)
+    else:
+        ocr_share = text_share = cpu_count
+    return {"text": text_workers or text_share, "ocr": ocr_workers or ocr_share}
+
+
+# Backends warmed in each pool's workers. Text workers skip the OCR engine; a
+# scan misjudged as text starts it on first use.
+POOL_BACKENDS = {
+    "text": (("pdf", "docx", "xlsx", "html", "eml"), False),
+    "ocr": (("pdf", "png", "jpg", "tiff"), True),
+}
+
+
+def _init_worker(pool):
+    """
+    Warms the backends a pool uses once per worker process instead of per file.
+    """
+    # Pool processes already run one document per core; no nested OCR threads.
+    config.OCR_MAX_WORKERS = 1
+    extensions, start_ocr = POOL_BACKENDS[pool]
+    warm_up_backends(extensions, start_ocr=start_ocr)
+
+
+def _process_chunk(chunk):
+    return [(file_path, process_file(file_path, label)) for file_path, label in chunk]
+
+
+def build_dataset_streaming(
+    data_folder,
+    output_file,
+    manifest_file=None,
+    max_in_flight=None,
+    manifest_every=50,
+    chunk_bytes=8 * 1024 * 1024,
+    chunk_files=64,
+    ocr_chunk_pages=4,
+    text_workers=None,
+    ocr_workers=None,
+):
+    """
+    Builds the dataset as JSON Lines, appending each record once its chunk is done.
+
+    Files are grouped into size-aware chunks so each task amortizes pickling and
+    scheduling over many small files. OCR-bound files (images, scanned PDFs) run
+    on their own process pool so they never queue behind, or starve, cheap
+    text-layer files; the two pools share the machine's cores. Each pool keeps
+    at most ``max_in_flight`` chunks submitted, so memory stays flat however
+    many files there are. A manifest keyed by file path records the mtime and
+    size of every processed file; a re-run skips files that are unchanged and
+    only processes new or modified ones.
+
+    Returns:
+        dict: Counts of "processed", "skipped" and "failed" files, plus
+        throughput as "seconds", "files_per_sec" and "mb_per_sec".
+    """
+    started = time.perf_counter()
+    manifest_file = manifest_file or f"{output_file}.manifest.json"
+    manifest = _load_manifest(manifest_file)
+
+    pending = []
+    current = set()
+    for file_path, label in iter_labelled_files(data_folder):
+        current.add(file_path)
+        signature = _file_signature(file_path, label)
+        if manifest.get(file_path) != signature:
+            manifest.pop(file_path, None)
+            pending.append((file_path, label, signature))
+    for file_path in set(manifest) - current:
+        del manifest[file_path]
+
+    _compact_jsonl(output_file, manifest)
+    _save_manifest(manifest, manifest_file)
+    counts = {"processed": 0, "skipped": len(manifest), "failed": 0}
+    logger.info(f"{len(pending)} files to process, {len(manifest)} unchanged.")
+
+    signatures = {file_path: signature for file_path, _, signature in pending}
+    chunks = plan_chunks(pending, chunk_bytes, chunk_files, ocr_chunk_pages)
+    logger.info(
+        f"Planned {len(chunks['text'])} text chunks and "
+        f"{len(chunks['ocr'])} OCR chunks."
+    )
+    pool_workers = _split_workers(chunks, text_workers, ocr_workers)
+    processed_bytes = 0
+
+    with ExitStack() as stack:
+        out = stack.enter_context(open(output_file, "a", encoding="utf-8"))
+        executors = {
+            pool: stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=pool_workers[pool],
+                    initializer=_init_worker,
+                    initargs=(pool,),
+                )
+            )
+            for pool in chunks
+            if chunks[pool]
+        }
+        remaining = {pool: iter(chunks[pool]) for pool in executors}
+        in_flight = {}
+        since_save = 0
+        while True:
+            for pool, executor in executors.items():
+                limit = max_in_flight or 2 * pool_workers[pool]
+                while sum(1 for p in in_flight.values() if p == pool) < limit:
+                    chunk = next(remaining[pool], None)
+                    if chunk is None:
+                        break
+                    in_flight[executor.submit(_process_chunk, chunk)] = pool
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for task in done:
+                del in_flight[task]
+                for file_path, result in task.result():
+                    if result is None:
+                        counts["failed"] += 1
+                        continue
+                    clean_text, label = result
+                    out.write(
+                        json.dumps(
+                            {"text": clean_text, "label": label, "source": file_path},
+                            ensure_ascii=False,
+                        )
+                        + "\n"
+                    )
+                    manifest[file_path] = signatures[file_path]
+                    processed_bytes += signatures[file_path]["size"]
+                    counts["processed"] += 1
+                    since_save += 1
+
+            if since_save >= manifest_every:
+                # Records must reach disk before the manifest vouches for them.
+                out.flush()
+                os.fsync(out.fileno())
+                _save_manifest(manifest, manifest_file)
+                since_save = 0
+
+        out.flush()
+        os.fsync(out.fileno())
+    _save_manifest(manifest, manifest_file)
+
+    elapsed = time.perf_counter() - started
+    counts["seconds"] = elapsed
+    counts["files_per_sec"] = counts["processed"] / elapsed if elapsed else 0.0
+    counts["mb_per_sec"] = processed_bytes / (1024 * 1024) / elapsed if elapsed else 0.0
+    logger.info(
+        f"Streaming dataset build completed: {counts['processed']} processed, "
+        f"{counts['skipped']} skipped, {counts['failed']} failed in {elapsed:.1f}s "
+        f"({counts['files_per_sec']:.1f} files/sec, {counts['mb_per_sec']:.2f} MB/sec)"
+    )
+    return counts
+
+
+def iter_jsonl_dataset(dataset_file):
+    """
+    Yields (text, label) pairs from a JSON Lines dataset without loading it whole.
+    """
+    with open(dataset_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield record["text"], record["label"]
+
+
 def save_dataset_to_json(dataset, output_file):
     """
     Saves the dataset to a JSON file.
@@ -81,14 +370,11 @@ def dataset_statistics(dataset):
 
 if __name__ == "__main__":
     data_folder = "./training_data"
-    output_file = "dataset.json"
-
-    logger.info("Starting dataset creation...")
-    dataset = create_dataset(data_folder)
+    output_file = "dataset.jsonl"
 
-    logger.info("Saving dataset to JSON...")
-    save_dataset_to_json(dataset, output_file)
+    logger.info("Starting streaming dataset creation...")
+    build_dataset_streaming(data_folder, output_file)
 
     logger.info("Dataset created successfully!")
     logger.info("Dataset statistics:")
-    dataset_statistics(dataset)
+    dataset_statistics(iter_jsonl_dataset(output_file))
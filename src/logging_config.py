@@ -1,12 +1,116 @@
+import atexit
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+from src import config
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+    """
+
+    def format(self, record):
+        payload = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Keeps only a random fraction of DEBUG (and lower) records; other levels always pass.
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+class _RoutingHandler(logging.Handler):
+    """
+    Queue listener target that hands each record to the handlers of the logger
+    that emitted it, so one background thread serves every logger.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.routes = {}
+
+    def handle(self, record):
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+
+_configured_loggers: set = set()
+_setup_lock = threading.Lock()
+_log_queue: Optional[queue.SimpleQueue] = None
+_listener: Optional[QueueListener] = None
+_router: Optional[_RoutingHandler] = None
+
+
+def _start_listener():
+    global _listener
+    _listener = QueueListener(_log_queue, _router)
+    _listener.start()
+
+
+def _restart_listener_after_fork():
+    # The listener thread does not survive fork(); give each child its own.
+    if _listener is not None:
+        _start_listener()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _queue_handler():
+    """
+    Returns a QueueHandler feeding the shared background listener, starting it on first use.
+    """
+    global _log_queue, _router
+    if _router is None:
+        _log_queue = queue.SimpleQueue()
+        _router = _RoutingHandler()
+        _start_listener()
+        atexit.register(_stop_listener)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_restart_listener_after_fork)
+    return QueueHandler(_log_queue)
 
 
 def setup_logger(name: str, log_file: str, level: int = logging.INFO):
     """
     Sets up a logger with both file and console handlers.
 
+    Calling it again for the same name returns the existing logger without adding
+    duplicate handlers. With ``LOG_QUEUE`` enabled, the request thread only
+    enqueues records and a background listener formats and writes them.
+    ``LOG_FORMAT=json`` switches to one JSON object per line, and
+    ``LOG_DEBUG_SAMPLE_RATE`` keeps only that fraction of DEBUG records.
+
     Args:
         name (str): The name of the logger.
         log_file (str): Path to the log file.
@@ -14,24 +118,40 @@ def setup_logger(name: str, log_file: str, level: int = logging.INFO):
     Returns:
         logging.Logger: Configured logger.
     """
-    os.makedirs("./logs", exist_ok=True)
     logger = logging.getLogger(name)
-    logger.setLevel(level)
-
-    # File Handler
-    file_handler = RotatingFileHandler(
-        log_file, maxBytes=5 * 1024 * 1024, backupCount=3
-    )
-    file_handler.setFormatter(
-        logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-    )
-    logger.addHandler(file_handler)
-
-    # Console Handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(
-        logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-    )
-    logger.addHandler(console_handler)
+    with _setup_lock:
+        if name in _configured_loggers:
+            return logger
+
+        os.makedirs("./logs", exist_ok=True)
+        logger.setLevel(level)
+
+        if config.LOG_FORMAT == "json":
+            formatter: logging.Formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(TEXT_FORMAT)
+
+        # File Handler
+        file_handler = RotatingFileHandler(
+            log_file, maxBytes=5 * 1024 * 1024, backupCount=3
+        )
+        file_handler.setFormatter(formatter)
+
+        # Console Handler
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+
+        if config.LOG_QUEUE:
+            queue_handler = _queue_handler()
+            assert _router is not None
+            _router.routes[name] = [file_handler, console_handler]
+            logger.addHandler(queue_handler)
+        else:
+            logger.addHandler(file_handler)
+            logger.addHandler(console_handler)
+
+        if config.LOG_DEBUG_SAMPLE_RATE < 1:
+            logger.addFilter(DebugSamplingFilter(config.LOG_DEBUG_SAMPLE_RATE))
 
+        _configured_loggers.add(name)
     return logger
@@ -0,0 +1,260 @@
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """
+    Holds every metric and renders them in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        Returns all metrics as Prometheus plain-text exposition.
+        """
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key):
+        return dict(zip(self.labelnames, key))
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count, e.g. requests or errors.
+    """
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self._labels(key), value
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down, e.g. queue depth.
+    """
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self._labels(key), value
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values, e.g. latencies, in cumulative buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, **kwargs
+    ):
+        super().__init__(name, documentation, labelnames, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {
+                    "buckets": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][index] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observes the wall time spent in the with-block.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state["count"] if state else 0
+
+    def samples(self):
+        with self._lock:
+            items = [
+                (key, list(state["buckets"]), state["sum"], state["count"])
+                for key, state in self._values.items()
+            ]
+        for key, buckets, total, count in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, buckets):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {
+                    **labels,
+                    "le": _format_value(bound),
+                }, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests handled, by endpoint and status code.",
+    ("endpoint", "status"),
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency, by endpoint.",
+    ("endpoint",),
+)
+DOCUMENTS_CLASSIFIED = Counter(
+    "documents_classified_total",
+    "Documents classified, by file extension and predicted class.",
+    ("extension", "file_class"),
+)
+DOCUMENT_SECONDS = Histogram(
+    "document_classification_seconds",
+    "End-to-end classification time per document, by file extension and predicted class.",
+    ("extension", "file_class"),
+)
+CLASSIFICATION_ERRORS = Counter(
+    "classification_errors_total",
+    "Documents that failed to classify, by file extension.",
+    ("extension",),
+)
+STAGE_SECONDS = Histogram(
+    "classification_stage_seconds",
+    "Time spent in each stage of classify_document, by file extension.",
+    ("stage", "extension"),
+)
+EXTRACTION_SECONDS = Histogram(
+    "extraction_seconds",
+    "Time spent in each extract_text_from_* function, by file extension.",
+    ("function", "extension"),
+)
+OCR_SECONDS = Histogram(
+    "ocr_seconds",
+    "Time spent in a single Tesseract OCR call, by OCR backend.",
+    ("backend",),
+)
+OCR_PREPROCESS_SECONDS = Histogram(
+    "ocr_preprocess_seconds",
+    "Time spent preparing a single image for Tesseract.",
+)
+CACHE_LOOKUPS = Counter(
+    "result_cache_lookups_total",
+    "Result cache lookups, by outcome and the tier that answered.",
+    ("result", "tier"),
+)
+SHADOW_PREDICTIONS = Counter(
+    "shadow_predictions_total",
+    "Documents scored by the shadow model, by whether its top class agreed.",
+    ("shadow_version", "agreement"),
+)
+SHADOW_PROBABILITY_DELTA = Histogram(
+    "shadow_probability_delta",
+    "Largest per-class probability difference between production and shadow model.",
+    ("shadow_version",),
+    buckets=(0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0),
+)
+SHADOW_SECONDS = Histogram(
+    "shadow_scoring_seconds",
+    "Time the shadow worker spends scoring one batch.",
+)
+SHADOW_SKIPPED = Counter(
+    "shadow_skipped_total",
+    "Sampled documents the shadow model did not score, by reason.",
+    ("reason",),
+)
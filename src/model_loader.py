@@ -0,0 +1,53 @@
+import time
+
+import joblib
+
+from src import config
+from src.cache import file_fingerprint
+from src.inference import InferenceBundle, bundle_files
+from src.logging_config import setup_logger
+from src.model_registry import ServedModel, load_version
+
+logger = setup_logger("model_loader", "./logs/model_loader.log")
+
+
+def load_model_artifacts(mmap_mode=None):
+    """
+    Loads the served model and vectorizer along with their version fingerprint.
+
+    Arrays are memory-mapped read-only when ``mmap_mode`` is "r" (the default
+    comes from ``config.MODEL_MMAP_MODE``), so workers forked from one process,
+    or started side by side, share the same page-cache pages instead of each
+    holding a private copy.
+
+    With ``MODEL_REGISTRY_DIR`` set, the registry's active version is loaded
+    (and checksum-verified) instead of the configured paths.
+
+    Returns:
+        ServedModel: (model, vectorizer, model_version). With the inference
+        bundle enabled, the bundle is returned as both model and vectorizer.
+    """
+    if mmap_mode is None:
+        mmap_mode = config.MODEL_MMAP_MODE
+
+    start = time.perf_counter()
+    if config.MODEL_REGISTRY_DIR:
+        model, vectorizer, model_version = load_version(
+            config.MODEL_REGISTRY_DIR, mmap_mode=mmap_mode
+        )
+    elif config.USE_INFERENCE_BUNDLE:
+        # The lean scorer stands in for both the vectorizer and the model.
+        model = vectorizer = InferenceBundle.load(
+            config.INFERENCE_BUNDLE_DIR, mmap_mode=mmap_mode
+        )
+        model_version = file_fingerprint(*bundle_files(config.INFERENCE_BUNDLE_DIR))
+    else:
+        model = joblib.load(config.MODEL_PATH, mmap_mode=mmap_mode)
+        vectorizer = joblib.load(config.VECTORIZER_PATH, mmap_mode=mmap_mode)
+        model_version = file_fingerprint(config.MODEL_PATH, config.VECTORIZER_PATH)
+
+    logger.info(
+        f"Model artifacts {model_version} loaded in "
+        f"{time.perf_counter() - start:.3f}s (mmap_mode={mmap_mode})"
+    )
+    return ServedModel(model, vectorizer, model_version)
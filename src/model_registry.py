@@ -0,0 +1,280 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import namedtuple
+
+import joblib
+
+from src import config
+from src.inference import InferenceBundle, bundle_files
+from src.logging_config import setup_logger
+
+logger = setup_logger("model_registry", "./logs/model_registry.log")
+
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+MODEL_FILE = "text_classifier.pkl"
+VECTORIZER_FILE = "tfidf_vectorizer.pkl"
+
+ServedModel = namedtuple("ServedModel", ["model", "vectorizer", "version"])
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def publish_version(
+    registry_dir,
+    model_path=None,
+    vectorizer_path=None,
+    bundle_dir=None,
+    version=None,
+    metadata=None,
+    activate=False,
+):
+    """
+    Copies a trained model/vectorizer pair, or an inference bundle, into a new
+    version directory with a manifest of SHA-256 checksums.
+
+    The version directory is assembled under a temporary name and renamed into
+    place, so a reader never sees a half-written version.
+
+    Returns:
+        str: The published version name.
+    """
+    if bundle_dir:
+        kind, sources = "bundle", bundle_files(bundle_dir)
+    elif model_path and vectorizer_path:
+        kind = "joblib"
+        sources = [model_path, vectorizer_path]
+    else:
+        raise ValueError("Publish either a model and vectorizer or a bundle")
+
+    digest = hashlib.sha256("".join(map(_sha256, sources)).encode()).hexdigest()
+    version = version or f"{time.strftime('%Y%m%d%H%M%S')}-{digest[:12]}"
+    version_dir = os.path.join(registry_dir, version)
+    if os.path.exists(version_dir):
+        raise ValueError(f"Model version {version} already exists")
+
+    names = (
+        [os.path.basename(path) for path in sources]
+        if kind == "bundle"
+        else [MODEL_FILE, VECTORIZER_FILE]
+    )
+    tmp_dir = os.path.join(registry_dir, f".tmp-{version}")
+    os.makedirs(tmp_dir)
+    try:
+        files = {}
+        for source, name in zip(sources, names):
+            shutil.copyfile(source, os.path.join(tmp_dir, name))
+            files[name] = _sha256(os.path.join(tmp_dir, name))
+        manifest = {
+            "version": version,
+            "kind": kind,
+            "created": time.time(),
+            "files": files,
+            "metadata": metadata or {},
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+            json.dump(manifest, f, indent=4)
+        os.rename(tmp_dir, version_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    logger.info(f"Published model version {version} to {registry_dir}")
+    if activate:
+        activate_version(registry_dir, version)
+    return version
+
+
+def verify_version(registry_dir, version):
+    """
+    Checks every file of a version against its manifest checksums.
+
+    Returns:
+        dict: The version manifest.
+    Raises:
+        ValueError: When a file is missing or its checksum does not match.
+    """
+    version_dir = os.path.join(registry_dir, version)
+    with open(os.path.join(version_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    for name, expected in manifest["files"].items():
+        path = os.path.join(version_dir, name)
+        if not os.path.exists(path):
+            raise ValueError(f"Model version {version} is missing {name}")
+        if _sha256(path) != expected:
+            raise ValueError(f"Checksum mismatch for {name} in model version {version}")
+    return manifest
+
+
+def list_versions(registry_dir):
+    """
+    Lists published versions, oldest first.
+    """
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(
+        name
+        for name in os.listdir(registry_dir)
+        if not name.startswith(".")
+        and os.path.exists(os.path.join(registry_dir, name, MANIFEST_FILE))
+    )
+
+
+def current_version(registry_dir):
+    """
+    Returns the version named by the registry's CURRENT pointer, or None.
+    """
+    try:
+        with open(os.path.join(registry_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def activate_version(registry_dir, version):
+    """
+    Verifies a version and atomically points CURRENT at it.
+    """
+    verify_version(registry_dir, version)
+    _write_atomic(os.path.join(registry_dir, CURRENT_FILE), version + "\n")
+    logger.info(f"Activated model version {version}")
+
+
+def load_version(registry_dir, version=None, mmap_mode=None):
+    """
+    Verifies and loads a version (CURRENT by default) from the registry.
+
+    Returns:
+        ServedModel: (model, vectorizer, version); a bundle is returned as both
+        model and vectorizer.
+    """
+    version = version or current_version(registry_dir)
+    if version is None:
+        raise ValueError(f"No active model version in {registry_dir}")
+    manifest = verify_version(registry_dir, version)
+    version_dir = os.path.join(registry_dir, version)
+
+    if manifest["kind"] == "bundle":
+        model = vectorizer = InferenceBundle.load(version_dir, mmap_mode=mmap_mode)
+    else:
+        model = joblib.load(os.path.join(version_dir, MODEL_FILE), mmap_mode=mmap_mode)
+        vectorizer = joblib.load(
+            os.path.join(version_dir, VECTORIZER_FILE), mmap_mode=mmap_mode
+        )
+    return ServedModel(model, vectorizer, version)
+
+
+class ActiveModel:
+    """
+    Holds the served model and swaps in new versions without blocking requests.
+
+    Requests read ``current`` once and use that ServedModel to the end, so a
+    reload never changes the model under an in-flight request. The new version
+    is loaded and verified before the single reference assignment that
+    publishes it; a failed load leaves the old version serving.
+    """
+
+    def __init__(self, served, registry_dir=None, poll_seconds=0):
+        self.current = served
+        self.registry_dir = registry_dir
+        self.poll_seconds = poll_seconds
+        self._reload_lock = threading.Lock()
+        self._last_poll = time.monotonic()
+
+    def reload(self, version=None):
+        """
+        Loads a version (CURRENT by default) and makes it the served model.
+
+        Returns:
+            str: The version now being served.
+        """
+        if not self.registry_dir:
+            raise ValueError("Model registry is not configured")
+        with self._reload_lock:
+            version = version or current_version(self.registry_dir)
+            if version == self.current.version:
+                return version
+            start = time.perf_counter()
+            served = load_version(
+                self.registry_dir, version, mmap_mode=config.MODEL_MMAP_MODE
+            )
+            previous, self.current = self.current.version, served
+        logger.info(
+            f"Swapped model version {previous} -> {served.version} in "
+            f"{time.perf_counter() - start:.3f}s"
+        )
+        return served.version
+
+    def maybe_reload(self):
+        """
+        Follows the registry's CURRENT pointer, checking at most every poll_seconds.
+        """
+        if not self.registry_dir or self.poll_seconds <= 0:
+            return
+        now = time.monotonic()
+        if now - self._last_poll < self.poll_seconds:
+            return
+        self._last_poll = now
+        version = current_version(self.registry_dir)
+        if version and version != self.current.version:
+            try:
+                self.reload(version)
+            except Exception:
+                logger.error(f"Error reloading model version {version}", exc_info=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the versioned model registry.")
+    parser.add_argument("--registry", default=config.MODEL_REGISTRY_DIR)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    publish = subparsers.add_parser("publish")
+    publish.add_argument("--model", default=config.MODEL_PATH)
+    publish.add_argument("--vectorizer", default=config.VECTORIZER_PATH)
+    publish.add_argument("--bundle", help="Publish an inference bundle directory.")
+    publish.add_argument("--version")
+    publish.add_argument("--activate", action="store_true")
+    activate = subparsers.add_parser("activate")
+    activate.add_argument("version")
+    subparsers.add_parser("list")
+    args = parser.parse_args()
+
+    if not args.registry:
+        parser.error("Set MODEL_REGISTRY_DIR or pass --registry")
+    if args.command == "publish":
+        os.makedirs(args.registry, exist_ok=True)
+        print(
+            publish_version(
+                args.registry,
+                model_path=None if args.bundle else args.model,
+                vectorizer_path=None if args.bundle else args.vectorizer,
+                bundle_dir=args.bundle,
+                version=args.version,
+                activate=args.activate,
+            )
+        )
+    elif args.command == "activate":
+        activate_version(args.registry, args.version)
+    else:
+        active = current_version(args.registry)
+        for version in list_versions(args.registry):
+            print(f"{'*' if version == active else ' '} {version}")
@@ -0,0 +1,148 @@
+import os
+import queue
+import threading
+
+from src import config
+from src.logging_config import setup_logger
+
+logger = setup_logger("ocr_backends", "./logs/ocr_backends.log")
+
+# Page segmentation mode 6: assume a single uniform block of text.
+TESSERACT_PSM = 6
+
+
+class PytesseractBackend:
+    """
+    Runs the ``tesseract`` binary through pytesseract: one subprocess, temp
+    file and language model load per image.
+    """
+
+    name = "pytesseract"
+
+    def image_to_string(self, image):
+        import pytesseract
+
+        return pytesseract.image_to_string(image, config=f"--psm {TESSERACT_PSM}")
+
+    def warm_up(self):
+        import pytesseract  # noqa: F401
+
+
+class TesserocrBackend:
+    """
+    Runs Tesseract in-process through tesserocr, keeping a pool of initialised
+    ``PyTessBaseAPI`` engines so the language model is loaded once per engine
+    instead of once per image.
+
+    An engine is not thread-safe, so each OCR call checks one out of the pool;
+    up to ``pool_size`` engines are created on demand. tesserocr releases the
+    GIL while recognising, so engines on the shared OCR thread pool run in
+    parallel. Engines belong to the process that created them: a forked child
+    starts with an empty pool.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, pool_size, lang="eng", path=None):
+        self.pool_size = max(1, pool_size)
+        self.lang = lang
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._engines = []
+
+    def _create_engine(self):
+        import tesserocr
+
+        kwargs = {"lang": self.lang, "psm": TESSERACT_PSM}
+        if self.path:
+            kwargs["path"] = self.path
+        engine = tesserocr.PyTessBaseAPI(**kwargs)
+        logger.info(
+            f"Tesseract engine {len(self._engines)} started (tesseract "
+            f"{tesserocr.tesseract_version().split()[1]}, lang {self.lang})"
+        )
+        return engine
+
+    def _acquire(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            if len(self._engines) < self.pool_size:
+                engine = self._create_engine()
+                self._engines.append(engine)
+                return engine
+            idle = self._idle
+        return idle.get()
+
+    def _release(self, engine):
+        engine.Clear()
+        with self._lock:
+            # An engine checked out before a fork does not belong to this pool.
+            if self._pid == os.getpid() and any(e is engine for e in self._engines):
+                self._idle.put(engine)
+
+    def image_to_string(self, image):
+        engine = self._acquire()
+        try:
+            engine.SetImage(image)
+            return engine.GetUTF8Text()
+        finally:
+            self._release(engine)
+
+    def warm_up(self):
+        """
+        Starts one engine ahead of the first image.
+        """
+        self._release(self._acquire())
+
+
+_backend = None
+_backend_setting = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name):
+    """
+    Builds the OCR backend called ``name`` ("pytesseract" or "tesserocr").
+    """
+    if name == "pytesseract":
+        return PytesseractBackend()
+    if name == "tesserocr":
+        return TesserocrBackend(
+            pool_size=config.OCR_ENGINE_POOL_SIZE or config.OCR_MAX_WORKERS,
+            lang=config.OCR_LANG,
+            path=config.OCR_TESSDATA_PATH,
+        )
+    raise ValueError(f"Unknown OCR backend: {name}")
+
+
+def get_ocr_backend():
+    """
+    Returns the shared backend selected by OCR_BACKEND, created on first use.
+
+    If tesserocr is selected but not installed, OCR falls back to pytesseract.
+    """
+    global _backend, _backend_setting
+    with _backend_lock:
+        if _backend is None or _backend_setting != config.OCR_BACKEND:
+            name = _backend_setting = config.OCR_BACKEND
+            if name == "tesserocr":
+                try:
+                    import tesserocr  # noqa: F401
+                except ImportError:
+                    logger.error(
+                        "OCR_BACKEND=tesserocr but tesserocr is not installed; "
+                        "falling back to pytesseract."
+                    )
+                    name = "pytesseract"
+            _backend = create_backend(name)
+        return _backend
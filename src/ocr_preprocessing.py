@@ -0,0 +1,154 @@
+import math
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from src import config
+from src.logging_config import setup_logger
+from src.metrics import OCR_PREPROCESS_SECONDS
+
+logger = setup_logger("ocr_preprocessing", "./logs/ocr_preprocessing.log")
+
+# Pixels darker than this (0-255) count as ink when looking for blank margins.
+MARGIN_INK_THRESHOLD = 200
+MARGIN_PADDING = 10
+# Deskew searches this many degrees either side of level on a small thumbnail.
+DESKEW_MAX_ANGLE = 5.0
+DESKEW_STEP = 0.5
+DESKEW_THUMBNAIL_WIDTH = 800
+
+
+def fit_pixel_budget(image, max_pixels):
+    """
+    Downscales an image so it holds at most max_pixels pixels; smaller images are kept.
+    """
+    pixels = image.width * image.height
+    if not max_pixels or pixels <= max_pixels:
+        return image
+    scale = math.sqrt(max_pixels / pixels)
+    size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+    return image.resize(size, Image.Resampling.LANCZOS)
+
+
+def render_dpi(width_points, height_points, dpi, max_pixels):
+    """
+    Returns the DPI to render a PDF page at: ``dpi``, lowered so the render
+    stays within max_pixels.
+    """
+    pixels = (width_points * dpi / 72) * (height_points * dpi / 72)
+    if max_pixels and pixels > max_pixels:
+        return max(1, int(dpi * math.sqrt(max_pixels / pixels)))
+    return dpi
+
+
+def otsu_threshold(gray):
+    """
+    Returns the Otsu threshold of a grayscale image.
+    """
+    histogram = np.bincount(np.asarray(gray).ravel(), minlength=256).astype(float)
+    total = histogram.sum()
+    weight_background = np.cumsum(histogram)
+    weight_foreground = total - weight_background
+    cumulative_mean = np.cumsum(histogram * np.arange(256))
+    mean_background = cumulative_mean / np.maximum(weight_background, 1)
+    mean_foreground = (cumulative_mean[-1] - cumulative_mean) / np.maximum(
+        weight_foreground, 1
+    )
+    between_variance = (
+        weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+    )
+    return int(np.argmax(between_variance))
+
+
+def binarize(gray):
+    """
+    Converts a grayscale image to black text on white using Otsu's threshold.
+    """
+    threshold = otsu_threshold(gray)
+    return gray.point(lambda value: 255 if value > threshold else 0)
+
+
+def crop_margins(gray, padding=MARGIN_PADDING):
+    """
+    Crops blank borders around the ink of a grayscale image, keeping some padding.
+    """
+    ink = gray.point(lambda value: 255 if value < MARGIN_INK_THRESHOLD else 0)
+    bbox = ink.getbbox()
+    if bbox is None:
+        return gray
+    left, top, right, bottom = bbox
+    return gray.crop(
+        (
+            max(0, left - padding),
+            max(0, top - padding),
+            min(gray.width, right + padding),
+            min(gray.height, bottom + padding),
+        )
+    )
+
+
+def estimate_skew(gray, max_angle=DESKEW_MAX_ANGLE, step=DESKEW_STEP):
+    """
+    Estimates text skew in degrees by projection profiles: the rotation whose
+    row sums vary the most lines the text rows up with the pixel rows.
+    """
+    thumbnail = gray
+    if gray.width > DESKEW_THUMBNAIL_WIDTH:
+        height = max(1, int(gray.height * DESKEW_THUMBNAIL_WIDTH / gray.width))
+        thumbnail = gray.resize((DESKEW_THUMBNAIL_WIDTH, height))
+    ink = ImageOps.invert(binarize(thumbnail))
+
+    best_angle, best_score = 0.0, -1.0
+    for angle in np.arange(-max_angle, max_angle + step / 2, step):
+        rotated = ink.rotate(float(angle), resample=Image.Resampling.NEAREST)
+        score = float(np.var(np.asarray(rotated, dtype=np.float32).sum(axis=1)))
+        if score > best_score:
+            best_angle, best_score = float(angle), score
+    return best_angle
+
+
+def deskew(gray):
+    """
+    Rotates a grayscale image so its text rows are level.
+    """
+    angle = estimate_skew(gray)
+    if angle == 0:
+        return gray
+    return gray.rotate(
+        angle, resample=Image.Resampling.BICUBIC, expand=True, fillcolor=255
+    )
+
+
+def flatten_alpha(image):
+    """
+    Composites a transparent image onto white, so transparent areas do not turn black.
+    """
+    if image.mode not in ("RGBA", "LA", "P") or (
+        image.mode == "P" and "transparency" not in image.info
+    ):
+        return image
+    rgba = image.convert("RGBA")
+    background = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+    return Image.alpha_composite(background, rgba).convert("RGB")
+
+
+def preprocess_for_ocr(image):
+    """
+    Prepares an image for Tesseract following the OCR_* settings in src.config.
+
+    The image is EXIF-rotated, flattened onto white, converted to grayscale and downscaled to
+    ``OCR_MAX_PIXELS`` first, so later steps work on the small image. It is then
+    optionally deskewed, cropped to its ink and binarized.
+    """
+    with OCR_PREPROCESS_SECONDS.time():
+        original_size = image.size
+        image = flatten_alpha(ImageOps.exif_transpose(image))
+        gray = fit_pixel_budget(image.convert("L"), config.OCR_MAX_PIXELS)
+        if config.OCR_DESKEW:
+            gray = deskew(gray)
+        if config.OCR_CROP_MARGINS:
+            gray = crop_margins(gray)
+        if config.OCR_BINARIZE:
+            gray = binarize(gray)
+    logger.debug(f"OCR image preprocessed from {original_size} to {gray.size}")
+    return gray
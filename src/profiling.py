@@ -0,0 +1,174 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from src import config
+from src.logging_config import setup_logger
+
+logger = setup_logger("profiling", "./logs/profiling.log")
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+# Pool threads that run work on behalf of requests (see file_io._get_ocr_executor).
+POOL_THREAD_PREFIXES = ("ocr",)
+
+
+def _frame_name(code):
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the call stacks of one thread, and of OCR pool threads while they
+    run code from ``src``, every ``interval`` seconds.
+
+    Sampling from a background thread catches work handed to the OCR pool,
+    which cProfile misses, and yields whole stacks for flame graphs. Pool work
+    of concurrent requests is sampled too. Stacks are kept as counts and written
+    as collapsed stacks or a speedscope profile.
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._sampler = None
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        self.duration = time.perf_counter() - self._started
+        return self
+
+    def _run(self):
+        sampler_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                thread_name = names.get(thread_id, str(thread_id))
+                if thread_id != self.thread_id and not thread_name.startswith(
+                    POOL_THREAD_PREFIXES
+                ):
+                    continue
+                stack = []
+                in_src = False
+                while frame is not None:
+                    stack.append(_frame_name(frame.f_code))
+                    in_src = in_src or frame.f_code.co_filename.startswith(SRC_DIR)
+                    frame = frame.f_back
+                # Idle pool threads wait in concurrent.futures, outside src.
+                if thread_id != self.thread_id and not in_src:
+                    continue
+                stack.append(thread_name)
+                self.samples[tuple(reversed(stack))] += 1
+
+    def collapsed(self):
+        """
+        Returns the samples as collapsed stacks ("thread;outer;...;inner count"
+        per line), the input format of flamegraph.pl and speedscope.
+        """
+        return "".join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in sorted(self.samples.items())
+        )
+
+    def speedscope(self, name):
+        """
+        Returns the samples as a speedscope "sampled" profile.
+        """
+        frames, index = [], {}
+        samples, weights = [], []
+        for stack, count in sorted(self.samples.items()):
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": frame})
+            samples.append([index[frame] for frame in stack])
+            weights.append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "src.profiling",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+    def save(self, directory, name):
+        """
+        Writes <name>.collapsed and <name>.speedscope.json to directory.
+
+        Returns:
+            str: The path of the speedscope file.
+        """
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, name)
+        with open(f"{base}.collapsed", "w") as file:
+            file.write(self.collapsed())
+        with open(f"{base}.speedscope.json", "w") as file:
+            json.dump(self.speedscope(name), file)
+        return f"{base}.speedscope.json"
+
+
+def should_profile(requested):
+    """
+    Decides whether to profile a request: explicitly requested, or picked by
+    PROFILE_SAMPLE_RATE. Costs one comparison when profiling is off.
+    """
+    if requested:
+        return True
+    rate = config.PROFILE_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def start_profile():
+    """
+    Starts a SamplingProfiler on the calling thread.
+    """
+    return SamplingProfiler(
+        threading.get_ident(), interval=config.PROFILE_INTERVAL_MS / 1000
+    ).start()
+
+
+def finish_profile(profiler, label):
+    """
+    Stops a profiler and stores its output under PROFILE_DIR.
+
+    Returns:
+        str: The profile id, the file name stem of the stored profile.
+    """
+    profiler.stop()
+    profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{label}-{uuid.uuid4().hex[:8]}"
+    path = profiler.save(config.PROFILE_DIR, profile_id)
+    logger.info(
+        f"Profiled {label} for {profiler.duration:.3f}s "
+        f"({sum(profiler.samples.values())} samples): {path}"
+    )
+    return profile_id
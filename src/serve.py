@@ -0,0 +1,131 @@
+import gc
+import io
+import os
+import shutil
+import tempfile
+import time
+
+import fitz
+from gunicorn.app.base import BaseApplication
+
+from src import config
+from src.file_io import (extract_text_from_pdf, inspect_document,
+                         preprocess_text, warm_up_backends)
+from src.logging_config import setup_logger
+
+logger = setup_logger("serve", "./logs/serve.log")
+
+WARM_UP_TEXT = "Invoice 0001\nBill to: Example Customer\nAmount due: $100.00"
+
+
+def warm_up_document():
+    """
+    Returns a one-page PDF with a text layer, built in memory.
+    """
+    with fitz.open() as document:
+        document.new_page().insert_text((72, 72), WARM_UP_TEXT)
+        return document.tobytes()
+
+
+def warm_up_classifier(served):
+    """
+    Classifies a dummy document with a served model so that lazy initialisation
+    (extractor imports, libmagic, the OCR engine, the first vectorizer and model
+    calls) happens before the process takes traffic.
+
+    The document bypasses the cache and the metrics, which only count real
+    requests.
+
+    Returns:
+        str: The predicted class of the dummy document, or None when warm-up
+        failed; the process then serves cold.
+    """
+    started = time.perf_counter()
+    try:
+        warm_up_backends()
+        data = warm_up_document()
+        inspect_document(io.BytesIO(data), "warm_up.pdf")
+        text = preprocess_text(extract_text_from_pdf(data))
+        probabilities = served.model.predict_proba(served.vectorizer.transform([text]))
+        file_class = str(served.model.classes_[probabilities[0].argmax()])
+    except Exception:
+        logger.error("Warm-up failed", exc_info=True)
+        return None
+    logger.info(
+        f"Process {os.getpid()} warmed up in {time.perf_counter() - started:.3f}s"
+    )
+    return file_class
+
+
+def warm_up_worker(worker):
+    """
+    Warms a gunicorn worker before it accepts requests (the post_worker_init hook).
+    """
+    from src.app import active_model
+
+    return warm_up_classifier(active_model.current)
+
+
+def remove_job_store(arbiter):
+    """
+    Deletes the temporary job database of a stopped server (the on_exit hook).
+    """
+    if arbiter.app.job_dir is not None:
+        shutil.rmtree(arbiter.app.job_dir, ignore_errors=True)
+
+
+def server_options():
+    """
+    Returns the gunicorn settings for the classification service.
+    """
+    return {
+        "bind": config.SERVER_BIND,
+        "workers": config.SERVER_WORKERS,
+        "worker_class": "gthread",
+        "threads": config.SERVER_THREADS,
+        "timeout": config.SERVER_TIMEOUT_SECONDS,
+        "preload_app": True,
+        "post_worker_init": warm_up_worker,
+        "on_exit": remove_job_store,
+    }
+
+
+class ClassifierServer(BaseApplication):
+    """
+    Serves src.app with gunicorn: a master process loads the app and the model,
+    then forks SERVER_WORKERS workers that share the model's memory
+    copy-on-write.
+
+    Background threads (job workers, the OCR pool, shadow scoring) start on
+    first use, so none is running in the master when it forks. A job is run by
+    the worker that accepted it but may be polled on any other, so with several
+    workers and no JOB_DB_PATH, job state goes to a temporary SQLite file.
+    """
+
+    def __init__(self, options=None):
+        self.options = server_options() if options is None else options
+        self.job_dir = None
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        if self.cfg.workers > 1 and not config.JOB_DB_PATH:
+            self.job_dir = tempfile.mkdtemp(prefix="classifier-jobs-")
+            config.JOB_DB_PATH = os.path.join(self.job_dir, "jobs.sqlite")
+        from src.app import app
+
+        # Move everything loaded so far out of the collector's reach: collections
+        # in the workers would otherwise write to, and so copy, the shared pages.
+        gc.freeze()
+        logger.info(
+            f"Serving on {', '.join(self.cfg.bind)} with {self.cfg.workers} workers "
+            f"x {self.cfg.threads} threads"
+        )
+        return app
+
+
+if __name__ == "__main__":
+    ClassifierServer().run()
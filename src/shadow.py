@@ -0,0 +1,114 @@
+import queue
+import random
+import threading
+import time
+
+from src.logging_config import setup_logger
+from src.metrics import (SHADOW_PREDICTIONS, SHADOW_PROBABILITY_DELTA,
+                         SHADOW_SECONDS, SHADOW_SKIPPED)
+
+logger = setup_logger("shadow", "./logs/shadow.log")
+
+
+def probability_delta(primary, shadow):
+    """
+    Returns the largest absolute per-class probability difference between two
+    {label: probability} mappings; a class missing from one side counts as 0.
+    """
+    labels = set(primary) | set(shadow)
+    return max(
+        abs(primary.get(label, 0.0) - shadow.get(label, 0.0)) for label in labels
+    )
+
+
+class ShadowScorer:
+    """
+    Scores a sample of classified documents with a candidate model in the background.
+
+    The request thread only enqueues the already-preprocessed text and the
+    production probabilities; a single worker thread vectorizes queued texts in
+    batches, scores them with the shadow model and records agreement and
+    probability deltas. When the queue is full the sample is dropped rather
+    than slowing requests down.
+    """
+
+    def __init__(self, served, sample_rate, max_queue=1000, batch_size=32):
+        self.served = served
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._worker = None
+
+    @property
+    def version(self):
+        return self.served.version
+
+    def _start_worker(self):
+        # Started on first use so a pre-forking server never forks a live thread.
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run_worker, name="shadow-scorer", daemon=True
+                )
+                self._worker.start()
+
+    def submit(self, text, primary_probabilities, primary_version=""):
+        """
+        Queues a document for shadow scoring if it falls in the sampled fraction.
+
+        Returns:
+            bool: Whether the document was queued.
+        """
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return False
+        self._start_worker()
+        try:
+            self._queue.put_nowait((text, primary_probabilities, primary_version))
+        except queue.Full:
+            SHADOW_SKIPPED.inc(reason="queue_full")
+            return False
+        return True
+
+    def join(self):
+        """
+        Blocks until every queued document has been scored.
+        """
+        self._queue.join()
+
+    def _run_worker(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._score(batch)
+            except Exception as e:
+                logger.error(f"Error during shadow scoring: {e}", exc_info=True)
+                SHADOW_SKIPPED.inc(amount=len(batch), reason="error")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _score(self, batch):
+        model, vectorizer, shadow_version = self.served
+        started = time.perf_counter()
+        rows = model.predict_proba(vectorizer.transform([text for text, _, _ in batch]))
+        classes = [str(label) for label in model.classes_]
+        SHADOW_SECONDS.observe(time.perf_counter() - started)
+
+        for (_, primary, primary_version), row in zip(batch, rows):
+            shadow = dict(zip(classes, row.tolist()))
+            primary_label = max(primary, key=primary.get)
+            shadow_label = max(shadow, key=shadow.get)
+            agreement = "agree" if primary_label == shadow_label else "disagree"
+            delta = probability_delta(primary, shadow)
+            SHADOW_PREDICTIONS.inc(shadow_version=shadow_version, agreement=agreement)
+            SHADOW_PROBABILITY_DELTA.observe(delta, shadow_version=shadow_version)
+            logger.info(
+                f"Shadow {agreement}: primary {primary_version} -> {primary_label}, "
+                f"shadow {shadow_version} -> {shadow_label}, max delta {delta:.3f}"
+            )
@@ -0,0 +1,57 @@
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import normalize
+
+
+class StreamingTfidfTransformer(TransformerMixin, BaseEstimator):
+    """
+    TF-IDF weighting whose document frequencies are accumulated batch by batch.
+
+    Uses the same smoothed IDF and L2 normalization as TfidfTransformer, but keeps
+    the raw document frequencies so later batches can be folded in.
+    """
+
+    def __init__(self, norm="l2"):
+        self.norm = norm
+
+    def partial_fit(self, X, y=None):
+        X = X.tocsr()
+        if not hasattr(self, "document_frequency_"):
+            self.document_frequency_ = np.zeros(X.shape[1], dtype=np.int64)
+            self.n_documents_ = 0
+        self.document_frequency_ += np.bincount(X.indices, minlength=X.shape[1])
+        self.n_documents_ += X.shape[0]
+        self.idf_ = np.log((1 + self.n_documents_) / (1 + self.document_frequency_)) + 1
+        return self
+
+    def fit(self, X, y=None):
+        for attribute in ("document_frequency_", "n_documents_", "idf_"):
+            self.__dict__.pop(attribute, None)
+        return self.partial_fit(X)
+
+    def transform(self, X):
+        X = X.tocsr(copy=True).astype(np.float64)
+        X.data *= self.idf_[X.indices]
+        return normalize(X, norm=self.norm, copy=False) if self.norm else X
+
+
+def make_vectorizer(n_features=2**20, ngram_range=(1, 4)):
+    """
+    Builds the stateless hashing vectorizer followed by streaming TF-IDF weighting.
+    """
+    return Pipeline(
+        [
+            (
+                "hashing",
+                HashingVectorizer(
+                    n_features=n_features,
+                    ngram_range=ngram_range,
+                    alternate_sign=False,
+                    norm=None,
+                ),
+            ),
+            ("tfidf", StreamingTfidfTransformer()),
+        ]
+    )
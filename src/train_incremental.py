@@ -0,0 +1,242 @@
+import argparse
+import os
+from collections import Counter
+from itertools import islice
+
+import joblib
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import classification_report
+
+from src import config
+from src.dataset_store import DatasetStore
+from src.file_io import preprocess_text
+from src.label_data import iter_jsonl_dataset
+from src.logging_config import setup_logger
+from src.streaming_tfidf import make_vectorizer
+from src.train_model import load_dataset
+
+logger = setup_logger("train_incremental", "./logs/train_incremental.log")
+
+
+def iter_dataset_batches(dataset_path, batch_size=1024):
+    """
+    Yields (texts, labels) batches of preprocessed text from a dataset store
+    directory, a dataset.jsonl file or a legacy dataset.json file.
+    """
+    if os.path.isdir(dataset_path):
+        # Store texts were normalized when the store was written.
+        yield from DatasetStore(dataset_path).iter_batches(batch_size)
+        return
+
+    if dataset_path.endswith(".jsonl"):
+        records = iter_jsonl_dataset(dataset_path)
+    else:
+        records = iter(load_dataset(dataset_path))
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield [preprocess_text(text) for text, _ in batch], [
+            label for _, label in batch
+        ]
+
+
+def _split_holdout(texts, labels, offset, holdout_every):
+    """
+    Splits a batch into train and held-out parts by global record position.
+    """
+    train, holdout = ([], []), ([], [])
+    for position, (text, label) in enumerate(zip(texts, labels), start=offset):
+        target = holdout if holdout_every and position % holdout_every == 0 else train
+        target[0].append(text)
+        target[1].append(label)
+    return train, holdout
+
+
+def _fit_idf_and_count_labels(dataset_path, vectorizer, batch_size, holdout_every):
+    """
+    Streams the training split once to accumulate document frequencies and label counts.
+    """
+    hashing, tfidf = vectorizer.named_steps["hashing"], vectorizer.named_steps["tfidf"]
+    label_counts = Counter()
+    offset = 0
+    for texts, labels in iter_dataset_batches(dataset_path, batch_size):
+        (train_texts, train_labels), _ = _split_holdout(
+            texts, labels, offset, holdout_every
+        )
+        offset += len(texts)
+        if train_texts:
+            tfidf.partial_fit(hashing.transform(train_texts))
+            label_counts.update(train_labels)
+    return label_counts
+
+
+def _balanced_class_weight(label_counts):
+    """
+    Mirrors class_weight="balanced", which partial_fit does not accept.
+    """
+    total = sum(label_counts.values())
+    return {
+        label: total / (len(label_counts) * count)
+        for label, count in label_counts.items()
+    }
+
+
+def _partial_fit_pass(
+    dataset_path, model, vectorizer, classes, batch_size, holdout_every
+):
+    """
+    Streams one epoch of mini-batches into model.partial_fit.
+
+    Returns:
+        tuple: (documents trained on, held-out texts' true and predicted labels).
+    """
+    trained = 0
+    y_true, y_pred = [], []
+    offset = 0
+    for texts, labels in iter_dataset_batches(dataset_path, batch_size):
+        (train_texts, train_labels), (holdout_texts, holdout_labels) = _split_holdout(
+            texts, labels, offset, holdout_every
+        )
+        offset += len(texts)
+        if train_texts:
+            model.partial_fit(
+                vectorizer.transform(train_texts), train_labels, classes=classes
+            )
+            trained += len(train_texts)
+        if holdout_texts:
+            y_true.extend(holdout_labels)
+            y_pred.extend(model.predict(vectorizer.transform(holdout_texts)))
+    return trained, (y_true, y_pred)
+
+
+def train_incremental(
+    dataset_path,
+    epochs=3,
+    batch_size=1024,
+    n_features=2**20,
+    holdout_every=10,
+    alpha=1e-5,
+):
+    """
+    Trains a hashing + streaming TF-IDF vectorizer and an SGD logistic model
+    without holding the corpus or its feature matrix in memory.
+
+    Every holdout_every-th record is kept out of training and used for the
+    report logged after the last epoch. Memory is bounded by batch_size and
+    n_features, not by the corpus size.
+
+    Returns:
+        tuple: (model, vectorizer), ready to be saved for src/app.py.
+    """
+    vectorizer = make_vectorizer(n_features=n_features)
+    label_counts = _fit_idf_and_count_labels(
+        dataset_path, vectorizer, batch_size, holdout_every
+    )
+    if not label_counts:
+        raise ValueError(f"No training records found in {dataset_path}")
+    logger.info(f"Class Distribution: {label_counts}")
+
+    classes = np.array(sorted(label_counts))
+    model = SGDClassifier(
+        loss="log_loss",
+        alpha=alpha,
+        class_weight=_balanced_class_weight(label_counts),
+        random_state=42,
+    )
+    for epoch in range(1, epochs + 1):
+        trained, (y_true, y_pred) = _partial_fit_pass(
+            dataset_path, model, vectorizer, classes, batch_size, holdout_every
+        )
+        logger.info(f"Epoch {epoch}/{epochs}: trained on {trained} documents.")
+
+    if y_true:
+        logger.info(f"\nHoldout Set Results:\n{classification_report(y_true, y_pred)}")
+    return model, vectorizer
+
+
+def update_model(model, vectorizer, dataset_path, batch_size=1024, update_idf=False):
+    """
+    Folds newly labelled documents into an existing incremental model without a
+    full retrain.
+
+    The IDF stays frozen at its first fit by default. With ``update_idf`` the
+    new documents' frequencies are folded in too, which rescales every feature
+    under weights the model learned with the old IDF; retrain once that drift
+    matters. Labels the model has never seen cannot be added with partial_fit;
+    train a new model with train_incremental instead.
+    """
+    unknown = set()
+    for texts, labels in iter_dataset_batches(dataset_path, batch_size):
+        unknown.update(set(labels) - set(model.classes_))
+    if unknown:
+        raise ValueError(f"Labels not known to the model: {sorted(unknown)}")
+
+    hashing, tfidf = vectorizer.named_steps["hashing"], vectorizer.named_steps["tfidf"]
+    updated = 0
+    for texts, labels in iter_dataset_batches(dataset_path, batch_size):
+        if update_idf:
+            tfidf.partial_fit(hashing.transform(texts))
+        model.partial_fit(vectorizer.transform(texts), labels)
+        updated += len(texts)
+    logger.info(f"Folded {updated} documents into the existing model.")
+    return model, vectorizer
+
+
+def save_artifacts(model, vectorizer, model_path, vectorizer_path):
+    """
+    Saves the model and vectorizer, replacing each file atomically.
+    """
+    for obj, path in ((model, model_path), (vectorizer, vectorizer_path)):
+        tmp_path = f"{path}.tmp"
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+    logger.info(f"Model and vectorizer saved to {model_path} and {vectorizer_path}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Out-of-core training with a hashing vectorizer and SGD partial_fit."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    train = subparsers.add_parser("train", help="Train a new model from scratch.")
+    train.add_argument("--epochs", type=int, default=3)
+    train.add_argument("--n-features", type=int, default=2**20)
+    train.add_argument("--holdout-every", type=int, default=10)
+    update = subparsers.add_parser(
+        "update", help="Fold newly labelled documents into the saved model."
+    )
+    update.add_argument(
+        "--update-idf",
+        action="store_true",
+        help="Also fold the new documents into the IDF (drifts from the weights).",
+    )
+    for subparser in (train, update):
+        subparser.add_argument("--dataset", default="dataset_store")
+        subparser.add_argument("--batch-size", type=int, default=1024)
+        subparser.add_argument("--model-path", default=config.MODEL_PATH)
+        subparser.add_argument("--vectorizer-path", default=config.VECTORIZER_PATH)
+    args = parser.parse_args()
+
+    try:
+        if args.command == "train":
+            model, vectorizer = train_incremental(
+                args.dataset,
+                epochs=args.epochs,
+                batch_size=args.batch_size,
+                n_features=args.n_features,
+                holdout_every=args.holdout_every,
+            )
+        else:
+            model, vectorizer = update_model(
+                joblib.load(args.model_path),
+                joblib.load(args.vectorizer_path),
+                args.dataset,
+                batch_size=args.batch_size,
+                update_idf=args.update_idf,
+            )
+        save_artifacts(model, vectorizer, args.model_path, args.vectorizer_path)
+    except Exception:
+        logger.error("An error occurred during incremental training.", exc_info=True)
+        raise
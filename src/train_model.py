@@ -1,13 +1,22 @@
+import argparse
 import json
+import os
 import re
+import statistics
+import tempfile
+import time
 from collections import Counter
 
 import joblib
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report
-from sklearn.model_selection import train_test_split
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import (GridSearchCV, RandomizedSearchCV,
+                                     StratifiedKFold, train_test_split)
+from sklearn.pipeline import Pipeline
 
+from src import config
+from src.dataset_store import DatasetStore
 from src.logging_config import setup_logger
 
 logger = setup_logger("train_model", "./logs/train_model.log")
@@ -15,11 +24,23 @@ logger = setup_logger("train_model", "./logs/train_model.log")
 
 def load_dataset(file_path):
     """
-    Loads the dataset from a JSON file.
+    Loads the dataset from a JSON file, or from a JSON Lines file built by label_data.
+
+    A dataset store directory is returned as a memory-mapped DatasetStore, which
+    iterates the same (text, label) pairs without reading everything up front.
     """
     try:
-        with open(file_path, "r") as f:
-            data = json.load(f)
+        if os.path.isdir(file_path):
+            data = DatasetStore(file_path)
+        elif file_path.endswith(".jsonl"):
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = [
+                    [record["text"], record["label"]]
+                    for record in map(json.loads, filter(str.strip, f))
+                ]
+        else:
+            with open(file_path, "r") as f:
+                data = json.load(f)
         logger.info(f"Dataset loaded successfully from {file_path}.")
         return data
     except Exception as e:
@@ -89,51 +110,278 @@ def evaluate_model(model, X, y, dataset_name):
         raise
 
 
+# Searched when no --param-grid file is given. Keys use the pipeline step names.
+DEFAULT_PARAM_GRID = {
+    "vectorizer__ngram_range": [(1, 1), (1, 2), (1, 4)],
+    "vectorizer__max_features": [2000, 5000, 20000],
+    "vectorizer__sublinear_tf": [False, True],
+    "classifier__C": [0.1, 1.0, 10.0],
+}
+
+
+def build_search_pipeline(memory=None):
+    """
+    Builds the TF-IDF + logistic regression pipeline searched by run_hyperparameter_search.
+
+    With ``memory`` set, fitted vectorizers are cached per (parameters, fold), so
+    classifier settings that share a vectorizer config reuse its matrices.
+    """
+    return Pipeline(
+        [
+            ("vectorizer", TfidfVectorizer(max_features=5000, ngram_range=(1, 4))),
+            (
+                "classifier",
+                LogisticRegression(
+                    max_iter=1000, class_weight="balanced", random_state=42
+                ),
+            ),
+        ],
+        memory=memory,
+    )
+
+
+def run_hyperparameter_search(
+    texts,
+    labels,
+    param_grid=None,
+    search="grid",
+    n_iter=20,
+    cv=5,
+    n_jobs=-1,
+    cache_dir=None,
+):
+    """
+    Runs a cross-validated grid or randomized search over vectorizer and
+    classifier parameters, using every core by default.
+
+    Returns:
+        sklearn.model_selection.BaseSearchCV: The fitted search.
+    """
+    param_grid = param_grid or DEFAULT_PARAM_GRID
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=42)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pipeline = build_search_pipeline(memory=cache_dir or tmp_dir)
+        if search == "random":
+            searcher = RandomizedSearchCV(
+                pipeline,
+                param_grid,
+                n_iter=n_iter,
+                cv=folds,
+                n_jobs=n_jobs,
+                scoring="accuracy",
+                refit=False,
+                random_state=42,
+            )
+        else:
+            searcher = GridSearchCV(
+                pipeline,
+                param_grid,
+                cv=folds,
+                n_jobs=n_jobs,
+                scoring="accuracy",
+                refit=False,
+            )
+        start = time.perf_counter()
+        searcher.fit(texts, labels)
+    logger.info(
+        f"{search.capitalize()} search over {len(searcher.cv_results_['params'])} "
+        f"candidates x {cv} folds took {time.perf_counter() - start:.1f}s."
+    )
+    return searcher
+
+
+def measure_inference_cost(pipeline, texts, repeat=5):
+    """
+    Returns the median single-document latency (ms) of vectorize + predict_proba,
+    the way the API scores one upload at a time.
+    """
+    vectorizer, model = pipeline.named_steps.values()
+    latencies = []
+    for _ in range(repeat):
+        for text in texts:
+            start = time.perf_counter()
+            model.predict_proba(vectorizer.transform([text]))
+            latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def search_report(searcher, n_samples):
+    """
+    Reports every searched candidate's CV accuracy next to its inference cost,
+    fastest first, from ``searcher.cv_results_`` alone: no candidate is refit.
+
+    The cost is the mean time the search spent scoring a validation fold
+    (vectorize + predict, batched), per document of the ``n_samples`` searched.
+    """
+    results = searcher.cv_results_
+    latency_ms = results["mean_score_time"] * 1000 / (n_samples / searcher.n_splits_)
+    rows = [
+        {
+            "params": {
+                name: list(value) if isinstance(value, tuple) else value
+                for name, value in params.items()
+            },
+            "cv_accuracy": float(results["mean_test_score"][index]),
+            "cv_accuracy_std": float(results["std_test_score"][index]),
+            "fit_seconds": float(results["mean_fit_time"][index]),
+            "latency_ms_per_doc": float(latency_ms[index]),
+        }
+        for index, params in enumerate(results["params"])
+    ]
+    return sorted(rows, key=lambda row: row["latency_ms_per_doc"])
+
+
+def evaluate_candidate(row, X_train, y_train, X_test, y_test, latency_docs=100):
+    """
+    Refits one report row on the training data and adds its test accuracy,
+    vocabulary size and median single-document latency to the row.
+
+    Returns:
+        sklearn.pipeline.Pipeline: The fitted pipeline.
+    """
+    params = {
+        name: tuple(value) if isinstance(value, list) else value
+        for name, value in row["params"].items()
+    }
+    pipeline = build_search_pipeline().set_params(**params).fit(X_train, y_train)
+    row["test_accuracy"] = float(accuracy_score(y_test, pipeline.predict(X_test)))
+    row["vocabulary_size"] = len(pipeline.named_steps["vectorizer"].vocabulary_)
+    row["single_doc_latency_ms"] = measure_inference_cost(
+        pipeline, X_test[:latency_docs]
+    )
+    return pipeline
+
+
+def select_fastest(report, min_accuracy):
+    """
+    Returns the fastest report row whose CV accuracy meets min_accuracy, or None.
+    """
+    return next((row for row in report if row["cv_accuracy"] >= min_accuracy), None)
+
+
+def search_mode(args, X_train, y_train, X_test, y_test):
+    """
+    Runs the CLI hyperparameter search, writes the report and optionally saves
+    the fastest model that meets the accuracy bar.
+    """
+    param_grid = None
+    if args.param_grid:
+        with open(args.param_grid) as f:
+            # JSON has no tuples; ranges such as ngram_range arrive as lists.
+            param_grid = {
+                name: [tuple(v) if isinstance(v, list) else v for v in values]
+                for name, values in json.load(f).items()
+            }
+    searcher = run_hyperparameter_search(
+        X_train,
+        y_train,
+        param_grid=param_grid,
+        search=args.search,
+        n_iter=args.n_iter,
+        cv=args.cv,
+        n_jobs=args.n_jobs,
+        cache_dir=args.cache_dir,
+    )
+    report = search_report(searcher, len(y_train))
+    for row in report:
+        logger.info(
+            f"cv={row['cv_accuracy']:.4f} latency={row['latency_ms_per_doc']:.3f}ms "
+            f"{row['params']}"
+        )
+
+    best = select_fastest(report, args.min_accuracy)
+    pipeline = None
+    if best is not None:
+        # Only the selected candidate is refit, for its test metrics and to save it.
+        pipeline = evaluate_candidate(best, X_train, y_train, X_test, y_test)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=4)
+    if best is None:
+        raise ValueError(f"No candidate reached CV accuracy {args.min_accuracy}")
+    logger.info(f"Fastest candidate meeting the accuracy bar: {best}")
+    if args.save_best:
+        joblib.dump(pipeline.named_steps["classifier"], config.MODEL_PATH)
+        joblib.dump(pipeline.named_steps["vectorizer"], config.VECTORIZER_PATH)
+        logger.info("Selected model and vectorizer saved successfully.")
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Train the document classifier, optionally with a hyperparameter search."
+    )
+    parser.add_argument("--search", choices=("grid", "random"))
+    parser.add_argument("--param-grid", help="JSON file overriding the searched grid.")
+    parser.add_argument("--n-iter", type=int, default=20)
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--cache-dir", help="Keep fitted fold vectorizers here.")
+    parser.add_argument("--min-accuracy", type=float, default=0.97)
+    parser.add_argument("--report", default="search_report.json")
+    parser.add_argument(
+        "--save-best",
+        action="store_true",
+        help="Save the fastest model meeting --min-accuracy as the served model.",
+    )
+    args = parser.parse_args()
+
     try:
-        dataset_path = "dataset.json"
+        if os.path.isdir("dataset_store"):
+            dataset_path = "dataset_store"
+        elif os.path.exists("dataset.jsonl"):
+            dataset_path = "dataset.jsonl"
+        else:
+            dataset_path = "dataset.json"
         dataset = load_dataset(dataset_path)
-        texts = [preprocess_text(text) for text, label in dataset]
-        labels = [label for _, label in dataset]
+        if isinstance(dataset, DatasetStore):
+            # Store texts were normalized when the store was written.
+            texts = [text for text, _ in dataset]
+            labels = list(dataset.labels)
+        else:
+            texts = [preprocess_text(text) for text, label in dataset]
+            labels = [label for _, label in dataset]
 
         class_distribution = Counter(labels)
         logger.info(f"Class Distribution: {class_distribution}")
 
         X_train, X_val, X_test, y_train, y_val, y_test = split_dataset(texts, labels)
 
-        vectorizer = TfidfVectorizer(
-            max_features=5000, ngram_range=(1, 4), stop_words=None
-        )
-        X_train_tfidf = vectorizer.fit_transform(X_train)
-        X_val_tfidf = vectorizer.transform(X_val)
-        X_test_tfidf = vectorizer.transform(X_test)
-        logger.info("TF-IDF feature extraction completed.")
-
-        model = train_classifier(X_train_tfidf, y_train)
-
-        joblib.dump(model, "./src/models/text_classifier.pkl")
-        joblib.dump(vectorizer, "./src/models/tfidf_vectorizer.pkl")
-        logger.info("Model and vectorizer saved successfully.")
-
-        evaluate_model(model, X_val_tfidf, y_val, "Validation")
-        evaluate_model(model, X_test_tfidf, y_test, "Test")
-
-        logger.info("\nTesting Classifier on New Inputs\n" + "-" * 40)
-        test_cases = [
-            "Invoice Number: 12345 for electronics purchase, total $500.",
-            "Account Statement: Savings Account XXXX-1234. Balance: $10,000.",
-            "Driver's License: Name: John Doe, License No: D12345678.",
-        ]
-        for i, text in enumerate(test_cases, start=1):
-            preprocessed_text = preprocess_text(text)
-            new_text_tfidf = vectorizer.transform([preprocessed_text])
-            probabilities = model.predict_proba(new_text_tfidf)[0]
-            predicted_label = model.classes_[probabilities.argmax()]
-            logger.info(f"Test Case {i}: {text}")
-            logger.info(f"Predicted Category: {predicted_label}")
-            for label, prob in zip(model.classes_, probabilities):
-                logger.info(f"  {label}: {prob:.2f}")
-            logger.info("-" * 40)
+        if args.search:
+            # Cross-validation replaces the fixed validation split.
+            search_mode(args, X_train + X_val, y_train + y_val, X_test, y_test)
+        else:
+            vectorizer = TfidfVectorizer(
+                max_features=5000, ngram_range=(1, 4), stop_words=None
+            )
+            X_train_tfidf = vectorizer.fit_transform(X_train)
+            X_val_tfidf = vectorizer.transform(X_val)
+            X_test_tfidf = vectorizer.transform(X_test)
+            logger.info("TF-IDF feature extraction completed.")
+
+            model = train_classifier(X_train_tfidf, y_train)
+
+            joblib.dump(model, "./src/models/text_classifier.pkl")
+            joblib.dump(vectorizer, "./src/models/tfidf_vectorizer.pkl")
+            logger.info("Model and vectorizer saved successfully.")
+
+            evaluate_model(model, X_val_tfidf, y_val, "Validation")
+            evaluate_model(model, X_test_tfidf, y_test, "Test")
+
+            logger.info("\nTesting Classifier on New Inputs\n" + "-" * 40)
+            test_cases = [
+                "Invoice Number: 12345 for electronics purchase, total $500.",
+                "Account Statement: Savings Account XXXX-1234. Balance: $10,000.",
+                "Driver's License: Name: John Doe, License No: D12345678.",
+            ]
+            for i, text in enumerate(test_cases, start=1):
+                preprocessed_text = preprocess_text(text)
+                new_text_tfidf = vectorizer.transform([preprocessed_text])
+                probabilities = model.predict_proba(new_text_tfidf)[0]
+                predicted_label = model.classes_[probabilities.argmax()]
+                logger.info(f"Test Case {i}: {text}")
+                logger.info(f"Predicted Category: {predicted_label}")
+                for label, prob in zip(model.classes_, probabilities):
+                    logger.info(f"  {label}: {prob:.2f}")
+                logger.info("-" * 40)
 
     except Exception:
         logger.error("An error occurred during training.", exc_info=True)
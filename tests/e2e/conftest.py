@@ -1,6 +1,9 @@
 import pytest
+from starlette.testclient import TestClient
 
+from src import config
 from src.app import app
+from src.asgi import app as asgi_app
 
 
 @pytest.fixture
@@ -8,3 +11,15 @@ def client():
     app.config["TESTING"] = True
     with app.test_client() as client:
         yield client
+
+
+@pytest.fixture(scope="module")
+def asgi_client():
+    # One pool process keeps start-up short; the lifespan spawns it.
+    workers = config.ASGI_PROCESS_WORKERS
+    config.ASGI_PROCESS_WORKERS = 1
+    try:
+        with TestClient(asgi_app) as client:
+            yield client
+    finally:
+        config.ASGI_PROCESS_WORKERS = workers
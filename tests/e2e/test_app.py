@@ -1,7 +1,17 @@
 import os
+import socket
+import subprocess
+import sys
+import time
+import zipfile
 from io import BytesIO
 
 import pytest
+import requests
+
+from src import config
+from src.app import active_model
+from src.model_registry import publish_version
 
 
 @pytest.mark.slow
@@ -30,9 +40,9 @@ def test_no_selected_file(client):
 @pytest.mark.slow
 def test_file_type_not_allowed(client):
     """
-    Test if the API returns 400 when the uploaded file type is not allowed.
+    Test if the API returns 400 when the uploaded content type is not allowed.
     """
-    data = {"file": (BytesIO(b"dummy content"), "file.txt")}
+    data = {"file": (BytesIO(b"\x00\x01\x02\x03 binary"), "file.bin")}
     response = client.post(
         "/classify_file", data=data, content_type="multipart/form-data"
     )
@@ -40,6 +50,48 @@ def test_file_type_not_allowed(client):
     assert response.get_json() == {"error": "File type not allowed"}
 
 
+@pytest.mark.slow
+def test_file_too_large(client, mocker):
+    """
+    Test if the API returns 413 when the upload exceeds MAX_DOCUMENT_BYTES.
+    """
+    mocker.patch.object(config, "MAX_DOCUMENT_BYTES", 10)
+    data = {"file": (BytesIO(b"plain text longer than ten bytes"), "file.txt")}
+    response = client.post(
+        "/classify_file", data=data, content_type="multipart/form-data"
+    )
+    assert response.status_code == 413
+    assert response.get_json() == {"error": "File too large"}
+
+
+@pytest.mark.slow
+def test_classification_follows_content_not_extension(client):
+    """
+    Test that a mislabelled file is parsed by the extractor for its content.
+    """
+    with open("./test_data/invoice_1.pdf", "rb") as file_data:
+        data = {"file": (BytesIO(file_data.read()), "invoice_1.png")}
+    response = client.post(
+        "/classify_file", data=data, content_type="multipart/form-data"
+    )
+    assert response.status_code == 200
+    assert response.get_json()["file_class"] == "invoices"
+
+
+@pytest.mark.slow
+def test_text_upload_is_classified(client):
+    """
+    Test that plain text uploads are now classified.
+    """
+    text = b"Invoice Number: 12345. Amount due: $500. Payment terms: net 30."
+    data = {"file": (BytesIO(text), "file.txt")}
+    response = client.post(
+        "/classify_file", data=data, content_type="multipart/form-data"
+    )
+    assert response.status_code == 200
+    assert response.get_json()["file_class"] == "invoices"
+
+
 @pytest.mark.slow
 def test_successful_classification(client):
     """
@@ -72,5 +124,409 @@ def test_successful_classification(client):
 
         assert response.status_code == 200
         assert response.get_json() == {
-            "file_class": expected_class
+            "file_class": expected_class,
+            "model_version": active_model.current.version,
         }, f"Failed for {filename}"
+
+
+@pytest.mark.slow
+def test_batch_no_files(client):
+    """
+    Test if the batch API returns 400 when no files are in the request.
+    """
+    response = client.post("/classify_batch")
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "No files in the request"}
+
+
+@pytest.mark.slow
+def test_batch_classification(client):
+    """
+    Test the /classify_batch endpoint keeps input order and reports per-file errors.
+    """
+    test_dir = "./test_data/"
+    filenames = ["invoice_1.pdf", "bank_statement_1.pdf", "invoice_2.pdf"]
+
+    files = []
+    for filename in filenames:
+        with open(os.path.join(test_dir, filename), "rb") as file_data:
+            files.append((BytesIO(file_data.read()), filename))
+    files.insert(1, (BytesIO(b"\x00\x01\x02\x03 binary"), "file.bin"))
+
+    response = client.post(
+        "/classify_batch", data={"files": files}, content_type="multipart/form-data"
+    )
+
+    assert response.status_code == 200
+    assert response.get_json()["results"] == [
+        {"filename": "invoice_1.pdf", "file_class": "invoices"},
+        {"filename": "file.bin", "error": "File type not allowed"},
+        {"filename": "bank_statement_1.pdf", "file_class": "bank_statements"},
+        {"filename": "invoice_2.pdf", "file_class": "invoices"},
+    ]
+
+
+@pytest.mark.slow
+def test_batch_classification_from_zip(client):
+    """
+    Test the /classify_batch endpoint expands zip archives into per-member results.
+    """
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write("./test_data/bank_statement_2.pdf", "a/statement.pdf")
+        zf.write("./test_data/invoice_3.pdf", "b/statement.pdf")
+    archive.seek(0)
+
+    response = client.post(
+        "/classify_batch",
+        data={"files": [(archive, "batch.zip")]},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 200
+    assert response.get_json()["results"] == [
+        {"filename": "a/statement.pdf", "file_class": "bank_statements"},
+        {"filename": "b/statement.pdf", "file_class": "invoices"},
+    ]
+
+
+@pytest.mark.slow
+def test_batch_zip_members_checked_before_reading(client, mocker):
+    """
+    Test oversized archive members are reported without being read, and an
+    archive with too many members rejects the batch.
+    """
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("small.txt", "Invoice total due")
+        zf.writestr("bomb.txt", "0" * 100_000)
+    payload = archive.getvalue()
+    mocker.patch.object(config, "MAX_DOCUMENT_BYTES", 1000)
+
+    response = client.post(
+        "/classify_batch",
+        data={"files": [(BytesIO(payload), "batch.zip")]},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert "file_class" in results[0]
+    assert results[1] == {"filename": "bomb.txt", "error": "File too large"}
+
+    mocker.patch("src.app.MAX_BATCH_FILES", 1)
+    response = client.post(
+        "/classify_batch",
+        data={"files": [(BytesIO(payload), "batch.zip")]},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.slow
+def test_repeated_upload_served_from_cache(client):
+    """
+    Test a re-submitted file is answered from the result cache.
+    """
+    with open("./test_data/invoice_499.pdf", "rb") as file_data:
+        content = file_data.read()
+
+    for _ in range(2):
+        before = client.get("/cache/stats").get_json()
+        response = client.post(
+            "/classify_file",
+            data={"file": (BytesIO(content), "invoice_499.pdf")},
+            content_type="multipart/form-data",
+        )
+        assert response.get_json()["file_class"] == "invoices"
+
+    after = client.get("/cache/stats").get_json()
+    assert after["hits"] == before["hits"] + 1
+
+
+@pytest.mark.slow
+def test_early_exit_reports_pages_consumed(client):
+    """
+    Test early exit mode stops reading once the prediction is confident.
+    """
+    with open("./test_data/bank_statement_3.pdf", "rb") as file_data:
+        data = {"file": (BytesIO(file_data.read()), "bank_statement_3.pdf")}
+
+    response = client.post(
+        "/classify_file?early_exit=true&confidence_threshold=0.5&page_budget=1",
+        data=data,
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result["file_class"] == "bank_statements"
+    assert result["pages_consumed"] == 1
+    assert result["confidence"] >= 0.5
+
+
+@pytest.mark.slow
+def test_async_job_classification(client):
+    """
+    Test a job submitted to /jobs can be polled until its result is ready.
+    """
+    with open("./test_data/invoice_1.pdf", "rb") as file_data:
+        data = {"file": (BytesIO(file_data.read()), "invoice_1.pdf")}
+
+    response = client.post("/jobs", data=data, content_type="multipart/form-data")
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+
+    for _ in range(500):
+        job = client.get(f"/jobs/{job_id}").get_json()
+        if job["status"] in {"done", "failed"}:
+            break
+        time.sleep(0.01)
+
+    assert job["status"] == "done"
+    assert job["result"] == {
+        "file_class": "invoices",
+        "model_version": active_model.current.version,
+    }
+
+
+@pytest.mark.slow
+def test_async_job_with_classification_error_fails(client, mocker):
+    """
+    Test a job whose classification comes back "Error" is reported failed.
+    """
+    mocker.patch("src.app.classify_document", return_value="Error")
+    data = {"file": (BytesIO(b"text"), "note.txt")}
+
+    response = client.post("/jobs", data=data, content_type="multipart/form-data")
+    job_id = response.get_json()["job_id"]
+
+    for _ in range(500):
+        job = client.get(f"/jobs/{job_id}").get_json()
+        if job["status"] in {"done", "failed"}:
+            break
+        time.sleep(0.01)
+
+    assert job["status"] == "failed"
+    assert "result" not in job
+
+
+@pytest.mark.slow
+def test_unknown_job(client):
+    """
+    Test polling an unknown job id returns 404.
+    """
+    response = client.get("/jobs/does-not-exist")
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "Job not found"}
+
+
+@pytest.mark.slow
+def test_metrics_endpoint_reports_stages(client):
+    """
+    Test /metrics exposes per-stage latencies after a classification.
+    """
+    with open("./test_data/invoice_2.pdf", "rb") as file_data:
+        data = {"file": (BytesIO(file_data.read()), "invoice_2.pdf")}
+    client.post("/classify_file", data=data, content_type="multipart/form-data")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert 'documents_classified_total{extension="pdf",file_class="invoices"}' in body
+    assert (
+        'classification_stage_seconds_count{stage="read_upload",extension="pdf"}'
+        in body
+    )
+    assert 'http_requests_total{endpoint="/classify_file",status="200"}' in body
+
+
+@pytest.mark.slow
+def test_metrics_bucket_unknown_extensions(client):
+    """
+    Test that uploads named with arbitrary extensions share one "other" label.
+    """
+    with open("./test_data/invoice_2.pdf", "rb") as file_data:
+        data = {"file": (BytesIO(file_data.read()), "invoice_2.a1b2c3")}
+    client.post("/classify_file", data=data, content_type="multipart/form-data")
+
+    body = client.get("/metrics").get_data(as_text=True)
+
+    assert 'extension="other"' in body
+    assert "a1b2c3" not in body
+
+
+@pytest.fixture
+def model_registry(tmp_path, monkeypatch):
+    registry_dir = str(tmp_path / "registry")
+    for version in ("v1", "v2"):
+        publish_version(
+            registry_dir,
+            model_path=config.MODEL_PATH,
+            vectorizer_path=config.VECTORIZER_PATH,
+            version=version,
+            activate=version == "v1",
+        )
+    monkeypatch.setattr(config, "MODEL_REGISTRY_DIR", registry_dir)
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(active_model, "registry_dir", registry_dir)
+    served = active_model.current
+    yield registry_dir
+    active_model.current = served
+
+
+@pytest.mark.slow
+def test_reload_model_requires_admin_token(client, model_registry):
+    """
+    Test /admin/reload_model rejects requests without the admin token.
+    """
+    response = client.post("/admin/reload_model", json={"version": "v2"})
+
+    assert response.status_code == 403
+    assert response.get_json() == {"error": "Invalid admin token"}
+
+
+@pytest.mark.slow
+def test_reload_model_hot_swaps_version(client, model_registry):
+    """
+    Test /admin/reload_model swaps the served version and responses report it.
+    """
+    headers = {"X-Admin-Token": "secret"}
+    assert (
+        client.post("/admin/reload_model", headers=headers).get_json()["model_version"]
+        == "v1"
+    )
+
+    response = client.post(
+        "/admin/reload_model", json={"version": "v2"}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.get_json() == {"previous_version": "v1", "model_version": "v2"}
+
+    with open("./test_data/invoice_3.pdf", "rb") as file_data:
+        data = {"file": (BytesIO(file_data.read()), "invoice_3.pdf")}
+    response = client.post(
+        "/classify_file", data=data, content_type="multipart/form-data"
+    )
+    assert response.get_json() == {"file_class": "invoices", "model_version": "v2"}
+    assert response.headers["X-Model-Version"] == "v2"
+    assert client.get("/health").get_json()["model_version"] == "v2"
+
+
+@pytest.mark.slow
+def test_reload_model_unknown_version(client, model_registry):
+    """
+    Test /admin/reload_model returns 404 for a version not in the registry.
+    """
+    response = client.post(
+        "/admin/reload_model",
+        json={"version": "v9"},
+        headers={"X-Admin-Token": "secret"},
+    )
+
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "Unknown model version v9"}
+
+
+@pytest.mark.slow
+def test_profiled_request_stores_flame_graph(client, monkeypatch, tmp_path):
+    """
+    Test that X-Profile with the admin token stores a profile of the request.
+    """
+    monkeypatch.setattr(config, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(config, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "PROFILE_INTERVAL_MS", 1)
+
+    def upload(headers):
+        with open("./test_data/invoice_1.pdf", "rb") as file_data:
+            data = {"file": (BytesIO(file_data.read()), "invoice_1.pdf")}
+        return client.post(
+            "/classify_file",
+            data=data,
+            content_type="multipart/form-data",
+            headers=headers,
+        )
+
+    response = upload({"X-Profile": "true"})
+    assert "X-Profile-Id" not in response.headers
+
+    response = upload({"X-Profile": "true", "X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    assert (tmp_path / f"{profile_id}.collapsed").exists()
+    assert (tmp_path / f"{profile_id}.speedscope.json").exists()
+
+
+@pytest.mark.slow
+def test_request_over_upload_limit_is_rejected(client, monkeypatch):
+    """
+    Test that a request body above MAX_UPLOAD_BYTES is refused with 413 before parsing.
+    """
+    monkeypatch.setitem(client.application.config, "MAX_CONTENT_LENGTH", 1024)
+
+    data = {"file": (BytesIO(b"x" * 4096), "file.txt")}
+    response = client.post(
+        "/classify_file", data=data, content_type="multipart/form-data"
+    )
+
+    assert response.status_code == 413
+    assert response.get_json() == {"error": "Request too large"}
+
+
+@pytest.mark.slow
+def test_production_server_serves_classifications():
+    """
+    Test that `python -m src.serve` starts warmed-up gunicorn workers that classify
+    uploads, and that a job can be polled on any worker.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = {
+        **os.environ,
+        "SERVER_BIND": f"127.0.0.1:{port}",
+        "SERVER_WORKERS": "2",
+        "SERVER_THREADS": "2",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "src.serve"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                requests.get(f"{url}/health", timeout=1)
+                break
+            except requests.ConnectionError:
+                assert server.poll() is None and time.monotonic() < deadline
+                time.sleep(0.2)
+
+        with open("./test_data/invoice_1.pdf", "rb") as file_data:
+            data = file_data.read()
+        response = requests.post(
+            f"{url}/classify_file", files={"file": ("invoice_1.pdf", data)}
+        )
+        # Polls open new connections, so they reach either worker.
+        job_id = requests.post(
+            f"{url}/jobs", files={"file": ("invoice_1.pdf", data)}
+        ).json()["job_id"]
+        for _ in range(100):
+            job = requests.get(f"{url}/jobs/{job_id}")
+            assert job.status_code == 200
+            if job.json()["status"] == "done":
+                break
+            time.sleep(0.1)
+    finally:
+        server.terminate()
+        server.wait()
+
+    assert response.status_code == 200
+    assert response.json()["file_class"] == "invoices"
+    assert job.json()["result"]["file_class"] == "invoices"
@@ -0,0 +1,151 @@
+import os
+import signal
+import time
+
+import pytest
+
+from src import config
+
+
+@pytest.mark.slow
+def test_asgi_classifies_upload(asgi_client):
+    """
+    Test that the ASGI /classify_file answers like the Flask route.
+    """
+    with open("./test_data/invoice_1.pdf", "rb") as file_data:
+        response = asgi_client.post(
+            "/classify_file", files={"file": ("invoice_1.pdf", file_data)}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["file_class"] == "invoices"
+    assert response.headers["X-Model-Version"] == response.json()["model_version"]
+
+
+@pytest.mark.slow
+def test_asgi_early_exit(asgi_client):
+    """
+    Test that ?early_exit=true reports the pages read.
+    """
+    with open("./test_data/invoice_1.pdf", "rb") as file_data:
+        response = asgi_client.post(
+            "/classify_file?early_exit=true&page_budget=1",
+            files={"file": ("invoice_1.pdf", file_data)},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["file_class"] == "invoices"
+    assert response.json()["pages_consumed"] == 1
+
+
+@pytest.mark.slow
+def test_asgi_no_file_in_request(asgi_client):
+    """
+    Test that a request without a file part is rejected with 400.
+    """
+    response = asgi_client.post("/classify_file", data={"other": "value"})
+
+    assert response.status_code == 400
+    assert response.json() == {"error": "No file part in the request"}
+
+
+@pytest.mark.slow
+def test_asgi_no_selected_file(asgi_client):
+    """
+    Test that a file part with an empty filename is rejected with 400.
+    """
+    body = (
+        b"--boundary\r\n"
+        b'Content-Disposition: form-data; name="file"; filename=""\r\n\r\n'
+        b"\r\n--boundary--\r\n"
+    )
+    response = asgi_client.post(
+        "/classify_file",
+        content=body,
+        headers={"Content-Type": "multipart/form-data; boundary=boundary"},
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {"error": "No selected file"}
+
+
+@pytest.mark.slow
+def test_asgi_file_type_not_allowed(asgi_client):
+    """
+    Test that content of an unsupported type is rejected with 400.
+    """
+    response = asgi_client.post(
+        "/classify_file", files={"file": ("file.pdf", b"\x00\x01\x02\x03" * 64)}
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {"error": "File type not allowed"}
+
+
+@pytest.mark.slow
+def test_asgi_request_over_upload_limit_is_rejected(asgi_client, monkeypatch):
+    """
+    Test that a request body above MAX_UPLOAD_BYTES is refused with 413.
+    """
+    monkeypatch.setattr(config, "MAX_UPLOAD_BYTES", 1024)
+
+    response = asgi_client.post(
+        "/classify_file", files={"file": ("file.txt", b"x" * 4096)}
+    )
+
+    assert response.status_code == 413
+    assert response.json() == {"error": "Request too large"}
+
+
+@pytest.mark.slow
+def test_asgi_chunked_upload_over_limit_is_rejected(asgi_client, monkeypatch):
+    """
+    Test that the upload cap holds for a chunked body without Content-Length.
+    """
+    monkeypatch.setattr(config, "MAX_UPLOAD_BYTES", 1024)
+
+    def body():
+        yield (
+            b"--boundary\r\n"
+            b'Content-Disposition: form-data; name="file"; filename="file.txt"\r\n\r\n'
+        )
+        for _ in range(8):
+            yield b"x" * 512
+        yield b"\r\n--boundary--\r\n"
+
+    response = asgi_client.post(
+        "/classify_file",
+        content=body(),
+        headers={"Content-Type": "multipart/form-data; boundary=boundary"},
+    )
+
+    assert response.status_code == 413
+    assert response.json() == {"error": "Request too large"}
+
+
+@pytest.mark.slow
+def test_asgi_restarts_pool_after_process_death(asgi_client):
+    """
+    Test that /health reports a pool broken by a dead process, and that the
+    next upload restarts the pool and is classified.
+    """
+    pool = asgi_client.app.state.pool
+    restarts = asgi_client.app.state.pool_restarts
+    for process in list(pool._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+    for _ in range(100):
+        if asgi_client.get("/health").status_code == 503:
+            break
+        time.sleep(0.05)
+    assert asgi_client.get("/health").json()["status"] == "unavailable"
+
+    with open("./test_data/invoice_1.pdf", "rb") as file_data:
+        response = asgi_client.post(
+            "/classify_file", files={"file": ("invoice_1.pdf", file_data)}
+        )
+
+    assert response.status_code == 200
+    assert response.json()["file_class"] == "invoices"
+    health = asgi_client.get("/health")
+    assert health.status_code == 200
+    assert health.json()["pool_restarts"] == restarts + 1
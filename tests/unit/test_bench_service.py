@@ -0,0 +1,119 @@
+import copy
+import socket
+
+import pytest
+
+from benchmarks.bench_service import (compare_to_baseline, flask_client_poster,
+                                      run_benchmark, run_phase, slow_clients,
+                                      summarize)
+
+
+def section(p50=10.0, errors=0, docs_per_second=50.0, peak_rss_mb=200.0):
+    return {
+        "requests": 100,
+        "errors": errors,
+        "p50_ms": p50,
+        "p95_ms": p50 * 2,
+        "p99_ms": p50 * 3,
+        "docs_per_second": docs_per_second,
+        "peak_rss_mb": peak_rss_mb,
+    }
+
+
+@pytest.fixture
+def baseline():
+    return {"overall": section(), "by_type": {"pdf": section(), "jpg": section()}}
+
+
+@pytest.mark.fast
+def test_summarize_reports_percentiles_and_throughput():
+    summary = summarize([float(ms) for ms in range(1, 101)], errors=2, seconds=2.0)
+
+    assert summary["requests"] == 102
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p99_ms"] == pytest.approx(99.01)
+    assert summary["docs_per_second"] == 50
+    assert summarize([], errors=1, seconds=1.0)["p95_ms"] is None
+
+
+@pytest.mark.fast
+def test_compare_to_baseline_accepts_noise_within_tolerance(baseline):
+    report = copy.deepcopy(baseline)
+    report["overall"]["p50_ms"] = 11.5
+    report["by_type"]["pdf"]["docs_per_second"] = 42.0
+    report["by_type"]["docx"] = section(p50=1000.0)
+
+    assert compare_to_baseline(report, baseline, tolerance=0.2) == []
+
+
+@pytest.mark.fast
+def test_compare_to_baseline_flags_regressions(baseline):
+    report = copy.deepcopy(baseline)
+    report["by_type"]["pdf"] = section(p50=20.0, docs_per_second=30.0)
+    report["by_type"]["jpg"] = section(errors=3, peak_rss_mb=400.0)
+
+    regressions = compare_to_baseline(report, baseline, tolerance=0.2)
+
+    assert any(r.startswith("pdf: p95_ms") for r in regressions)
+    assert any(r.startswith("pdf: docs_per_second") for r in regressions)
+    assert any(r.startswith("jpg: 3 errors") for r in regressions)
+    assert any(r.startswith("jpg: peak_rss_mb") for r in regressions)
+    assert not any(r.startswith("overall") for r in regressions)
+
+
+@pytest.mark.fast
+def test_run_benchmark_breaks_down_by_file_type():
+    posted = []
+
+    def post(filename, data):
+        posted.append(filename)
+        return "error" if filename == "broken.pdf" else "ok"
+
+    corpus = [("a.pdf", b""), ("broken.pdf", b""), ("b.docx", b"")]
+
+    report = run_benchmark(post, corpus, concurrency=2, repeat=2, rss=lambda: 1.0)
+
+    assert set(report["by_type"]) == {"docx", "pdf"}
+    assert report["by_type"]["pdf"]["requests"] == 4
+    assert report["by_type"]["pdf"]["errors"] == 2
+    assert report["overall"]["requests"] == 6
+    assert report["overall"]["peak_rss_mb"] == 1.0
+    # One warm-up upload per file type precedes the measured phases.
+    assert len(posted) == 2 + 6
+
+
+@pytest.mark.fast
+def test_failed_classifications_are_not_counted_as_throughput(mocker):
+    outcomes = {"good.txt": "invoices", "bad.txt": "Error", "blank.txt": "Unknown"}
+    mocker.patch(
+        "src.app.classify_document",
+        side_effect=lambda file, *args, **kwargs: outcomes[file.filename],
+    )
+    corpus = [(filename, b"text") for filename in outcomes]
+
+    latencies, errors, unknown, seconds = run_phase(
+        flask_client_poster(), corpus, concurrency=1
+    )
+
+    assert (len(latencies), errors, unknown) == (2, 1, 1)
+    summary = summarize(latencies, errors, seconds, unknown)
+    assert summary["docs_per_second"] == pytest.approx(2 / seconds)
+
+
+@pytest.mark.fast
+def test_slow_clients_trickle_open_uploads():
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        port = listener.getsockname()[1]
+
+        with slow_clients(f"http://127.0.0.1:{port}", 3, interval=0.01):
+            accepted = [listener.accept()[0] for _ in range(3)]
+            for connection in accepted:
+                with connection:
+                    connection.settimeout(5)
+                    received = b""
+                    while not received.endswith(b"x"):
+                        received += connection.recv(4096)
+                    assert received.startswith(b"POST /classify_file HTTP/1.1")
+                    assert b'filename="slow.txt"' in received
@@ -0,0 +1,99 @@
+import sqlite3
+
+import pytest
+
+from src.cache import ResultCache
+
+
+@pytest.mark.fast
+def test_cache_key_depends_on_bytes_and_model_version():
+    key = ResultCache.make_key(b"same bytes", "v1")
+    assert key == ResultCache.make_key(b"same bytes", "v1")
+    assert key != ResultCache.make_key(b"other bytes", "v1")
+    assert key != ResultCache.make_key(b"same bytes", "v2")
+
+
+@pytest.mark.fast
+def test_cache_lru_eviction_and_counters():
+    cache = ResultCache(max_entries=2)
+    cache.set("a", {"text": "a"})
+    cache.set("b", {"text": "b"})
+    assert cache.get("a") == {"text": "a"}  # "b" is now least recently used
+    cache.set("c", {"text": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("c") == {"text": "c"}
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["entries"] == 2
+
+
+@pytest.mark.fast
+def test_cache_ttl_expiry(mocker):
+    clock = mocker.patch("src.cache.time.time", return_value=1000.0)
+    cache = ResultCache(ttl_seconds=10)
+    cache.set("a", {"text": "a"})
+
+    clock.return_value = 1005.0
+    assert cache.get("a") == {"text": "a"}
+    clock.return_value = 1011.0
+    assert cache.get("a") is None
+
+
+@pytest.mark.fast
+def test_cache_disk_tier_survives_restart(tmp_path):
+    db_path = tmp_path / "cache.sqlite"
+    ResultCache(db_path=db_path).set("a", {"probabilities": {"invoices": 0.9}})
+
+    restarted = ResultCache(db_path=db_path)
+    assert restarted.get("a") == {"probabilities": {"invoices": 0.9}}
+    assert restarted.stats()["disk_hits"] == 1
+
+
+@pytest.mark.fast
+def test_cache_reopens_disk_tier_in_forked_worker(tmp_path, monkeypatch):
+    cache = ResultCache(db_path=tmp_path / "cache.sqlite")
+    cache.set("a", {"text": "a"})
+    parent_connection = cache._db
+
+    monkeypatch.setattr("src.cache.os.getpid", lambda: -1)
+    cache._entries.clear()
+
+    assert cache.get("a") == {"text": "a"}
+    assert cache._db is not parent_connection
+
+
+@pytest.mark.fast
+def test_cache_purges_expired_disk_rows(tmp_path, mocker):
+    clock = mocker.patch("src.cache.time.time", return_value=1000.0)
+    db_path = tmp_path / "cache.sqlite"
+    cache = ResultCache(ttl_seconds=10, db_path=db_path, purge_every=2)
+    cache.set("old", {"text": "old"})
+
+    def disk_keys(cache):
+        return {key for (key,) in cache._db.execute("SELECT key FROM results")}
+
+    clock.return_value = 1020.0
+    cache.set("a", {"text": "a"})
+    assert disk_keys(cache) == {"a"}
+
+    cache.set("b", {"text": "b"})
+    clock.return_value = 1040.0
+    assert disk_keys(ResultCache(ttl_seconds=10, db_path=db_path)) == set()
+
+
+@pytest.mark.fast
+def test_cache_disk_errors_are_misses(tmp_path, mocker):
+    cache = ResultCache(db_path=tmp_path / "cache.sqlite")
+    cache.set("a", {"text": "a"})
+    cache._entries.clear()
+    locked = mocker.MagicMock()
+    locked.execute.side_effect = sqlite3.OperationalError("database is locked")
+    cache._db = locked
+
+    assert cache.get("a") is None
+    cache.set("b", {"text": "b"})
+
+    assert cache.get("b") == {"text": "b"}
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,157 @@
+import sys
+import zipfile
+from email.message import EmailMessage
+from io import BytesIO
+
+import fitz
+import pytest
+from PIL import Image
+
+from src import config
+from src.content_type import detect_file_type
+from src.file_io import (DocumentTooLarge, UnsupportedDocument,
+                         extract_text_from_eml, extract_text_from_html,
+                         extract_text_from_image, extract_text_from_txt,
+                         extract_text_with_fallback, inspect_document,
+                         read_head)
+
+
+def image_bytes(format, **kwargs):
+    buffer = BytesIO()
+    Image.new("RGB", (40, 30), color="white").save(buffer, format, **kwargs)
+    return buffer.getvalue()
+
+
+def pdf_bytes(text="Sample Text"):
+    with fitz.open() as pdf:
+        pdf.new_page().insert_text((72, 72), text)
+        return pdf.tobytes()
+
+
+@pytest.fixture(params=["magic", "signatures"])
+def sniffer(request, monkeypatch):
+    # Every detection must also hold without libmagic.
+    if request.param == "signatures":
+        monkeypatch.setitem(sys.modules, "magic", None)
+    return request.param
+
+
+@pytest.mark.fast
+@pytest.mark.parametrize(
+    "data, filename, expected",
+    [
+        (pdf_bytes(), "file.pdf", "pdf"),
+        (pdf_bytes(), "scan.png", "pdf"),
+        (image_bytes("PNG"), "file.pdf", "png"),
+        (image_bytes("JPEG"), "file.jpeg", "jpg"),
+        (image_bytes("JPEG", progressive=True), "file.jfif", "jpg"),
+        (image_bytes("TIFF"), "file.tif", "tiff"),
+        (b"Invoice total: $500", "notes.txt", "txt"),
+        (b"<!DOCTYPE html><html><body>Invoice</body></html>", "page.html", "html"),
+        (b"<p>Invoice</p>", "fragment.htm", "html"),
+        (b"From: a@example.com\nSubject: Invoice\n\nBody", "mail.eml", "eml"),
+        (b"\x00\x01\x02\x03 binary", "file.pdf", None),
+        (b"", "file.pdf", None),
+    ],
+)
+def test_detect_file_type(sniffer, data, filename, expected):
+    assert detect_file_type(data, filename) == expected
+
+
+@pytest.mark.fast
+def test_detect_office_files_from_head(sniffer, temp_docx, temp_excel):
+    assert detect_file_type(read_head(temp_docx), "file.docx") == "docx"
+    assert detect_file_type(read_head(temp_excel), "file.xlsx") == "xlsx"
+    # A plain zip is only an Office file when its extension says so.
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("notes.bin", b"\x00" * 100)
+    assert detect_file_type(archive.getvalue(), "file.pdf") is None
+
+
+@pytest.mark.fast
+def test_read_head_rewinds_streams():
+    stream = BytesIO(b"x" * 10_000)
+    stream.seek(5)
+
+    assert len(read_head(stream, size=100)) == 100
+    assert stream.tell() == 5
+
+
+@pytest.mark.fast
+def test_inspect_document_rejects_before_parsing(mocker):
+    mocker.patch.object(config, "MAX_DOCUMENT_BYTES", 100)
+    parse = mocker.patch("src.file_io.extract_text_from_pdf")
+
+    with pytest.raises(DocumentTooLarge):
+        inspect_document(BytesIO(b"%PDF-1.4" + b" " * 200), "big.pdf")
+    with pytest.raises(UnsupportedDocument):
+        inspect_document(b"\x00\x01\x02\x03", "file.pdf")
+    assert extract_text_with_fallback(b"\x00\x01\x02\x03", filename="x.pdf") == ""
+    parse.assert_not_called()
+
+
+@pytest.mark.fast
+def test_extract_text_from_multipage_tiff(mocker):
+    ocr = mocker.patch("src.file_io._ocr_image", side_effect=["page one", "page two"])
+    frames = [Image.new("L", (40, 30), color=value) for value in (255, 128)]
+    buffer = BytesIO()
+    frames[0].save(buffer, "TIFF", save_all=True, append_images=frames[1:])
+
+    text = extract_text_with_fallback(buffer.getvalue(), filename="scan.tiff")
+
+    assert text == "page one\npage two"
+    assert ocr.call_count == 2
+
+
+@pytest.mark.fast
+def test_extract_text_from_image_converts_cmyk(mocker):
+    ocr = mocker.patch("src.file_io._ocr_image", return_value="text")
+    buffer = BytesIO()
+    Image.new("CMYK", (40, 30)).save(buffer, "JPEG")
+
+    assert extract_text_from_image(buffer.getvalue()) == "text"
+    assert ocr.call_args.args[0].mode == "RGB"
+
+
+@pytest.mark.fast
+def test_extract_text_from_txt_decodes_legacy_encodings():
+    assert extract_text_from_txt("Café total".encode("utf-8-sig")) == ("Café total")
+    assert extract_text_from_txt("Café total".encode("cp1252")) == ("Café total")
+
+
+@pytest.mark.fast
+def test_extract_text_from_html_drops_markup_and_scripts():
+    html = (
+        b"<html><head><title>t</title><script>var x = 1;</script></head>"
+        b"<body><h1>Invoice</h1><p>Total due</p></body></html>"
+    )
+
+    text = extract_text_from_html(html)
+
+    assert "Invoice" in text and "Total due" in text
+    assert "var x" not in text and "<p>" not in text
+
+
+@pytest.mark.fast
+def test_extract_text_from_eml_reads_body_and_attachments():
+    message = EmailMessage()
+    message["Subject"] = "Your invoice"
+    message["From"] = "billing@example.com"
+    message.set_content("Please find the invoice attached.")
+    message.add_attachment(
+        pdf_bytes("Invoice Number 12345"),
+        maintype="application",
+        subtype="pdf",
+        filename="invoice.pdf",
+    )
+    message.add_attachment(
+        b"\x00\x01\x02", maintype="application", subtype="octet-stream"
+    )
+
+    text = extract_text_with_fallback(message.as_bytes(), filename="mail.eml")
+
+    assert text.startswith("Your invoice")
+    assert "Please find the invoice attached." in text
+    assert "Invoice Number 12345" in text
+    assert extract_text_from_eml(message.as_bytes()) == text
@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.dataset_store import (DatasetStore, convert_json_to_store,
+                               convert_store_to_json, write_dataset_store)
+from src.train_model import load_dataset
+
+RECORDS = [
+    ("Invoice  number 1\n total", "invoices", "./training_data/invoices/a.pdf"),
+    ("Account statement", "bank_statements", "./training_data/bank_statements/b.pdf"),
+    ("Facture numéro 2", "invoices", "./training_data/invoices/c.docx"),
+    ("", "drivers_licence", ""),
+]
+
+
+@pytest.fixture
+def store_dir(tmp_path):
+    path = str(tmp_path / "store")
+    write_dataset_store(iter(RECORDS), path)
+    return path
+
+
+@pytest.mark.fast
+def test_store_normalizes_and_reads_records(store_dir):
+    store = DatasetStore(store_dir)
+
+    assert len(store) == 4
+    assert store[0] == ("Invoice number 1 total", "invoices")
+    assert store[2] == ("Facture numéro 2", "invoices")
+    assert store[3] == ("", "drivers_licence")
+    assert store.source(1) == "./training_data/bank_statements/b.pdf"
+    assert list(store.labels) == [label for _, label, _ in RECORDS]
+
+
+@pytest.mark.fast
+def test_store_is_memory_mapped(store_dir):
+    store = DatasetStore(store_dir)
+
+    assert isinstance(store._texts, np.memmap)
+    assert isinstance(store.text_offsets, np.memmap)
+    assert isinstance(store.label_codes, np.memmap)
+
+
+@pytest.mark.fast
+def test_iter_batches(store_dir):
+    batches = list(DatasetStore(store_dir).iter_batches(batch_size=3))
+
+    assert [len(texts) for texts, _ in batches] == [3, 1]
+    assert batches[1] == ([""], ["drivers_licence"])
+
+    texts, labels = next(
+        DatasetStore(store_dir).iter_batches(batch_size=2, indices=np.array([2, 0]))
+    )
+    assert texts == ["Facture numéro 2", "Invoice number 1 total"]
+    assert labels == ["invoices", "invoices"]
+
+
+@pytest.mark.fast
+@pytest.mark.parametrize("file_name", ["dataset.json", "dataset.jsonl"])
+def test_json_roundtrip(tmp_path, file_name):
+    source_file = tmp_path / f"source_{file_name}"
+    if file_name.endswith(".jsonl"):
+        source_file.write_text(
+            "".join(
+                json.dumps({"text": text, "label": label, "source": source}) + "\n"
+                for text, label, source in RECORDS
+            ),
+            encoding="utf-8",
+        )
+    else:
+        source_file.write_text(
+            json.dumps([[text, label] for text, label, _ in RECORDS]),
+            encoding="utf-8",
+        )
+
+    store_dir = str(tmp_path / "store")
+    assert convert_json_to_store(str(source_file), store_dir) == 4
+    exported = str(tmp_path / file_name)
+    assert convert_store_to_json(store_dir, exported) == 4
+
+    assert [list(pair) for pair in load_dataset(exported)] == [
+        list(pair) for pair in DatasetStore(store_dir)
+    ]
+
+
+@pytest.mark.fast
+def test_load_dataset_accepts_store_directory(store_dir):
+    dataset = load_dataset(store_dir)
+
+    assert isinstance(dataset, DatasetStore)
+    assert list(dataset)[1] == ("Account statement", "bank_statements")
@@ -1,10 +1,17 @@
 import re
+import tarfile
+import zipfile
+from io import BytesIO
 
+import fitz
+import pandas as pd
 import pytest
 
-from src.file_io import (allowed_file, extract_text_from_docx,
+from src.file_io import (ArchiveTooLarge, allowed_file,
+                         extract_archive_members, extract_text_from_docx,
                          extract_text_from_excel, extract_text_from_image,
-                         extract_text_from_pdf, extract_text_with_fallback)
+                         extract_text_from_pdf, extract_text_with_fallback,
+                         iter_text_chunks)
 
 
 @pytest.mark.fast
@@ -16,7 +23,10 @@ from src.file_io import (allowed_file, extract_text_from_docx,
         ("file.jpg", True),
         ("file.docx", True),
         ("file.xlsx", True),
-        ("file.txt", False),
+        ("file.txt", True),
+        ("file.tiff", True),
+        ("file.eml", True),
+        ("file.exe", False),
         ("file", False),
     ],
 )
@@ -56,6 +66,22 @@ def test_extract_text_from_excel(temp_excel):
     assert "Text2" in text
 
 
+@pytest.mark.fast
+def test_extract_text_from_excel_separates_sheets():
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer) as writer:
+        pd.DataFrame({"Item": ["Laptop"]}).to_excel(
+            writer, sheet_name="First", index=False
+        )
+        pd.DataFrame({"Item": ["Mouse"]}).to_excel(
+            writer, sheet_name="Second", index=False
+        )
+
+    text = extract_text_from_excel(buffer.getvalue())
+
+    assert text == "Sheet: First\n  Item\nLaptop\n\nSheet: Second\n Item\nMouse"
+
+
 @pytest.mark.parametrize(
     "fixture", ["temp_pdf", "temp_image", "temp_docx", "temp_excel"]
 )
@@ -65,3 +91,144 @@ def test_extract_text_with_fallback(fixture, request):
     text = extract_text_with_fallback(file_path)
     assert isinstance(text, str)
     assert text != ""
+
+
+@pytest.mark.parametrize(
+    "fixture, expected",
+    [
+        ("temp_pdf", "Sample Text"),
+        ("temp_docx", "This is a test document."),
+        ("temp_excel", "Text1"),
+    ],
+)
+@pytest.mark.fast
+def test_extract_text_from_bytes_and_stream(fixture, expected, request):
+    file_path = request.getfixturevalue(fixture)
+    data = file_path.read_bytes()
+
+    assert expected in extract_text_with_fallback(data, filename=file_path.name)
+    assert expected in extract_text_with_fallback(
+        BytesIO(data), filename=file_path.name
+    )
+
+
+@pytest.fixture
+def scanned_pdf(tmp_path):
+    pdf_path = tmp_path / "scanned.pdf"
+    with fitz.open() as pdf:
+        for _ in range(4):
+            pdf.new_page()
+        pdf[1].insert_text((72, 72), "Text Layer")
+        pdf.save(pdf_path)
+    return pdf_path
+
+
+@pytest.mark.fast
+def test_extract_text_from_pdf_ocr_keeps_page_order(scanned_pdf, mocker):
+    mocker.patch("src.file_io.config.OCR_MAX_WORKERS", 3)
+    pages = iter(["page one\n", "page three\n", "page four\n"])
+    mocker.patch("src.file_io._render_page", side_effect=lambda page: next(pages))
+    mocker.patch("src.file_io._ocr_image", side_effect=lambda image: image)
+
+    text = extract_text_from_pdf(scanned_pdf)
+
+    assert text.split("\n") == ["page one", "Text Layer", "page three", "page four"]
+
+
+@pytest.mark.fast
+def test_extract_text_from_pdf_ocr_page_cap(scanned_pdf, mocker):
+    ocr = mocker.patch("src.file_io._ocr_image", return_value="ocr text\n")
+
+    text = extract_text_from_pdf(scanned_pdf, max_ocr_pages=2)
+
+    assert ocr.call_count == 2
+    assert text.count("ocr text") == 2
+    assert "Text Layer" in text
+
+
+@pytest.mark.fast
+def test_iter_text_chunks_stops_early(scanned_pdf, mocker):
+    ocr = mocker.patch("src.file_io._ocr_image", return_value="ocr text\n")
+
+    chunks = iter_text_chunks(scanned_pdf.read_bytes(), "scanned.pdf", chunk_pages=2)
+    text, pages = next(chunks)
+    chunks.close()
+
+    assert pages == 2
+    assert text == "ocr text\nText Layer\n"
+    assert ocr.call_count == 1
+
+
+class _DeferredExecutor:
+    """
+    Runs submitted work only when its result is collected, recording how many
+    submissions were outstanding at once.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def submit(self, fn, *args):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        executor = self
+
+        class _Future:
+            def result(self):
+                executor.in_flight -= 1
+                return fn(*args)
+
+        return _Future()
+
+
+@pytest.mark.fast
+def test_extract_text_from_pdf_bounds_pages_in_flight(tmp_path, mocker):
+    pdf_path = tmp_path / "long_scan.pdf"
+    with fitz.open() as pdf:
+        for _ in range(10):
+            pdf.new_page()
+        pdf.save(pdf_path)
+    executor = _DeferredExecutor()
+    mocker.patch("src.file_io._get_ocr_executor", return_value=executor)
+    mocker.patch("src.file_io.config.OCR_MAX_WORKERS", 2)
+    pages = iter(f"page {number}\n" for number in range(10))
+    mocker.patch("src.file_io._render_page", side_effect=lambda page: next(pages))
+    mocker.patch("src.file_io._ocr_image", side_effect=lambda image: image)
+
+    text = extract_text_from_pdf(pdf_path)
+
+    assert executor.max_in_flight == 4
+    assert text.split() == [
+        word for number in range(10) for word in ("page", str(number))
+    ]
+
+
+@pytest.mark.fast
+def test_extract_archive_members_skips_oversized_members_unread(mocker):
+    mocker.patch("src.file_io.config.MAX_DOCUMENT_BYTES", 10)
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("small.txt", "tiny")
+        zf.writestr("bomb.txt", "0" * 10_000)
+    read = mocker.spy(zipfile.ZipFile, "read")
+
+    members = extract_archive_members(archive.getvalue(), "batch.zip")
+
+    assert members == [("small.txt", b"tiny"), ("bomb.txt", None)]
+    assert read.call_count == 1
+
+
+@pytest.mark.fast
+def test_extract_archive_members_rejects_too_many_members():
+    archive = BytesIO()
+    with tarfile.open(fileobj=archive, mode="w") as tf:
+        for number in range(3):
+            data = b"text"
+            info = tarfile.TarInfo(f"doc_{number}.txt")
+            info.size = len(data)
+            tf.addfile(info, BytesIO(data))
+
+    with pytest.raises(ArchiveTooLarge):
+        extract_archive_members(archive.getvalue(), "batch.tar", max_members=2)
+    assert len(extract_archive_members(archive.getvalue(), "batch.tar", 3)) == 3
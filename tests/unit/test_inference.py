@@ -0,0 +1,47 @@
+import joblib
+import numpy as np
+import pytest
+
+from src.inference import InferenceBundle, export_inference_bundle
+
+TEXTS = [
+    "Invoice Number: 12345 for electronics purchase, total $500.",
+    "Account Statement: Savings Account XXXX-1234. Balance: $10,000.",
+    "Driver's License: Name: John Doe, License No: D12345678.",
+    "Account Holder: Jane Doe Statement Period: 12/2024 Date | Description | "
+    "Debit ($) | Credit ($) 03/11/2024 | Direct Deposit | 836.54 | Bank Fee",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def sklearn_pair():
+    model = joblib.load("./src/models/text_classifier.pkl")
+    vectorizer = joblib.load("./src/models/tfidf_vectorizer.pkl")
+    return model, vectorizer
+
+
+@pytest.mark.fast
+def test_bundle_matches_sklearn_probabilities(sklearn_pair, tmp_path):
+    model, vectorizer = sklearn_pair
+    bundle = InferenceBundle.load(
+        export_inference_bundle(model, vectorizer, tmp_path / "bundle"), mmap_mode="r"
+    )
+
+    expected = model.predict_proba(vectorizer.transform(TEXTS))
+    actual = bundle.predict_proba(bundle.transform(TEXTS))
+
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-12)
+    assert list(bundle.classes_) == list(model.classes_)
+
+
+@pytest.mark.fast
+def test_shipped_bundle_matches_shipped_pickles(sklearn_pair):
+    model, vectorizer = sklearn_pair
+    bundle = InferenceBundle.load("./src/models/inference_bundle")
+
+    np.testing.assert_allclose(
+        bundle.transform(TEXTS).toarray(),
+        vectorizer.transform(TEXTS).toarray(),
+        atol=1e-12,
+    )
@@ -0,0 +1,144 @@
+import threading
+import time
+
+import pytest
+
+from src.jobs import JobManager, JobQueueFull
+
+
+def wait_for_status(manager, job_id, status, timeout=5):
+    for _ in range(int(timeout / 0.01)):
+        job = manager.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} never reached status {status}")
+
+
+@pytest.mark.fast
+def test_job_runs_and_returns_result():
+    manager = JobManager(lambda filename, data: {"size": len(data)}, max_workers=1)
+    job_id = manager.submit("file.pdf", b"12345")
+
+    job = wait_for_status(manager, job_id, "done")
+
+    assert job["result"] == {"size": 5}
+    assert job["filename"] == "file.pdf"
+
+
+@pytest.mark.fast
+def test_job_failure_is_reported():
+    def handler(filename, data):
+        raise RuntimeError("boom")
+
+    manager = JobManager(handler, max_workers=1)
+    job = wait_for_status(manager, manager.submit("file.pdf", b""), "failed")
+
+    assert job["error"] == "An error occurred during classification"
+
+
+@pytest.mark.fast
+def test_job_queue_full_applies_backpressure():
+    release = threading.Event()
+    manager = JobManager(
+        lambda filename, data: release.wait(5), max_workers=1, max_queue=1
+    )
+    first = manager.submit("a.pdf", b"")
+    wait_for_status(manager, first, "running")
+    manager.submit("b.pdf", b"")
+
+    with pytest.raises(JobQueueFull):
+        manager.submit("c.pdf", b"")
+    release.set()
+
+
+@pytest.mark.fast
+def test_finished_jobs_expire(mocker):
+    manager = JobManager(
+        lambda filename, data: {}, max_workers=1, result_ttl_seconds=10
+    )
+    job_id = manager.submit("file.pdf", b"")
+    job = wait_for_status(manager, job_id, "done")
+
+    mocker.patch("src.jobs.time.time", return_value=job["finished_at"] + 11)
+    assert manager.get(job_id) is None
+
+
+@pytest.mark.fast
+def test_job_state_is_shared_through_database(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite")
+    worker_a = JobManager(lambda filename, data: {"size": len(data)}, db_path=db_path)
+    worker_b = JobManager(lambda filename, data: {}, db_path=db_path)
+
+    job_id = worker_a.submit("file.pdf", b"12345")
+    job = wait_for_status(worker_b, job_id, "done")
+
+    assert job["result"] == {"size": 5}
+    assert worker_b.get("unknown") is None
+
+
+@pytest.mark.fast
+def test_finished_jobs_expire_from_database(tmp_path, mocker):
+    manager = JobManager(
+        lambda filename, data: {},
+        result_ttl_seconds=10,
+        db_path=str(tmp_path / "jobs.sqlite"),
+    )
+    job = wait_for_status(manager, manager.submit("file.pdf", b""), "done")
+
+    mocker.patch("src.jobs.time.time", return_value=job["finished_at"] + 11)
+    assert manager.get(job["job_id"]) is None
+
+
+@pytest.mark.fast
+def test_jobs_of_a_dead_process_fail_and_expire(tmp_path, mocker):
+    db_path = str(tmp_path / "jobs.sqlite")
+    mocker.patch("src.jobs.os.getpid", return_value=999_999_999)
+    crashed = JobManager(lambda filename, data: {}, db_path=db_path)
+    crashed._start_workers = lambda: None
+    job_id = crashed.submit("file.pdf", b"")
+    mocker.stopall()
+
+    survivor = JobManager(
+        lambda filename, data: {}, result_ttl_seconds=10, db_path=db_path
+    )
+    job = survivor.get(job_id)
+
+    assert job["status"] == "failed"
+    assert job["error"] == "Job was lost when its worker process stopped"
+    mocker.patch("src.jobs.time.time", return_value=job["finished_at"] + 11)
+    survivor._next_sweep = 0.0
+    survivor._expire_jobs()
+    assert survivor._database().execute("SELECT COUNT(*) FROM jobs").fetchone() == (0,)
+
+
+@pytest.mark.fast
+def test_unfinished_job_fails_after_timeout(mocker):
+    release = threading.Event()
+    manager = JobManager(
+        lambda filename, data: release.wait(5), max_workers=1, timeout_seconds=10
+    )
+    job = wait_for_status(manager, manager.submit("a.pdf", b""), "running")
+
+    mocker.patch("src.jobs.time.time", return_value=job["submitted_at"] + 11)
+    job = manager.get(job["job_id"])
+    release.set()
+
+    assert job["status"] == "failed"
+    assert job["error"] == "Job did not finish in time"
+
+
+@pytest.mark.fast
+def test_expiry_sweep_is_throttled(tmp_path, mocker):
+    manager = JobManager(
+        lambda filename, data: {}, db_path=str(tmp_path / "jobs.sqlite")
+    )
+    job_id = manager.submit("file.pdf", b"")
+    wait_for_status(manager, job_id, "done")
+    database = mocker.spy(manager, "_database")
+
+    for _ in range(5):
+        manager.get(job_id)
+
+    # One connection lookup per get; the sweep itself stays idle.
+    assert database.call_count == 5
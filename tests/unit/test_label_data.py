@@ -0,0 +1,139 @@
+import json
+import os
+
+import pytest
+from docx import Document
+
+from src.label_data import (_init_worker, _split_workers,
+                            build_dataset_streaming, iter_jsonl_dataset,
+                            plan_chunks)
+
+
+def write_docx(path, text):
+    doc = Document()
+    doc.add_paragraph(text)
+    doc.save(path)
+
+
+@pytest.fixture
+def training_data(tmp_path):
+    data_folder = tmp_path / "training_data"
+    for label, count in {"invoices": 2, "bank_statements": 1}.items():
+        (data_folder / label).mkdir(parents=True)
+        for i in range(count):
+            write_docx(
+                data_folder / label / f"{label}_{i}.docx", f"{label} document {i}"
+            )
+    return data_folder
+
+
+@pytest.mark.fast
+def test_streaming_build_writes_json_lines(training_data, tmp_path):
+    output_file = str(tmp_path / "dataset.jsonl")
+
+    counts = build_dataset_streaming(
+        str(training_data), output_file, max_in_flight=1, chunk_files=2
+    )
+
+    assert (counts["processed"], counts["skipped"], counts["failed"]) == (3, 0, 0)
+    assert counts["files_per_sec"] > 0
+    assert sorted(iter_jsonl_dataset(output_file)) == [
+        ("bank_statements document 0", "bank_statements"),
+        ("invoices document 0", "invoices"),
+        ("invoices document 1", "invoices"),
+    ]
+
+
+@pytest.mark.fast
+def test_streaming_build_only_reprocesses_new_or_changed_files(training_data, tmp_path):
+    output_file = str(tmp_path / "dataset.jsonl")
+    build_dataset_streaming(str(training_data), output_file)
+
+    changed = training_data / "invoices" / "invoices_0.docx"
+    write_docx(changed, "invoices document changed")
+    os.utime(changed, (1, 1))
+    write_docx(training_data / "bank_statements" / "new.docx", "new statement")
+    (training_data / "invoices" / "invoices_1.docx").unlink()
+
+    counts = build_dataset_streaming(str(training_data), output_file)
+
+    assert (counts["processed"], counts["skipped"], counts["failed"]) == (2, 1, 0)
+    assert sorted(text for text, _ in iter_jsonl_dataset(output_file)) == [
+        "bank_statements document 0",
+        "invoices document changed",
+        "new statement",
+    ]
+
+
+@pytest.mark.fast
+def test_records_missing_from_manifest_are_rebuilt(training_data, tmp_path):
+    output_file = str(tmp_path / "dataset.jsonl")
+    build_dataset_streaming(str(training_data), output_file)
+    with open(output_file, "a", encoding="utf-8") as f:
+        f.write(
+            json.dumps({"text": "torn", "label": "x", "source": "gone.docx"}) + "\n"
+        )
+
+    counts = build_dataset_streaming(str(training_data), output_file)
+
+    assert counts["processed"] == 0
+    assert len(list(iter_jsonl_dataset(output_file))) == 3
+
+
+@pytest.mark.fast
+def test_plan_chunks_separates_ocr_files_and_respects_budgets(tmp_path):
+    pending = [
+        (str(tmp_path / f"doc_{i}.docx"), "invoices", {"size": 400}) for i in range(5)
+    ] + [
+        (str(tmp_path / f"scan_{i}.jpg"), "drivers_licenses", {"size": 10})
+        for i in range(3)
+    ]
+
+    chunks = plan_chunks(pending, chunk_bytes=1000, chunk_files=64, ocr_chunk_pages=2)
+
+    assert [len(chunk) for chunk in chunks["text"]] == [2, 2, 1]
+    assert [len(chunk) for chunk in chunks["ocr"]] == [2, 1]
+    assert all(path.endswith(".jpg") for chunk in chunks["ocr"] for path, _ in chunk)
+
+
+@pytest.mark.fast
+def test_plan_chunks_routes_pdfs_by_size_without_opening_them(tmp_path, mocker):
+    opened = mocker.patch("fitz.open")
+    pending = [
+        (str(tmp_path / "text.pdf"), "invoices", {"size": 40 * 1024}),
+        (str(tmp_path / "scan.pdf"), "invoices", {"size": 3 * 256 * 1024}),
+    ]
+
+    chunks = plan_chunks(pending, chunk_bytes=1000, chunk_files=64, ocr_chunk_pages=2)
+
+    assert chunks["text"] == [[(str(tmp_path / "text.pdf"), "invoices")]]
+    assert chunks["ocr"] == [[(str(tmp_path / "scan.pdf"), "invoices")]]
+    opened.assert_not_called()
+
+
+@pytest.mark.fast
+@pytest.mark.parametrize(
+    "cpu_count, chunks, expected",
+    [
+        (8, {"text": [[]], "ocr": [[]]}, {"text": 4, "ocr": 4}),
+        (5, {"text": [[]], "ocr": [[]]}, {"text": 3, "ocr": 2}),
+        (8, {"text": [[]], "ocr": []}, {"text": 8, "ocr": 8}),
+        (1, {"text": [[]], "ocr": [[]]}, {"text": 1, "ocr": 1}),
+    ],
+)
+def test_split_workers_shares_one_cpu_budget(cpu_count, chunks, expected, mocker):
+    mocker.patch("src.label_data.os.cpu_count", return_value=cpu_count)
+
+    assert _split_workers(chunks) == expected
+
+
+@pytest.mark.fast
+def test_text_workers_do_not_start_the_ocr_engine(mocker):
+    mocker.patch("src.label_data.config.OCR_MAX_WORKERS", 4)
+    get_backend = mocker.patch("src.ocr_backends.get_ocr_backend")
+
+    _init_worker("text")
+    assert get_backend.call_count == 0
+
+    _init_worker("ocr")
+    assert get_backend.call_count == 1
@@ -0,0 +1,53 @@
+import json
+import logging
+
+import pytest
+
+from src import logging_config
+from src.logging_config import DebugSamplingFilter, JsonFormatter, setup_logger
+
+
+@pytest.mark.fast
+def test_setup_logger_is_idempotent(tmp_path):
+    log_file = str(tmp_path / "idempotent.log")
+    logger = setup_logger("test_idempotent", log_file)
+    handler_count = len(logger.handlers)
+
+    assert setup_logger("test_idempotent", log_file) is logger
+    assert len(logger.handlers) == handler_count
+
+
+@pytest.mark.fast
+def test_json_formatter_emits_one_object_per_record():
+    record = logging.LogRecord(
+        "app", logging.INFO, __file__, 1, "hello %s", ("x",), None
+    )
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "app"
+    assert payload["message"] == "hello x"
+
+
+@pytest.mark.fast
+def test_debug_sampling_only_drops_debug_records():
+    sampler = DebugSamplingFilter(rate=0.0)
+    debug = logging.LogRecord("app", logging.DEBUG, __file__, 1, "noisy", (), None)
+    warning = logging.LogRecord("app", logging.WARNING, __file__, 1, "kept", (), None)
+
+    assert not sampler.filter(debug)
+    assert sampler.filter(warning)
+
+
+@pytest.mark.fast
+def test_queue_mode_writes_off_the_calling_thread(tmp_path, mocker):
+    mocker.patch.object(logging_config.config, "LOG_QUEUE", True)
+    log_file = tmp_path / "queued.log"
+    logger = setup_logger("test_queued", str(log_file))
+
+    assert [type(h) for h in logger.handlers] == [logging.handlers.QueueHandler]
+    logger.info("queued message")
+    logging_config._listener.stop()
+    logging_config._start_listener()
+
+    assert "queued message" in log_file.read_text()
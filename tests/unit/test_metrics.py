@@ -0,0 +1,35 @@
+import pytest
+
+from src.metrics import Counter, Histogram, Registry
+
+
+@pytest.mark.fast
+def test_counter_and_histogram_exposition():
+    registry = Registry()
+    requests = Counter("requests_total", "Requests.", ("extension",), registry=registry)
+    latency = Histogram(
+        "latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1), registry=registry
+    )
+
+    requests.inc(extension="pdf")
+    requests.inc(extension="pdf")
+    latency.observe(0.05, stage="ocr")
+    latency.observe(0.5, stage="ocr")
+    latency.observe(5, stage="ocr")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{extension="pdf"} 2' in lines
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{stage="ocr",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="ocr",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="ocr",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{stage="ocr"} 5.55' in lines
+    assert 'latency_seconds_count{stage="ocr"} 3' in lines
+
+
+@pytest.mark.fast
+def test_metric_rejects_wrong_labels():
+    counter = Counter("errors_total", "Errors.", ("extension",), registry=Registry())
+    with pytest.raises(ValueError):
+        counter.inc(stage="ocr")
@@ -0,0 +1,134 @@
+import os
+
+import pytest
+
+from src import config
+from src.model_registry import (ActiveModel, ServedModel, activate_version,
+                                current_version, list_versions, load_version,
+                                publish_version, verify_version)
+
+
+@pytest.fixture
+def registry_dir(tmp_path):
+    registry_dir = str(tmp_path / "registry")
+    os.makedirs(registry_dir)
+    return registry_dir
+
+
+def publish(registry_dir, version, **kwargs):
+    return publish_version(
+        registry_dir,
+        model_path=config.MODEL_PATH,
+        vectorizer_path=config.VECTORIZER_PATH,
+        version=version,
+        **kwargs,
+    )
+
+
+@pytest.mark.fast
+def test_publish_writes_manifest_with_checksums(registry_dir):
+    version = publish_version(
+        registry_dir,
+        model_path=config.MODEL_PATH,
+        vectorizer_path=config.VECTORIZER_PATH,
+        metadata={"trained_on": "dataset.json"},
+    )
+
+    manifest = verify_version(registry_dir, version)
+    assert manifest["version"] == version
+    assert manifest["kind"] == "joblib"
+    assert set(manifest["files"]) == {"text_classifier.pkl", "tfidf_vectorizer.pkl"}
+    assert manifest["metadata"] == {"trained_on": "dataset.json"}
+    assert list_versions(registry_dir) == [version]
+    assert current_version(registry_dir) is None
+
+
+@pytest.mark.fast
+def test_publish_bundle_version(registry_dir):
+    publish_version(registry_dir, bundle_dir=config.INFERENCE_BUNDLE_DIR, version="b1")
+
+    served = load_version(registry_dir, "b1")
+    assert served.model is served.vectorizer
+    assert served.version == "b1"
+
+
+@pytest.mark.fast
+def test_activate_and_load_current(registry_dir):
+    publish(registry_dir, "v1", activate=True)
+    publish(registry_dir, "v2")
+
+    assert load_version(registry_dir).version == "v1"
+    activate_version(registry_dir, "v2")
+    served = load_version(registry_dir)
+    assert served.version == "v2"
+    assert list(served.model.classes_) == [
+        "bank_statements",
+        "drivers_licenses",
+        "invoices",
+    ]
+
+
+@pytest.mark.fast
+def test_tampered_version_is_rejected(registry_dir):
+    publish(registry_dir, "v1")
+    with open(os.path.join(registry_dir, "v1", "tfidf_vectorizer.pkl"), "ab") as f:
+        f.write(b"\0")
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        activate_version(registry_dir, "v1")
+    assert current_version(registry_dir) is None
+
+
+@pytest.mark.fast
+def test_duplicate_version_is_rejected(registry_dir):
+    publish(registry_dir, "v1")
+
+    with pytest.raises(ValueError, match="already exists"):
+        publish(registry_dir, "v1")
+
+
+@pytest.mark.fast
+def test_active_model_swaps_without_touching_pinned_reference(registry_dir):
+    publish(registry_dir, "v1", activate=True)
+    publish(registry_dir, "v2")
+    active = ActiveModel(load_version(registry_dir), registry_dir=registry_dir)
+    pinned = active.current
+
+    assert active.reload("v2") == "v2"
+    assert active.current.version == "v2"
+    assert pinned.version == "v1"
+    assert pinned.model is not active.current.model
+
+
+@pytest.mark.fast
+def test_active_model_keeps_serving_when_reload_fails(registry_dir):
+    publish(registry_dir, "v1", activate=True)
+    active = ActiveModel(load_version(registry_dir), registry_dir=registry_dir)
+
+    with pytest.raises(FileNotFoundError):
+        active.reload("missing")
+    assert active.current.version == "v1"
+
+
+@pytest.mark.fast
+def test_active_model_follows_current_pointer(registry_dir):
+    publish(registry_dir, "v1", activate=True)
+    publish(registry_dir, "v2")
+    active = ActiveModel(
+        load_version(registry_dir), registry_dir=registry_dir, poll_seconds=1e-9
+    )
+
+    activate_version(registry_dir, "v2")
+    active.maybe_reload()
+
+    assert active.current.version == "v2"
+
+
+@pytest.mark.fast
+def test_active_model_without_registry():
+    active = ActiveModel(ServedModel(None, None, "abc"))
+
+    active.maybe_reload()
+    with pytest.raises(ValueError, match="not configured"):
+        active.reload()
+    assert active.current.version == "abc"
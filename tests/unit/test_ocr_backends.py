@@ -0,0 +1,132 @@
+import sys
+import threading
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from src import config, ocr_backends
+from src.file_io import _ocr_image
+from src.metrics import OCR_SECONDS
+from src.ocr_backends import (PytesseractBackend, TesserocrBackend,
+                              get_ocr_backend)
+
+
+class FakeEngine:
+    def __init__(self):
+        self.images = []
+        self.cleared = 0
+
+    def SetImage(self, image):
+        self.images.append(image)
+
+    def GetUTF8Text(self):
+        return f"text {len(self.images)}"
+
+    def Clear(self):
+        self.cleared += 1
+
+
+@pytest.fixture
+def fresh_backend(monkeypatch):
+    monkeypatch.setattr(ocr_backends, "_backend", None)
+    monkeypatch.setattr(ocr_backends, "_backend_setting", None)
+
+
+@pytest.mark.fast
+def test_get_ocr_backend_follows_config(fresh_backend, monkeypatch):
+    monkeypatch.setattr(config, "OCR_BACKEND", "pytesseract")
+
+    backend = get_ocr_backend()
+
+    assert isinstance(backend, PytesseractBackend)
+    assert get_ocr_backend() is backend
+
+
+@pytest.mark.fast
+def test_get_ocr_backend_falls_back_without_tesserocr(fresh_backend, monkeypatch):
+    monkeypatch.setattr(config, "OCR_BACKEND", "tesserocr")
+    monkeypatch.setitem(sys.modules, "tesserocr", None)
+
+    backend = get_ocr_backend()
+
+    assert isinstance(backend, PytesseractBackend)
+    assert get_ocr_backend() is backend
+
+
+@pytest.mark.fast
+def test_tesserocr_pool_reuses_engines(mocker):
+    backend = TesserocrBackend(pool_size=2)
+    create = mocker.patch.object(backend, "_create_engine", side_effect=FakeEngine)
+
+    assert backend.image_to_string(Image.new("L", (10, 10))) == "text 1"
+    assert backend.image_to_string(Image.new("L", (10, 10))) == "text 2"
+
+    assert create.call_count == 1
+
+
+@pytest.mark.fast
+def test_tesserocr_pool_bounds_engines(mocker):
+    backend = TesserocrBackend(pool_size=2)
+    mocker.patch.object(backend, "_create_engine", side_effect=FakeEngine)
+    first, second = backend._acquire(), backend._acquire()
+    acquired = []
+
+    waiter = threading.Thread(target=lambda: acquired.append(backend._acquire()))
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+
+    backend._release(first)
+    waiter.join(5)
+    assert acquired == [first]
+    assert first.cleared == 1
+    assert len(backend._engines) == 2
+    backend._release(second)
+
+
+@pytest.mark.fast
+def test_tesserocr_pool_starts_empty_after_fork(mocker):
+    backend = TesserocrBackend(pool_size=1)
+    create = mocker.patch.object(backend, "_create_engine", side_effect=FakeEngine)
+    parent_engine = backend._acquire()
+
+    mocker.patch("src.ocr_backends.os.getpid", return_value=-1)
+    child_engine = backend._acquire()
+    backend._release(parent_engine)
+
+    assert child_engine is not parent_engine
+    assert create.call_count == 2
+    assert backend._idle.empty()
+
+
+@pytest.mark.fast
+def test_ocr_image_uses_configured_backend(fresh_backend, monkeypatch):
+    class RecordingBackend:
+        name = "recording"
+
+        def image_to_string(self, image):
+            return f"{image.mode} {image.size}"
+
+    monkeypatch.setattr(config, "OCR_PREPROCESS", False)
+    monkeypatch.setattr(config, "OCR_BACKEND", "recording")
+    monkeypatch.setattr(ocr_backends, "create_backend", lambda name: RecordingBackend())
+    observed = OCR_SECONDS.count(backend="recording")
+
+    assert _ocr_image(Image.new("RGB", (30, 20))) == "RGB (30, 20)"
+    assert OCR_SECONDS.count(backend="recording") == observed + 1
+
+
+@pytest.mark.fast
+def test_tesserocr_reads_text():
+    tesserocr = pytest.importorskip("tesserocr")
+    path, languages = tesserocr.get_languages(config.OCR_TESSDATA_PATH or "")
+    if "eng" not in languages:
+        pytest.skip("English Tesseract language data is not installed.")
+    image = Image.new("L", (900, 200), color=255)
+    font = ImageFont.load_default(size=64)
+    ImageDraw.Draw(image).text((40, 60), "Invoice Number 12345", fill=0, font=font)
+
+    text = TesserocrBackend(pool_size=1, path=path).image_to_string(image)
+
+    assert "Invoice" in text
+    assert "12345" in text
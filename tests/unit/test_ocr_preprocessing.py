@@ -0,0 +1,103 @@
+import fitz
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from src import config
+from src.file_io import _render_page
+from src.ocr_preprocessing import (binarize, crop_margins, estimate_skew,
+                                   fit_pixel_budget, preprocess_for_ocr,
+                                   render_dpi)
+
+
+def text_lines_image(width=1200, height=900):
+    image = Image.new("L", (width, height), color=255)
+    draw = ImageDraw.Draw(image)
+    for top in range(150, height - 150, 60):
+        draw.rectangle((150, top, width - 150, top + 20), fill=0)
+    return image
+
+
+@pytest.mark.fast
+def test_fit_pixel_budget_downscales_large_images_only():
+    large = Image.new("RGB", (4000, 3000))
+
+    resized = fit_pixel_budget(large, 1_200_000)
+
+    assert resized.width * resized.height <= 1_200_000
+    assert resized.width / resized.height == pytest.approx(4 / 3, rel=0.01)
+    small = Image.new("RGB", (400, 200))
+    assert fit_pixel_budget(small, 1_200_000) is small
+
+
+@pytest.mark.fast
+def test_render_dpi_respects_pixel_budget():
+    # US Letter is 612 x 792 points.
+    assert render_dpi(612, 792, 200, 4_000_000) == 200
+    dpi = render_dpi(612, 792, 300, 4_000_000)
+    assert dpi < 300
+    assert (612 * dpi / 72) * (792 * dpi / 72) <= 4_000_000
+
+
+@pytest.mark.fast
+def test_binarize_separates_ink_from_paper():
+    image = Image.new("L", (100, 100), color=220)
+    ImageDraw.Draw(image).rectangle((20, 20, 40, 40), fill=40)
+
+    values = set(np.unique(np.asarray(binarize(image))))
+
+    assert values == {0, 255}
+    assert binarize(image).getpixel((30, 30)) == 0
+    assert binarize(image).getpixel((80, 80)) == 255
+
+
+@pytest.mark.fast
+def test_crop_margins_keeps_ink_and_padding():
+    image = Image.new("L", (1000, 800), color=255)
+    ImageDraw.Draw(image).rectangle((300, 200, 500, 300), fill=0)
+
+    cropped = crop_margins(image, padding=10)
+
+    assert cropped.size == (221, 121)
+    assert crop_margins(Image.new("L", (50, 50), color=255)).size == (50, 50)
+
+
+@pytest.mark.fast
+@pytest.mark.parametrize("skew", [-3.0, 2.0])
+def test_estimate_skew_recovers_rotation(skew):
+    skewed = text_lines_image().rotate(skew, expand=True, fillcolor=255)
+
+    assert estimate_skew(skewed) == pytest.approx(-skew, abs=0.5)
+
+
+@pytest.mark.fast
+def test_preprocess_for_ocr_flattens_and_shrinks(mocker):
+    mocker.patch.object(config, "OCR_MAX_PIXELS", 500_000)
+    mocker.patch.object(config, "OCR_DESKEW", True)
+    mocker.patch.object(config, "OCR_BINARIZE", True)
+    image = Image.new("RGBA", (2000, 1500), color=(0, 0, 0, 0))
+    ImageDraw.Draw(image).rectangle((400, 400, 1600, 1100), fill=(0, 0, 0, 255))
+
+    processed = preprocess_for_ocr(image)
+
+    assert processed.mode == "L"
+    assert processed.width * processed.height <= 500_000
+    # The transparent background became white paper and was cropped away.
+    assert processed.getpixel((0, 0)) == 255
+    assert processed.getpixel((processed.width // 2, processed.height // 2)) == 0
+
+
+@pytest.mark.fast
+def test_render_page_uses_configured_dpi(mocker):
+    with fitz.open() as pdf:
+        page = pdf.new_page(width=612, height=792)
+
+        mocker.patch.object(config, "OCR_PREPROCESS", False)
+        assert _render_page(page).size == (612, 792)
+
+        mocker.patch.object(config, "OCR_PREPROCESS", True)
+        mocker.patch.object(config, "OCR_RENDER_DPI", 144)
+        image = _render_page(page)
+
+    assert image.mode == "L"
+    assert image.size == (1224, 1584)
@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+
+import pytest
+
+from src import config
+from src.profiling import SamplingProfiler, should_profile
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.mark.fast
+def test_sampling_profiler_records_stacks_of_target_thread(tmp_path):
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.001).start()
+    busy_wait(0.1)
+    profiler.stop()
+
+    collapsed = profiler.collapsed()
+    assert "busy_wait (test_profiling.py:" in collapsed
+    stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+    assert stack.split(";")[0] == threading.current_thread().name
+    assert int(count) > 0
+
+    path = profiler.save(str(tmp_path), "profile")
+    with open(path) as file:
+        speedscope = json.load(file)
+    [profile] = speedscope["profiles"]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == len(profile["weights"])
+    frames = {frame["name"] for frame in speedscope["shared"]["frames"]}
+    assert any(name.startswith("busy_wait") for name in frames)
+    assert (tmp_path / "profile.collapsed").read_text() == collapsed
+
+
+@pytest.mark.fast
+def test_sampling_profiler_ignores_unrelated_threads():
+    other = threading.Thread(target=busy_wait, args=(0.1,), name="unrelated")
+    other.start()
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.001).start()
+    other.join()
+    profiler.stop()
+
+    threads = {line.split(";")[0] for line in profiler.collapsed().splitlines()}
+    assert threads == {threading.current_thread().name}
+
+
+@pytest.mark.fast
+def test_should_profile(mocker):
+    mocker.patch.object(config, "PROFILE_SAMPLE_RATE", 0.0)
+    assert should_profile(True)
+    assert not should_profile(False)
+
+    mocker.patch.object(config, "PROFILE_SAMPLE_RATE", 1.0)
+    assert should_profile(False)
+
+
+@pytest.mark.fast
+def test_sampling_profiler_includes_busy_ocr_pool_threads(mocker):
+    release = threading.Event()
+    mocker.patch("src.file_io.config.OCR_PREPROCESS", False)
+    backend = mocker.patch("src.ocr_backends.get_ocr_backend").return_value
+    backend.name = "test"
+    backend.image_to_string.side_effect = lambda image: release.wait(5) and ""
+
+    from src.file_io import _ocr_image
+
+    worker = threading.Thread(target=_ocr_image, args=(None,), name="ocr_0")
+    worker.start()
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.001).start()
+    time.sleep(0.05)
+    release.set()
+    worker.join()
+    profiler.stop()
+
+    assert any(
+        stack[0] == "ocr_0" and any(f.startswith("_ocr_image") for f in stack)
+        for stack in profiler.samples
+    )
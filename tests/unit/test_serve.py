@@ -0,0 +1,37 @@
+import pytest
+
+from src import config
+from src.serve import ClassifierServer, server_options, warm_up_worker
+
+
+@pytest.mark.fast
+def test_server_options_follow_config(monkeypatch):
+    monkeypatch.setattr(config, "SERVER_BIND", "0.0.0.0:8080")
+    monkeypatch.setattr(config, "SERVER_WORKERS", 3)
+    monkeypatch.setattr(config, "SERVER_THREADS", 2)
+    monkeypatch.setattr(config, "SERVER_TIMEOUT_SECONDS", 30)
+
+    cfg = ClassifierServer(server_options()).cfg
+
+    assert cfg.bind == ["0.0.0.0:8080"]
+    assert cfg.workers == 3
+    assert cfg.threads == 2
+    assert cfg.timeout == 30
+    assert cfg.preload_app is True
+    assert cfg.post_worker_init is warm_up_worker
+
+
+@pytest.mark.fast
+def test_warm_up_worker_classifies_dummy_document():
+    from src.app import active_model
+
+    file_class = warm_up_worker(worker=None)
+
+    assert file_class in {str(label) for label in active_model.current.model.classes_}
+
+
+@pytest.mark.fast
+def test_warm_up_failure_leaves_worker_serving(mocker):
+    mocker.patch("src.serve.warm_up_document", side_effect=RuntimeError("boom"))
+
+    assert warm_up_worker(worker=None) is None
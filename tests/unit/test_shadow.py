@@ -0,0 +1,114 @@
+import threading
+from io import BytesIO
+
+import joblib
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from src import config
+from src.classifier import classify_document
+from src.metrics import (SHADOW_PREDICTIONS, SHADOW_PROBABILITY_DELTA,
+                         SHADOW_SKIPPED)
+from src.model_registry import ServedModel
+from src.shadow import ShadowScorer, probability_delta
+
+
+@pytest.fixture(scope="module")
+def served():
+    return ServedModel(
+        joblib.load(config.MODEL_PATH),
+        joblib.load(config.VECTORIZER_PATH),
+        "candidate",
+    )
+
+
+@pytest.mark.fast
+def test_probability_delta():
+    assert probability_delta({"a": 0.7, "b": 0.3}, {"a": 0.4, "b": 0.6}) == (
+        pytest.approx(0.3)
+    )
+    assert probability_delta({"a": 1.0}, {"b": 1.0}) == 1.0
+
+
+@pytest.mark.fast
+def test_shadow_records_agreement_and_delta(served):
+    text = "Invoice Number: 12345 for electronics purchase, total $500."
+    primary = dict(
+        zip(
+            served.model.classes_,
+            served.model.predict_proba(served.vectorizer.transform([text]))[0],
+        )
+    )
+    agreed = SHADOW_PREDICTIONS.value(shadow_version="candidate", agreement="agree")
+    disagreed = SHADOW_PREDICTIONS.value(
+        shadow_version="candidate", agreement="disagree"
+    )
+    observed = SHADOW_PROBABILITY_DELTA.count(shadow_version="candidate")
+    shadow = ShadowScorer(served, sample_rate=1.0)
+
+    assert shadow.submit(text, primary, "production")
+    assert shadow.submit(text, {"bank_statements": 1.0}, "production")
+    shadow.join()
+
+    assert (
+        SHADOW_PREDICTIONS.value(shadow_version="candidate", agreement="agree")
+        == agreed + 1
+    )
+    assert (
+        SHADOW_PREDICTIONS.value(shadow_version="candidate", agreement="disagree")
+        == disagreed + 1
+    )
+    assert SHADOW_PROBABILITY_DELTA.count(shadow_version="candidate") == observed + 2
+
+
+@pytest.mark.fast
+def test_shadow_sample_rate_zero_skips(served):
+    shadow = ShadowScorer(served, sample_rate=0.0)
+
+    assert not shadow.submit("text", {"invoices": 1.0})
+    assert shadow._worker is None
+
+
+@pytest.mark.fast
+def test_shadow_drops_samples_when_queue_is_full():
+    release = threading.Event()
+
+    class BlockingVectorizer:
+        def transform(self, texts):
+            release.wait(5)
+            raise RuntimeError("stop")
+
+    shadow = ShadowScorer(
+        ServedModel(None, BlockingVectorizer(), "blocked"), sample_rate=1.0, max_queue=1
+    )
+    dropped = SHADOW_SKIPPED.value(reason="queue_full")
+
+    results = [shadow.submit("text", {"invoices": 1.0}) for _ in range(3)]
+    release.set()
+    shadow.join()
+
+    assert results[0] and not all(results)
+    assert SHADOW_SKIPPED.value(reason="queue_full") > dropped
+
+
+@pytest.mark.fast
+def test_classify_document_submits_preprocessed_text(served, temp_docx):
+    submitted = []
+
+    class RecordingShadow:
+        def submit(self, text, probabilities, primary_version=""):
+            submitted.append((text, probabilities, primary_version))
+
+    file = FileStorage(stream=BytesIO(temp_docx.read_bytes()), filename="test.docx")
+    file_class = classify_document(
+        file,
+        served.model,
+        served.vectorizer,
+        model_version="production",
+        shadow=RecordingShadow(),
+    )
+
+    [(text, probabilities, version)] = submitted
+    assert text == "This is a test document."
+    assert max(probabilities, key=probabilities.get) == file_class
+    assert version == "production"
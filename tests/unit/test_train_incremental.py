@@ -0,0 +1,155 @@
+import json
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfTransformer
+
+from src import config
+from src.classifier import _predict_probabilities
+from src.dataset_store import write_dataset_store
+from src.model_loader import load_model_artifacts
+from src.streaming_tfidf import StreamingTfidfTransformer, make_vectorizer
+from src.train_incremental import (save_artifacts, train_incremental,
+                                   update_model)
+
+TEMPLATES = {
+    "invoices": "Invoice number {i} total amount due ${i}.00 payment terms net 30",
+    "bank_statements": "Account statement balance ${i} deposit withdrawal period {i}",
+    "drivers_licence": "Driver licence number D{i} date of birth class C expires",
+}
+
+
+def write_jsonl(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            for label, template in TEMPLATES.items():
+                record = {"text": template.format(i=i), "label": label}
+                f.write(json.dumps(record) + "\n")
+    return str(path)
+
+
+@pytest.mark.fast
+def test_streaming_idf_matches_tfidf_transformer():
+    hashing = make_vectorizer(n_features=2**12).named_steps["hashing"]
+    texts = [template.format(i=i) for i in range(5) for template in TEMPLATES.values()]
+    counts = hashing.transform(texts)
+
+    streaming = StreamingTfidfTransformer()
+    streaming.partial_fit(counts[:7]).partial_fit(counts[7:])
+
+    np.testing.assert_allclose(
+        streaming.transform(counts).toarray(),
+        TfidfTransformer().fit_transform(counts).toarray(),
+        atol=1e-12,
+    )
+
+
+@pytest.mark.fast
+@pytest.mark.parametrize("source", ["jsonl", "store"])
+def test_train_incremental_learns_each_class(tmp_path, source):
+    dataset_path = write_jsonl(tmp_path / "dataset.jsonl", 20)
+    if source == "store":
+        records = (
+            (record["text"], record["label"], "")
+            for record in map(json.loads, open(dataset_path, encoding="utf-8"))
+        )
+        dataset_path = str(tmp_path / "store")
+        write_dataset_store(records, dataset_path)
+
+    model, vectorizer = train_incremental(
+        dataset_path, epochs=2, batch_size=8, n_features=2**12
+    )
+
+    assert sorted(model.classes_) == sorted(TEMPLATES)
+    texts = [template.format(i=99) for template in TEMPLATES.values()]
+    assert list(model.predict(vectorizer.transform(texts))) == list(TEMPLATES)
+
+
+@pytest.mark.fast
+def test_update_model_folds_in_new_documents(tmp_path):
+    model, vectorizer = train_incremental(
+        write_jsonl(tmp_path / "dataset.jsonl", 10), epochs=1, n_features=2**12
+    )
+    tfidf = vectorizer.named_steps["tfidf"]
+    seen, idf = tfidf.n_documents_, tfidf.idf_.copy()
+    coef = model.coef_.copy()
+
+    update_model(model, vectorizer, write_jsonl(tmp_path / "new.jsonl", 2))
+
+    assert tfidf.n_documents_ == seen
+    np.testing.assert_array_equal(tfidf.idf_, idf)
+    assert not np.array_equal(model.coef_, coef)
+
+    update_model(
+        model, vectorizer, write_jsonl(tmp_path / "new.jsonl", 2), update_idf=True
+    )
+
+    assert tfidf.n_documents_ == seen + 6
+
+
+@pytest.mark.fast
+def test_update_model_rejects_unknown_labels(tmp_path):
+    model, vectorizer = train_incremental(
+        write_jsonl(tmp_path / "dataset.jsonl", 10), epochs=1, n_features=2**12
+    )
+    new_path = tmp_path / "new.jsonl"
+    new_path.write_text(json.dumps({"text": "Passport", "label": "passports"}) + "\n")
+
+    with pytest.raises(ValueError, match="passports"):
+        update_model(model, vectorizer, str(new_path))
+
+
+@pytest.mark.fast
+def test_saved_artifacts_serve_through_classifier(tmp_path):
+    model, vectorizer = train_incremental(
+        write_jsonl(tmp_path / "dataset.jsonl", 10), epochs=2, n_features=2**12
+    )
+    model_path, vectorizer_path = tmp_path / "model.pkl", tmp_path / "vectorizer.pkl"
+    save_artifacts(model, vectorizer, model_path, vectorizer_path)
+
+    probabilities = _predict_probabilities(
+        [TEMPLATES["invoices"].format(i=7)],
+        joblib.load(model_path, mmap_mode="r"),
+        joblib.load(vectorizer_path, mmap_mode="r"),
+    )
+
+    assert max(probabilities[0], key=probabilities[0].get) == "invoices"
+    assert sum(probabilities[0].values()) == pytest.approx(1.0)
+
+
+@pytest.mark.slow
+def test_cli_trained_artifacts_load_and_serve(tmp_path, monkeypatch):
+    model_path, vectorizer_path = tmp_path / "model.pkl", tmp_path / "vectorizer.pkl"
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "src.train_incremental",
+            "train",
+            "--dataset",
+            write_jsonl(tmp_path / "dataset.jsonl", 10),
+            "--epochs",
+            "2",
+            "--n-features",
+            str(2**12),
+            "--model-path",
+            str(model_path),
+            "--vectorizer-path",
+            str(vectorizer_path),
+        ],
+        check=True,
+    )
+    monkeypatch.setattr(config, "MODEL_PATH", str(model_path))
+    monkeypatch.setattr(config, "VECTORIZER_PATH", str(vectorizer_path))
+    monkeypatch.setattr(config, "MODEL_REGISTRY_DIR", None)
+    monkeypatch.setattr(config, "USE_INFERENCE_BUNDLE", False)
+
+    served = load_model_artifacts()
+    probabilities = _predict_probabilities(
+        [TEMPLATES["invoices"].format(i=7)], served.model, served.vectorizer
+    )
+
+    assert max(probabilities[0], key=probabilities[0].get) == "invoices"
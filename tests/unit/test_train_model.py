@@ -0,0 +1,92 @@
+import pytest
+from sklearn.pipeline import Pipeline
+
+from src.train_model import (evaluate_candidate, load_dataset,
+                             run_hyperparameter_search, search_report,
+                             select_fastest)
+
+TEMPLATES = {
+    "invoices": "Invoice number {i} total amount due payment terms net 30",
+    "bank_statements": "Account statement balance {i} deposit withdrawal period",
+    "drivers_licence": "Driver licence number D{i} date of birth class C expires",
+}
+TEXTS = [template.format(i=i) for i in range(12) for template in TEMPLATES.values()]
+LABELS = [label for _ in range(12) for label in TEMPLATES]
+PARAM_GRID = {
+    "vectorizer__ngram_range": [(1, 1), (1, 2)],
+    "classifier__C": [0.1, 1.0],
+}
+
+
+@pytest.mark.fast
+def test_search_caches_vectorizer_per_config(tmp_path):
+    cache_dir = tmp_path / "cache"
+
+    searcher = run_hyperparameter_search(
+        TEXTS, LABELS, param_grid=PARAM_GRID, cv=2, n_jobs=1, cache_dir=str(cache_dir)
+    )
+
+    assert len(searcher.cv_results_["params"]) == 4
+    # One cached vectorizer fit per (ngram_range, fold), shared across C values.
+    assert len(list(cache_dir.rglob("output.pkl"))) == 2 * 2
+
+
+@pytest.mark.fast
+def test_randomized_search_samples_n_iter_candidates():
+    searcher = run_hyperparameter_search(
+        TEXTS, LABELS, param_grid=PARAM_GRID, search="random", n_iter=3, cv=2, n_jobs=1
+    )
+
+    assert len(searcher.cv_results_["params"]) == 3
+
+
+@pytest.mark.fast
+def test_search_report_orders_by_latency_and_selects(mocker):
+    searcher = run_hyperparameter_search(
+        TEXTS, LABELS, param_grid=PARAM_GRID, cv=2, n_jobs=1
+    )
+    fit = mocker.spy(Pipeline, "fit")
+
+    report = search_report(searcher, len(TEXTS))
+
+    assert fit.call_count == 0
+    assert len(report) == 4
+    latencies = [row["latency_ms_per_doc"] for row in report]
+    assert latencies == sorted(latencies)
+    assert select_fastest(report, 0.0) == report[0]
+    assert select_fastest(report, 1.1) is None
+
+
+@pytest.mark.fast
+def test_evaluate_candidate_refits_only_the_selected_row():
+    searcher = run_hyperparameter_search(
+        TEXTS, LABELS, param_grid=PARAM_GRID, cv=2, n_jobs=1
+    )
+    report = search_report(searcher, len(TEXTS))
+    best = select_fastest(report, 0.0)
+
+    pipeline = evaluate_candidate(best, TEXTS, LABELS, TEXTS[:6], LABELS[:6])
+
+    assert best["test_accuracy"] == 1.0
+    assert best["vocabulary_size"] == len(
+        pipeline.named_steps["vectorizer"].vocabulary_
+    )
+    assert best["single_doc_latency_ms"] > 0
+    assert all("test_accuracy" not in row for row in report if row is not best)
+
+
+@pytest.mark.fast
+def test_load_jsonl_dataset_skips_blank_lines(tmp_path):
+    dataset_file = tmp_path / "dataset.jsonl"
+    dataset_file.write_text(
+        '{"text": "invoice total", "label": "invoices"}\n'
+        "\n"
+        '{"text": "account balance", "label": "bank_statements"}\n'
+        "   \n",
+        encoding="utf-8",
+    )
+
+    assert load_dataset(str(dataset_file)) == [
+        ["invoice total", "invoices"],
+        ["account balance", "bank_statements"],
+    ]